@@ -0,0 +1,794 @@
+"""Down Detector benchmarks
+
+Runs the real check path against a local stub HTTP server so results are
+reproducible and never touch the internet.
+
+    python benchmark.py probe --sites 10000 --backend asyncio --concurrency 500
+    python benchmark.py history --rows 100000000
+    python benchmark.py ratelimit --sites 2000 --hosts 4 --global-rate 400 --host-rate 50
+    python benchmark.py import --lines 1000000
+    python benchmark.py timings --sites 2000 --backend threads
+    python benchmark.py farm --sites 10000 --latency lognormal --error-rate 0.02 --output run.json
+    python benchmark.py farm --sites 10000 --compare run.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: peak RSS is not reported
+
+STUB_RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nOK"
+
+
+def run_stub_server(port_pipe, addresses=('127.0.0.1',)):
+    """Serve a fixed 200 response on a random loopback port (runs in a child process)"""
+    async def handle(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+            writer.write(STUB_RESPONSE)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve():
+        server = await asyncio.start_server(handle, addresses[0], 0, backlog=4096)
+        port = server.sockets[0].getsockname()[1]
+        # Extra loopback addresses share the port so each one looks like a separate host
+        servers = [await asyncio.start_server(handle, address, port, backlog=4096) for address in addresses[1:]]
+        port_pipe.send(port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for extra in servers:
+                extra.close()
+
+    asyncio.run(serve())
+
+
+def start_stub_server(addresses=('127.0.0.1',)):
+    """Start the stub server process and return (process, base_url) of the first address"""
+    parent_pipe, child_pipe = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=run_stub_server, args=(child_pipe, addresses), daemon=True)
+    process.start()
+    port = parent_pipe.recv()
+    return process, f"http://{addresses[0]}:{port}"
+
+
+# Site behaviours of the simulated farm; the kind is part of each site's URL
+FARM_KINDS = ('ok', 'error', 'reset', 'hang', 'drip', 'redirect')
+# Kinds whose checks must come back up (drip only when it finishes within the timeout)
+FARM_UP_KINDS = ('ok', 'drip', 'redirect')
+
+
+def sample_latency(rng, distribution, median_ms):
+    """Response delay in seconds drawn from the farm's latency distribution"""
+    if distribution == 'fixed':
+        value = median_ms
+    elif distribution == 'uniform':
+        value = rng.uniform(0, 2 * median_ms)
+    elif distribution == 'exponential':
+        value = rng.expovariate(math.log(2) / median_ms) if median_ms else 0
+    elif distribution == 'lognormal':
+        value = rng.lognormvariate(math.log(max(median_ms, 0.01)), 0.8)
+    else:  # pareto: heavy tail, median at median_ms
+        value = median_ms / 2 ** (1 / 1.5) * rng.paretovariate(1.5)
+    return min(value, 60000) / 1000
+
+
+def run_farm_server(port_pipe, addresses, port, options):
+    """Serve the simulated farm on addresses (runs in a child process)
+
+    Paths are /site/<n>/<kind>[/<hops>]: ok answers 200 after a sampled delay,
+    error answers options['error_status'], reset closes the connection
+    without answering, hang never answers, drip sends its body in ten pieces
+    over options['drip_seconds'] and redirect answers 302 <hops> times
+    before the final 200. Connections are kept alive like a real server's.
+    """
+    rng = random.Random(options['seed'])
+
+    def respond(writer, status, body=b'', extra=''):
+        reason = {200: 'OK', 302: 'Found'}.get(status, 'Error')
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Length: {len(body)}\r\n{extra}\r\n".encode('latin-1') + body)
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                method, path = request_line.split()[:2]
+                parts = path.decode('latin-1').split('?')[0].strip('/').split('/')
+                kind = parts[2] if len(parts) > 2 else 'ok'
+                if kind == 'hang':
+                    await asyncio.sleep(3600)
+                if kind == 'reset':
+                    break
+                await asyncio.sleep(sample_latency(rng, options['latency'], options['latency_ms']))
+                body = b'' if method == b'HEAD' else b'OK'
+                if kind == 'error':
+                    respond(writer, options['error_status'], body)
+                elif kind == 'redirect' and len(parts) > 3 and int(parts[3]) > 0:
+                    hops = int(parts[3]) - 1
+                    respond(writer, 302, extra=f"Location: /site/{parts[1]}/redirect/{hops}\r\n")
+                elif kind == 'drip' and method != b'HEAD':
+                    body = b'x' * 10240
+                    writer.write(f"HTTP/1.1 200 OK\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1'))
+                    for offset in range(0, len(body), 1024):
+                        writer.write(body[offset:offset + 1024])
+                        await writer.drain()
+                        await asyncio.sleep(options['drip_seconds'] / 10)
+                else:
+                    respond(writer, 200, body)
+                await writer.drain()
+        except (ConnectionError, ValueError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve():
+        servers = [await asyncio.start_server(handle, addresses[0], port, backlog=4096, reuse_port=options['reuse_port'])]
+        bound_port = servers[0].sockets[0].getsockname()[1]
+        for address in addresses[1:]:
+            servers.append(await asyncio.start_server(handle, address, bound_port, backlog=4096, reuse_port=options['reuse_port']))
+        port_pipe.send(bound_port)
+        await asyncio.gather(*(server.serve_forever() for server in servers))
+
+    asyncio.run(serve())
+
+
+def start_farm(addresses, processes, options):
+    """Start the farm in one or more processes sharing a port (SO_REUSEPORT); returns (processes, port)"""
+    started = []
+    port = 0
+    options = dict(options, reuse_port=processes > 1)
+    for _ in range(max(1, processes)):
+        parent_pipe, child_pipe = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_farm_server, args=(child_pipe, addresses, port, options), daemon=True)
+        process.start()
+        started.append(process)
+        port = parent_pipe.recv()
+    return started, port
+
+
+def build_farm_sites(args, addresses, port):
+    """Deterministic {url: kind} for args.sites sites mixed according to the --*-rate options"""
+    rng = random.Random(args.seed)
+    rates = [(kind, getattr(args, f"{kind}_rate")) for kind in FARM_KINDS[1:]]
+    sites = {}
+    for n in range(args.sites):
+        roll = rng.random()
+        kind = 'ok'
+        for candidate, rate in rates:
+            if roll < rate:
+                kind = candidate
+                break
+            roll -= rate
+        path = f"/site/{n}/{kind}" + (f"/{args.redirect_hops}" if kind == 'redirect' else '')
+        sites[f"http://{addresses[n % len(addresses)]}:{port}{path}"] = kind
+    return sites
+
+
+def percentile(values, q):
+    """Nearest-rank q-quantile (0-1) of values, or None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def cpu_seconds():
+    """CPU time of this process plus that of its finished child processes (shard workers)"""
+    if resource is None:
+        return time.process_time()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def peak_rss_mb(who=None):
+    """Peak resident set size in MB of this process (or of its largest finished child), or None where unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF if who is None else who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_farm_cycles(app, urls, cycles):
+    """Full passes over urls through run_checks; returns (cycle times, {url: is_up} of the last pass)"""
+    cycle_times = []
+    results = {}
+    for _ in range(cycles):
+        start = time.perf_counter()
+        for url, is_up, _ in app.run_checks(urls):
+            results[url] = is_up
+        cycle_times.append(time.perf_counter() - start)
+    return cycle_times, results
+
+
+def run_farm_monitor(app, duration, interval, shards=1):
+    """Run the monitor loop for duration seconds; returns (scheduler lags, {url: is_up})
+
+    With shards > 1 the sharded monitor runs instead; its lags stay inside the workers.
+    """
+    lags = []
+    results = {}
+    end = time.time() + duration
+
+    def on_result(url, is_up, status):
+        results[url] = is_up
+
+    def on_tick():
+        if time.time() >= end:
+            raise KeyboardInterrupt()
+
+    if shards > 1:
+        app.monitor_shards = shards
+        try:
+            app.run_sharded_monitor(interval, on_result, on_tick, tick=0.5)
+        except KeyboardInterrupt:
+            pass
+        return lags, results
+
+    scheduler = app.build_scheduler(interval)
+    pop_due = scheduler.pop_due
+
+    def timed_pop_due(now=None):
+        due = pop_due(now)
+        lags.extend(lag for _, lag in due)
+        return due
+
+    scheduler.pop_due = timed_pop_due
+    try:
+        app.run_monitor_loop(scheduler, on_result, on_tick, tick=0.5, default_interval=interval)
+    except KeyboardInterrupt:
+        pass
+    # Let checks still in flight finish so the engine shuts down cleanly
+    while app.check_engine.pending:
+        app.check_engine.get_result(timeout=1.0)
+    return lags, results
+
+
+def check_latencies(app, urls):
+    """Response times in ms of every check kept in the in-memory history"""
+    latencies = []
+    for url in urls:
+        history = app.history.get(url)
+        if history is not None:
+            latencies.extend(latency for _, latency, _, _ in history.samples())
+    return latencies
+
+
+def compare_farm_results(current, baseline, tolerance):
+    """Print each metric against baseline; returns the names of metrics that regressed beyond tolerance %"""
+    # metric -> True when higher is better
+    metrics = [
+        ('throughput_cps', True), ('cycle_p50_s', False), ('cycle_p99_s', False),
+        ('check_p50_ms', False), ('check_p99_ms', False), ('lag_p99_s', False),
+        ('cpu_per_check_us', False), ('peak_rss_mb', False),
+    ]
+    regressions = []
+    print(f"{'metric':<18} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, higher_is_better in metrics:
+        old, new = baseline['results'].get(name), current['results'].get(name)
+        if old is None or new is None:
+            continue
+        change = (new - old) * 100 / old if old else 0.0
+        worse = -change if higher_is_better else change
+        flag = ''
+        if worse > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<18} {old:>12,.3f} {new:>12,.3f} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def bench_farm(args):
+    """Drive the real check path against a simulated farm and report machine-readable results"""
+    addresses = tuple(f"127.0.0.{n}" for n in range(1, args.hosts + 1))
+    options = {
+        'seed': args.seed, 'latency': args.latency, 'latency_ms': args.latency_ms,
+        'error_status': args.error_status, 'drip_seconds': args.drip_seconds,
+    }
+    processes, port = start_farm(addresses, args.farm_processes, options)
+    try:
+        with tempfile.TemporaryDirectory() as log_dir:
+            os.environ['TIMEOUT'] = str(args.timeout)
+            os.environ['SITE_STORE'] = 'json'
+            os.environ['CONFIG_WATCH'] = 'false'
+            os.environ['SHARD_KEY'] = args.shard_key
+            app = create_app(args.backend, args.concurrency, log_dir)
+            sites = build_farm_sites(args, addresses, port)
+            urls = list(sites)
+            app.websites.add_many((url, None) for url in urls)
+            app.session_pool.configure(urls)
+
+            cpu_start = cpu_seconds()
+            wall_start = time.perf_counter()
+            if args.mode == 'check':
+                cycle_times, results = run_farm_cycles(app, urls, args.cycles)
+                lags = []
+                checks = len(urls) * args.cycles
+            else:
+                lags, results = run_farm_monitor(app, args.duration, args.interval, args.shards)
+                cycle_times = []
+                checks = sum(len(app.history.get(url)) for url in urls if app.history.get(url) is not None)
+            elapsed = time.perf_counter() - wall_start
+            cpu = cpu_seconds() - cpu_start
+            # Shard workers have been reaped by now; the farm processes haven't
+            worker_rss = peak_rss_mb(resource.RUSAGE_CHILDREN) if resource is not None and args.shards > 1 else None
+            latencies = check_latencies(app, urls)
+            if app.check_engine is not None:
+                app.check_engine.shutdown()
+            close_app(app)
+    finally:
+        for process in processes:
+            process.terminate()
+
+    drip_up = args.drip_seconds < args.timeout
+    expected_up = {kind: kind in FARM_UP_KINDS and (kind != 'drip' or drip_up) for kind in FARM_KINDS}
+    unexpected = sum(1 for url, is_up in results.items() if is_up != expected_up[sites[url]])
+    mix = {kind: 0 for kind in FARM_KINDS}
+    for kind in sites.values():
+        mix[kind] += 1
+    rounded = lambda value, digits=3: round(value, digits) if value is not None else None
+    report = {
+        'benchmark': 'farm',
+        'version': 1,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('func', 'output', 'compare')},
+        'sites': mix,
+        'results': {
+            'checks': checks,
+            'elapsed_s': rounded(elapsed),
+            'throughput_cps': rounded(checks / elapsed if elapsed else None, 1),
+            'cycle_p50_s': rounded(percentile(cycle_times, 0.50)),
+            'cycle_p99_s': rounded(percentile(cycle_times, 0.99)),
+            'check_p50_ms': rounded(percentile(latencies, 0.50), 2),
+            'check_p99_ms': rounded(percentile(latencies, 0.99), 2),
+            'lag_p50_s': rounded(percentile(lags, 0.50)),
+            'lag_p99_s': rounded(percentile(lags, 0.99)),
+            'cpu_s': rounded(cpu),
+            'cpu_per_check_us': rounded(cpu / checks * 1e6 if checks else None, 1),
+            'peak_rss_mb': peak_rss_mb(),
+            'worker_peak_rss_mb': worker_rss,
+            'unexpected_results': unexpected,
+        },
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('config', {}).get('sites') != args.sites or baseline.get('config', {}).get('mode') != args.mode:
+            print("warning: baseline was run with a different --sites or --mode", file=sys.stderr)
+        regressions = compare_farm_results(report, baseline, args.tolerance)
+        if regressions:
+            print(f"FAIL: {', '.join(regressions)} regressed by more than {args.tolerance}%")
+            return 1
+        print(f"PASS: no metric regressed by more than {args.tolerance}%")
+    return 0
+
+
+def create_app(backend, concurrency, log_dir):
+    """Build a headless DownDetectorApp configured for benchmarking"""
+    os.environ['PROBE_BACKEND'] = backend
+    os.environ['MAX_CONCURRENCY'] = str(concurrency)
+    os.environ['LOG_FILE'] = os.path.join(log_dir, 'benchmark.log')
+    os.environ['WEBSITES_FILE'] = os.path.join(log_dir, 'websites.json')
+    os.environ['SITE_DB'] = os.path.join(log_dir, 'websites.db')
+    os.environ['HISTORY_DIR'] = os.path.join(log_dir, 'history')
+    os.environ['AUTO_UPDATE_CHECK'] = 'false'
+    os.environ['ENABLE_SOUNDS'] = 'false'
+
+    from downdetector import DownDetectorApp
+    return DownDetectorApp(headless=True)
+
+
+def close_app(app):
+    """Flush the app's background writers while the temporary directory still exists"""
+    if app.history_archive is not None:
+        app.history_archive.close()
+    app.log_listener.stop()
+
+
+def bench_probe(args):
+    """Measure checks per second of the configured probe backend"""
+    process, base_url = start_stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as log_dir:
+            app = create_app(args.backend, args.concurrency, log_dir)
+            urls = [f"{base_url}/site/{i}" for i in range(args.sites)]
+            engine = app.get_check_engine()
+
+            # Warm up the engine (thread pool / event loop) before timing
+            list(engine.run_batch(urls[:min(50, len(urls))]))
+
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            failures = 0
+            for _, is_up, _ in engine.run_batch(urls):
+                if not is_up:
+                    failures += 1
+            elapsed = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            engine.shutdown()
+            close_app(app)
+    finally:
+        process.terminate()
+
+    rate = args.sites / elapsed if elapsed else float('inf')
+    print(f"backend={args.backend} concurrency={args.concurrency} sites={args.sites}")
+    print(f"elapsed={elapsed:.2f}s cpu={cpu:.2f}s rate={rate:,.0f} checks/s failures={failures}")
+    if args.interval:
+        verdict = "PASS" if elapsed <= args.interval else "FAIL"
+        print(f"{verdict}: {args.sites} sites within MONITOR_INTERVAL={args.interval}s")
+        return 0 if verdict == "PASS" else 1
+    return 0
+
+
+def bench_logging(args):
+    """Compare check-log throughput of a plain FileHandler with the queued pipeline"""
+    import logging
+    import threading
+
+    def drive(log_check):
+        per_thread = args.records // args.threads
+        barrier = threading.Barrier(args.threads + 1)
+
+        def worker(n):
+            barrier.wait()
+            for i in range(per_thread):
+                log_check(f"https://site-{n}-{i % 100}.example", True, 200, 12.5)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        return per_thread * args.threads, time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        # Baseline: the previous synchronous setup, formatting and flushing on the calling thread
+        logger = logging.getLogger('benchmark-direct')
+        handler = logging.FileHandler(os.path.join(log_dir, 'direct.log'), encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s | %(levelname)-8s | %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+        def direct_check(website, is_up, status, response_time):
+            logger.info(f"CHECK | {website} | {'UP' if is_up else 'DOWN'} | {status} | {response_time:.2f}ms")
+
+        count, direct_time = drive(direct_check)
+        handler.close()
+
+        os.environ['LOG_QUEUE_SIZE'] = str(args.queue_size)
+        app = create_app('threads', 1, log_dir)
+        count, queued_time = drive(app.log_website_check)
+        drain_start = time.perf_counter()
+        app.flush_logs()
+        drain_time = time.perf_counter() - drain_start
+        dropped = app.log_listener.queue_handler.dropped
+        close_app(app)
+
+    print(f"threads={args.threads} records={count} queue_size={args.queue_size}")
+    print(f"direct FileHandler: {count / direct_time:,.0f} records/s on the checking threads")
+    print(f"queued pipeline:    {count / queued_time:,.0f} records/s on the checking threads "
+          f"(+{drain_time:.2f}s background drain, {dropped} dropped)")
+    return 0
+
+
+def bench_history(args):
+    """Time range queries against a generated on-disk history of args.rows records"""
+    import random
+    from downdetector import HistoryArchive
+
+    with tempfile.TemporaryDirectory() as history_dir:
+        archive = HistoryArchive(history_dir, shards=args.shards, flush_interval=3600)
+        urls = [f"https://site-{i}.example" for i in range(args.sites)]
+        for url in urls:
+            archive._site_id(url)
+
+        # Write segments directly: one check per site every (days * 86400 * sites / rows) seconds
+        end = int(time.time()) // 86400 * 86400
+        start = end - args.days * 86400
+        step = args.days * 86400 * args.sites / args.rows
+        header = archive.HEADER.pack(archive.MAGIC, archive.VERSION, archive.RECORD.size, 0)
+        write_start = time.perf_counter()
+        for day in range(args.days):
+            day_start = start + day * 86400
+            day_name = archive.day_name(day_start)
+            os.makedirs(os.path.join(history_dir, day_name))
+            shards = [bytearray(header) for _ in range(args.shards)]
+            rows_per_site = int(86400 / step)
+            for n in range(rows_per_site):
+                timestamp = int(day_start + n * step)
+                for site_id in range(args.sites):
+                    shards[site_id % args.shards] += archive.RECORD.pack(
+                        timestamp, site_id, random.uniform(20, 400), 200, 1)
+            for shard, data in enumerate(shards):
+                with open(archive.segment_path(day_name, shard), 'wb') as f:
+                    f.write(data)
+        write_time = time.perf_counter() - write_start
+
+        compact_start = time.perf_counter()
+        compacted, _ = archive.compact(now=end + 3600)
+        compact_time = time.perf_counter() - compact_start
+        total_bytes = sum(os.path.getsize(os.path.join(root, name))
+                          for root, _, names in os.walk(history_dir) for name in names)
+
+        timings = []
+        rows = 0
+        for url in random.sample(urls, min(args.queries, len(urls))):
+            query_start = time.perf_counter()
+            rows += len(archive.query(url, end - 7 * 86400, end))
+            timings.append(time.perf_counter() - query_start)
+        archive.close()
+
+    timings.sort()
+    print(f"rows={rows_per_site * args.sites * args.days:,} sites={args.sites} days={args.days} "
+          f"size={total_bytes / 1024 ** 2:,.0f}MB")
+    print(f"generate={write_time:.1f}s compact={compact_time:.1f}s ({compacted} segments)")
+    print(f"7-day query: p50={timings[len(timings) // 2] * 1000:.1f}ms "
+          f"max={timings[-1] * 1000:.1f}ms ({rows // len(timings):,} rows per query)")
+    return 0
+
+
+def bench_ratelimit(args):
+    """Measure the check rate achieved overall and per host under RATE_LIMIT_* settings"""
+    import collections
+    from urllib.parse import urlsplit
+
+    addresses = tuple(f"127.0.0.{n}" for n in range(1, args.hosts + 1))
+    process, base_url = start_stub_server(addresses)
+    port = urlsplit(base_url).port
+    try:
+        with tempfile.TemporaryDirectory() as log_dir:
+            os.environ['RATE_LIMIT_GLOBAL'] = str(args.global_rate)
+            os.environ['RATE_LIMIT_PER_HOST'] = str(args.host_rate)
+            os.environ['HOST_MAX_CONCURRENCY'] = str(args.host_concurrency)
+            app = create_app(args.backend, args.concurrency, log_dir)
+            urls = [f"http://{addresses[i % args.hosts]}:{port}/site/{i}" for i in range(args.sites)]
+
+            per_host = collections.Counter()
+            failures = 0
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            for url, is_up, _ in app.run_checks(urls):
+                per_host[urlsplit(url).hostname] += 1
+                if not is_up:
+                    failures += 1
+            elapsed = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            app.check_engine.shutdown()
+            close_app(app)
+    finally:
+        process.terminate()
+
+    rate = args.sites / elapsed if elapsed else float('inf')
+    print(f"backend={args.backend} sites={args.sites} hosts={args.hosts} "
+          f"global_rate={args.global_rate or 'unlimited'} host_rate={args.host_rate or 'unlimited'} "
+          f"host_concurrency={args.host_concurrency or 'unlimited'}")
+    print(f"elapsed={elapsed:.2f}s cpu={cpu:.2f}s rate={rate:,.0f} checks/s failures={failures}")
+    for host, count in sorted(per_host.items()):
+        print(f"  {host}: {count / elapsed:,.1f} checks/s")
+    # A full burst can start immediately, so allow one second's worth of checks on top of the rate
+    limit = min(rate for rate in (args.global_rate, args.host_rate * args.hosts) if rate > 0) \
+        if args.global_rate > 0 or args.host_rate > 0 else 0
+    if limit:
+        verdict = "PASS" if args.sites <= limit * (elapsed + 1) + 1 else "FAIL"
+        print(f"{verdict}: achieved {rate:,.1f} checks/s against a limit of {limit:,.1f} checks/s")
+        return 0 if verdict == "PASS" else 1
+    return 0
+
+
+def bench_import(args):
+    """Time a bulk import of a generated site list and an export of the result"""
+    import random
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ['SITE_STORE'] = args.store
+        app = create_app('threads', 1, work_dir)
+        source = os.path.join(work_dir, f"sites.{args.format}")
+        unique = int(args.lines * (1 - args.duplicates))
+        with open(source, 'w', encoding='utf-8', newline='') as f:
+            if args.format == 'csv':
+                f.write('url,interval,tags\n')
+            for n in range(args.lines):
+                # Every other URL lacks a scheme so the normalization path is exercised too
+                i = n if n < unique else random.randrange(unique)
+                url = f"https://site-{i}.example/health" if i % 2 else f"site-{i}.example/health"
+                if args.format == 'csv':
+                    f.write(f"{url},{30 + i % 5},bench\n")
+                elif args.format == 'jsonl':
+                    f.write(f'{{"url": "{url}", "interval": {30 + i % 5}}}\n')
+                else:
+                    f.write(url + '\n')
+
+        import_start = time.perf_counter()
+        with app.open_site_file(source, 'r') as f:
+            added, duplicates, invalid = app.import_websites(f, args.format)
+        import_time = time.perf_counter() - import_start
+
+        export_times = {}
+        for fmt in ('txt', 'csv', 'jsonl'):
+            export_start = time.perf_counter()
+            with app.open_site_file(os.path.join(work_dir, f"export.{fmt}"), 'w') as f:
+                app.export_websites(f, fmt)
+            export_times[fmt] = time.perf_counter() - export_start
+        app.websites.close()
+        close_app(app)
+
+    print(f"store={args.store} format={args.format} lines={args.lines:,}")
+    print(f"import: {import_time:.2f}s ({args.lines / import_time:,.0f} lines/s) "
+          f"added={added:,} duplicates={duplicates:,} invalid={invalid:,}")
+    for fmt, elapsed in export_times.items():
+        print(f"export {fmt}: {elapsed:.2f}s ({added / elapsed:,.0f} sites/s)")
+    return 0
+
+
+def set_phase_timings(app, enabled):
+    """Switch phase timings on or off, dropping pooled sessions so new connections use the setting"""
+    app.phase_timings = app.session_pool.phase_timings = enabled
+    if app.async_probe is not None:
+        app.async_probe.phase_timings = enabled
+    for session, _, _ in app.session_pool.sessions.values():
+        session.close()
+    app.session_pool.sessions.clear()
+
+
+def bench_timings(args):
+    """Compare CPU per check with and without phase timings
+
+    The stub server closes every connection, so each check resolves, connects
+    and waits for the headers: the worst case for the instrumentation. Modes
+    alternate each round and the fastest round of each counts.
+    """
+    process, base_url = start_stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as log_dir:
+            app = create_app(args.backend, args.concurrency, log_dir)
+            urls = [f"{base_url}/site/{i}" for i in range(args.sites)]
+            engine = app.get_check_engine()
+            list(engine.run_batch(urls[:min(50, len(urls))]))
+
+            best = {False: float('inf'), True: float('inf')}
+            for _ in range(args.rounds):
+                for enabled in (False, True):
+                    set_phase_timings(app, enabled)
+                    cpu_start = time.process_time()
+                    failures = sum(1 for _, is_up, _ in engine.run_batch(urls) if not is_up)
+                    best[enabled] = min(best[enabled], time.process_time() - cpu_start)
+                    if failures:
+                        print(f"warning: {failures} failed checks with PHASE_TIMINGS={enabled}")
+            engine.shutdown()
+            close_app(app)
+    finally:
+        process.terminate()
+
+    off_us, on_us = (best[mode] / args.sites * 1e6 for mode in (False, True))
+    overhead = (on_us - off_us) * 100 / off_us
+    print(f"backend={args.backend} concurrency={args.concurrency} sites={args.sites} rounds={args.rounds}")
+    print(f"cpu per check: off={off_us:.1f}us on={on_us:.1f}us overhead={on_us - off_us:+.1f}us ({overhead:+.2f}%)")
+    verdict = "PASS" if overhead <= args.max_overhead else "FAIL"
+    print(f"{verdict}: phase timings overhead within {args.max_overhead}%")
+    return 0 if verdict == "PASS" else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Down Detector benchmarks")
+    subparsers = parser.add_subparsers(dest='benchmark')
+    subparsers.required = True
+
+    probe = subparsers.add_parser('probe', help='check throughput against a local stub server')
+    probe.add_argument('--sites', type=int, default=10000)
+    probe.add_argument('--backend', choices=['threads', 'asyncio'], default='asyncio')
+    probe.add_argument('--concurrency', type=int, default=500)
+    probe.add_argument('--interval', type=float, default=5.0,
+                       help='cycle budget in seconds (0 to skip the pass/fail verdict)')
+    probe.set_defaults(func=bench_probe)
+
+    logging_bench = subparsers.add_parser('logging', help='check-log throughput with N parallel checking threads')
+    logging_bench.add_argument('--threads', type=int, default=32)
+    logging_bench.add_argument('--records', type=int, default=200000)
+    logging_bench.add_argument('--queue-size', type=int, default=10000)
+    logging_bench.set_defaults(func=bench_logging)
+
+    history = subparsers.add_parser('history', help='7-day query time against a generated on-disk history')
+    history.add_argument('--rows', type=int, default=100000000)
+    history.add_argument('--sites', type=int, default=1000)
+    history.add_argument('--days', type=int, default=90)
+    history.add_argument('--shards', type=int, default=64)
+    history.add_argument('--queries', type=int, default=50)
+    history.set_defaults(func=bench_history)
+
+    ratelimit = subparsers.add_parser('ratelimit', help='check rate under global and per-host rate limits')
+    ratelimit.add_argument('--sites', type=int, default=2000)
+    ratelimit.add_argument('--hosts', type=int, default=4, help='stub hosts on 127.0.0.1..127.0.0.N (Linux)')
+    ratelimit.add_argument('--global-rate', type=float, default=400)
+    ratelimit.add_argument('--host-rate', type=float, default=50)
+    ratelimit.add_argument('--host-concurrency', type=int, default=0)
+    ratelimit.add_argument('--backend', choices=['threads', 'asyncio'], default='asyncio')
+    ratelimit.add_argument('--concurrency', type=int, default=100)
+    ratelimit.set_defaults(func=bench_ratelimit)
+
+    import_bench = subparsers.add_parser('import', help='bulk import and export throughput on a generated site list')
+    import_bench.add_argument('--lines', type=int, default=1000000)
+    import_bench.add_argument('--format', choices=['txt', 'csv', 'jsonl'], default='txt')
+    import_bench.add_argument('--duplicates', type=float, default=0.05, help='fraction of repeated lines')
+    import_bench.add_argument('--store', choices=['sqlite', 'json'], default='sqlite')
+    import_bench.set_defaults(func=bench_import)
+
+    timings = subparsers.add_parser('timings', help='CPU cost of per-phase check timings (PHASE_TIMINGS on vs off)')
+    timings.add_argument('--sites', type=int, default=2000)
+    timings.add_argument('--rounds', type=int, default=5)
+    timings.add_argument('--backend', choices=['threads', 'asyncio'], default='threads')
+    timings.add_argument('--concurrency', type=int, default=50)
+    timings.add_argument('--max-overhead', type=float, default=5.0,
+                         help='fail when timings add more than this percentage of CPU per check (default 5)')
+    timings.set_defaults(func=bench_timings)
+
+    farm = subparsers.add_parser('farm', help='real check path against a simulated farm of slow, failing and hanging sites')
+    farm.add_argument('--sites', type=int, default=1000, help='synthetic sites, 100 to 100000')
+    farm.add_argument('--mode', choices=['check', 'monitor'], default='check',
+                      help='check: full passes like check_all_websites; monitor: the monitor loop for --duration')
+    farm.add_argument('--cycles', type=int, default=5, help='full passes in check mode')
+    farm.add_argument('--duration', type=float, default=30.0, help='seconds to monitor in monitor mode')
+    farm.add_argument('--interval', type=int, default=5, help='check interval in monitor mode')
+    farm.add_argument('--shards', type=int, default=1, help='MONITOR_SHARDS worker processes in monitor mode')
+    farm.add_argument('--shard-key', choices=['host', 'url'], default='url',
+                      help='SHARD_KEY; url by default because the farm has only --hosts hosts')
+    farm.add_argument('--backend', choices=['threads', 'asyncio'], default='asyncio')
+    farm.add_argument('--concurrency', type=int, default=200)
+    farm.add_argument('--timeout', type=int, default=2, help='TIMEOUT for the checks')
+    farm.add_argument('--hosts', type=int, default=4, help='farm hosts on 127.0.0.1..127.0.0.N (Linux)')
+    farm.add_argument('--farm-processes', type=int, default=1, help='farm server processes sharing the port (Linux)')
+    farm.add_argument('--latency', choices=['fixed', 'uniform', 'exponential', 'lognormal', 'pareto'], default='lognormal')
+    farm.add_argument('--latency-ms', type=float, default=20.0, help='median response delay')
+    farm.add_argument('--error-rate', type=float, default=0.02, help='fraction of sites answering --error-status')
+    farm.add_argument('--error-status', type=int, default=500)
+    farm.add_argument('--reset-rate', type=float, default=0.01, help='fraction of sites closing the connection')
+    farm.add_argument('--hang-rate', type=float, default=0.005, help='fraction of sites that never answer')
+    farm.add_argument('--drip-rate', type=float, default=0.01, help='fraction of sites sending their body slowly')
+    farm.add_argument('--drip-seconds', type=float, default=0.5, help='time a slow-drip body takes')
+    farm.add_argument('--redirect-rate', type=float, default=0.05, help='fraction of sites redirecting')
+    farm.add_argument('--redirect-hops', type=int, default=2)
+    farm.add_argument('--seed', type=int, default=1, help='same seed, same site mix and latency sequence')
+    farm.add_argument('--output', help='write the JSON report here instead of stdout')
+    farm.add_argument('--compare', help='baseline JSON report; exit 1 if a metric regressed beyond --tolerance')
+    farm.add_argument('--tolerance', type=float, default=10.0, help='allowed regression in percent (default 10)')
+    farm.set_defaults(func=bench_farm)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,1493 +1,6806 @@
-import requests
-import time
-import os
-import sys
-import json
-import winsound
-import platform
-import subprocess
-import shutil
-import logging
-
-from datetime import datetime
-from colorama import Fore, Back, Style, init
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-# update: .env file
-# update: app version 1.0 from github raw repository
-load_dotenv()
-
-# Initialize colorama for cross-platform colored terminal text
-init(autoreset=True)
-
-class DownDetectorApp:
-    def __init__(self):
-        self.websites = []
-        self.current_version = "2.0"  # Current app version
-        self.github_repo = "gurraoptimus/downdetector"  # Replace with your actual repo
-        self.update_url = f"https://api.github.com/repos/{self.github_repo}/releases/latest"
-        
-        # Load settings from environment variables with defaults
-        self.timeout = int(os.getenv('TIMEOUT', '5'))
-        self.websites_file = os.getenv('WEBSITES_FILE', 'websites.json')
-        self.monitor_interval = int(os.getenv('MONITOR_INTERVAL', '5'))
-        self.animation_speed = float(os.getenv('ANIMATION_SPEED', '0.1'))
-        self.enable_sounds = os.getenv('ENABLE_SOUNDS', 'true').lower() == 'true'
-        self.auto_update_check = os.getenv('AUTO_UPDATE_CHECK', 'true').lower() == 'true'
-        self.log_file = os.getenv('LOG_FILE', 'downdetector.log')
-        self.debug_mode = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
-        
-        # Setup logging
-        self.setup_logging()
-        
-        self.bootup_sequence()
-        self.load_websites()
-        
-        # Check for updates on startup if enabled
-        if self.auto_update_check:
-            self.check_for_updates(silent=True)
-    
-    def get_icon(self, icon_type):
-        """Get ASCII art icons for various elements"""
-        icons = {
-            # Status Icons
-            'online': '🟢',
-            'offline': '🔴',
-            'warning': '🟡',
-            'checking': '🔵',
-            'loading': '⏳',
-            'success': '✅',
-            'error': '❌',
-            'info': 'ℹ️',
-            'check': '✓',
-            
-            # Action Icons
-            'add': '➕',
-            'remove': '➖',
-            'edit': '✏️',
-            'save': '💾',
-            'delete': '🗑️',
-            'refresh': '🔄',
-            'settings': '⚙️',
-            'update': '📱',
-            'download': '⬇️',
-            'upload': '⬆️',
-            
-            # System Icons
-            'computer': '💻',
-            'network': '🌐',
-            'wifi': '📶',
-            'clock': '🕐',
-            'calendar': '📅',
-            'folder': '📁',
-            'file': '📄',
-            'log': '📋',
-            
-            # Navigation Icons
-            'home': '🏠',
-            'back': '⬅️',
-            'forward': '➡️',
-            'up': '⬆️',
-            'down': '⬇️',
-            'menu': '☰',
-            'exit': '🚪',
-            
-            # Monitor Icons
-            'monitor': '📊',
-            'dashboard': '📈',
-            'chart': '📉',
-            'graph': '📊',
-            'stats': '📈',
-            'report': '📄',
-            
-            # ASCII Art Icons
-            'server': '''
-    ┌─────┐
-    │ ▓▓▓ │
-    │ ▓▓▓ │
-    │ ▓▓▓ │
-    └─────┘''',
-            
-            'website': '''
-    ┌─────────┐
-    │ ╔═════╗ │
-    │ ║  🌐 ║ │
-    │ ╚═════╝ │
-    └─────────┘''',
-            
-            'monitor_big': '''
-    ┌─────────────┐
-    │   ◉ ◉ ◉     │
-    │             │
-    │    🌐 📊    │
-    │             │
-    └─────────────┘''',
-            
-            'check_mark': '✓',
-            'cross_mark': '✗',
-            
-            'arrow_right': '▶',
-            'arrow_left': '◀',
-            'arrow_up': '▲',
-            'arrow_down': '▼',
-            'bullet': '●',
-            'diamond': '◆',
-            'star': '★',
-            'heart': '♥',
-            'lightning': '⚡',
-            'shield': '🛡️',
-            'key': '🔑',
-            'lock': '🔒',
-            'unlock': '🔓'
-        }
-        
-        return icons.get(icon_type, '?')
-    
-    def display_animated_icon(self, icon_type, duration=2.0):
-        """Display an animated icon with effects"""
-        icon = self.get_icon(icon_type)
-        
-        # Simple pulse animation
-        for i in range(int(duration * 10)):
-            if i % 10 < 5:
-                print(f"\r{Fore.CYAN}{icon}{Style.RESET_ALL}", end='', flush=True)
-            else:
-                print(f"\r{Fore.YELLOW}{icon}{Style.RESET_ALL}", end='', flush=True)
-            time.sleep(0.1)
-        print()
-    
-    def setup_logging(self):
-        """Setup logging configuration"""
-        try:
-            # Determine log level based on debug mode
-            log_level = logging.DEBUG if self.debug_mode else logging.INFO
-            
-            # Create formatter
-            formatter = logging.Formatter(
-                '%(asctime)s | %(levelname)-8s | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            
-            # Setup file handler
-            file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-            file_handler.setLevel(log_level)
-            file_handler.setFormatter(formatter)
-            
-            # Setup console handler (only for errors and warnings if not in debug mode)
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.WARNING if not self.debug_mode else logging.DEBUG)
-            console_handler.setFormatter(formatter)
-            
-            # Setup logger
-            self.logger = logging.getLogger('DownDetector')
-            self.logger.setLevel(log_level)
-            
-            # Clear existing handlers to avoid duplicates
-            self.logger.handlers.clear()
-            
-            # Add handlers
-            self.logger.addHandler(file_handler)
-            if self.debug_mode:
-                self.logger.addHandler(console_handler)
-            
-            # Log startup
-            self.logger.info(f"Down Detector v{self.current_version} starting up")
-            self.logger.info(f"Log file: {self.log_file}")
-            self.logger.info(f"Debug mode: {'ON' if self.debug_mode else 'OFF'}")
-            
-        except Exception as e:
-            print(f"{Fore.RED}❌ Error setting up logging: {e}")
-            # Create a basic logger as fallback
-            self.logger = logging.getLogger('DownDetector')
-            self.logger.setLevel(logging.INFO)
-    
-    def log_website_check(self, website, is_up, status, response_time=None):
-        """Log website check results"""
-        try:
-            status_text = "UP" if is_up else "DOWN"
-            if response_time:
-                self.logger.info(f"CHECK | {website} | {status_text} | {status} | {response_time:.2f}ms")
-            else:
-                self.logger.info(f"CHECK | {website} | {status_text} | {status}")
-        except Exception as e:
-            self.logger.error(f"Error logging website check: {e}")
-    
-    def log_system_event(self, event_type, message):
-        """Log system events"""
-        try:
-            self.logger.info(f"SYSTEM | {event_type} | {message}")
-        except Exception as e:
-            print(f"Error logging system event: {e}")
-    
-    def log_error(self, error_type, message):
-        """Log errors"""
-        try:
-            self.logger.error(f"ERROR | {error_type} | {message}")
-        except Exception as e:
-            print(f"Error logging error: {e}")
-    
-    def log_update_event(self, event, details=""):
-        """Log update-related events"""
-        try:
-            self.logger.info(f"UPDATE | {event} | {details}")
-        except Exception as e:
-            print(f"Error logging update event: {e}")
-    
-    def create_env_file(self):
-        """Create a .env file with default settings"""
-        env_content = """# Down Detector Configuration
-# Website monitoring timeout in seconds
-TIMEOUT=5
-
-# File to store websites list
-WEBSITES_FILE=websites.json
-
-# Default monitoring interval in seconds
-MONITOR_INTERVAL=5
-
-# Animation speed (0.1 = fast, 0.5 = slow)
-ANIMATION_SPEED=0.1
-
-# Enable sound notifications (true/false)
-ENABLE_SOUNDS=true
-
-# Auto-check for updates on startup (true/false)
-AUTO_UPDATE_CHECK=true
-
-# User Agent for HTTP requests
-USER_AGENT=Mozilla/5.0 (Windows; NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36
-
-# Maximum retries for failed requests
-MAX_RETRIES=3
-
-# Log file path (optional)
-LOG_FILE=downdetector.log
-
-# Enable debug mode (true/false)
-DEBUG_MODE=false
-"""
-        
-        try:
-            with open('.env', 'w') as f:
-                f.write(env_content)
-            return True
-        except Exception as e:
-            print(f"{Fore.RED}❌ Error creating .env file: {e}")
-            return False
-    
-    def check_for_updates(self, silent=False):
-        """Check for application updates from GitHub"""
-        if not silent:
-            self.print_header()
-            self.bounce_text(f"{Fore.WHITE}{Back.BLUE}  🔄 SYSTEM UPDATES  {Style.RESET_ALL}", Fore.WHITE)
-            self.loading_animation("Checking for updates", 1.0)
-        
-        try:
-            headers = {
-                'User-Agent': 'DownDetector-UpdateChecker/1.0',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            response = requests.get(self.update_url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                release_data = response.json()
-                latest_version = release_data.get('tag_name', '').lstrip('v')
-                release_notes = release_data.get('body', 'No release notes available')
-                download_url = release_data.get('html_url', '')
-                published_date = release_data.get('published_at', '')
-                
-                if self.is_newer_version(latest_version, self.current_version):
-                    if not silent:
-                        # Pass the raw download URL for direct file download
-                        raw_download_url = f"https://raw.githubusercontent.com/{self.github_repo}/main/downdetector.py"
-                        self.display_update_available(latest_version, release_notes, download_url, published_date)
-                    else:
-                        print(f"\n{Back.GREEN}{Fore.WHITE} 🔔 UPDATE AVAILABLE {Style.RESET_ALL} Version {latest_version} is available!")
-                        print(f"{Fore.CYAN}ℹ️  Check the updates menu for more details")
-                    return True, latest_version, release_notes, download_url
-                else:
-                    if not silent:
-                        self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ UP TO DATE {Style.RESET_ALL} You're running the latest version!", Fore.GREEN)
-                    return False, self.current_version, "", ""
-            else:
-                if not silent:
-                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ UPDATE CHECK FAILED {Style.RESET_ALL} Unable to check for updates", Fore.RED)
-                return False, "", "", ""
-                
-        except requests.exceptions.RequestException as e:
-            if not silent:
-                print(f"{Fore.RED}❌ Network error while checking updates: {str(e)[:50]}...")
-            return False, "", "", ""
-        except Exception as e:
-            if not silent:
-                print(f"{Fore.RED}❌ Error checking for updates: {str(e)[:50]}...")
-            return False, "", "", ""
-    
-    def is_newer_version(self, latest, current):
-        """Compare version numbers to determine if update is needed"""
-        try:
-            latest_parts = [int(x) for x in latest.split('.')]
-            current_parts = [int(x) for x in current.split('.')]
-            
-            # Pad shorter version with zeros
-            max_len = max(len(latest_parts), len(current_parts))
-            latest_parts += [0] * (max_len - len(latest_parts))
-            current_parts += [0] * (max_len - len(current_parts))
-            
-            return latest_parts > current_parts
-        except:
-            return False
-    
-    def display_update_available(self, version, notes, url, date):
-        """Display update information in a formatted way with icons"""
-        print(f"\n{Back.GREEN}{Fore.WHITE} {self.get_icon('update')} NEW UPDATE AVAILABLE {self.get_icon('lightning')} {Style.RESET_ALL}")
-        
-        update_info = f"""{Fore.CYAN}┌─ Update Information ──────────────────────────────────────┐
-│                                                           │
-│ {self.get_icon('info')} Current Version: {Back.BLUE}{Fore.WHITE} {self.current_version} {Style.RESET_ALL}                      {Fore.CYAN}│
-│ {self.get_icon('download')} Latest Version:  {Back.GREEN}{Fore.WHITE} {version} {Style.RESET_ALL}                        {Fore.CYAN}│
-│ {self.get_icon('calendar')} Release Date:    {date[:10] if date else 'Unknown'}                     {Fore.CYAN}│
-│                                                           │
-│ {Back.YELLOW}{Fore.BLACK} {self.get_icon('file')} RELEASE NOTES {Style.RESET_ALL}                              {Fore.CYAN}│
-│                                                           │"""
-        
-        print(update_info)
-        
-        # Display release notes (first 5 lines)
-        note_lines = notes.split('\n')[:5] if notes else ["No release notes available"]
-        for line in note_lines:
-            if line.strip():
-                print(f"{Fore.CYAN}│ {line[:55]:<55} │")
-        
-        print(f"{Fore.CYAN}│                                                           │")
-        print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
-        
-        print(f"\n{Fore.YELLOW}Update Options:")
-        print(f"{Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} Download and install update")
-        print(f"{Back.BLUE}{Fore.WHITE} 2 {Style.RESET_ALL} Open download page in browser")
-        print(f"{Back.CYAN}{Fore.WHITE} 3 {Style.RESET_ALL} Copy download link to clipboard")
-        print(f"{Back.YELLOW}{Fore.BLACK} 4 {Style.RESET_ALL} View full release notes")
-        print(f"{Back.RED}{Fore.WHITE} 5 {Style.RESET_ALL} Skip this update")
-        
-        choice = input(f"\n{Fore.CYAN}Select option (1-5): ").strip()
-        
-        if choice == '1':
-            self.download_and_install_update(version)
-        elif choice == '2':
-            self.open_browser(url)
-        elif choice == '3':
-            self.copy_to_clipboard(url)
-        elif choice == '4':
-            self.show_full_release_notes(notes)
-        elif choice == '5':
-            self.bounce_text(f"{Fore.YELLOW}Update skipped", Fore.YELLOW)
-        
-        input(f"\n{Fore.CYAN}Press Enter to continue...")
-    
-    def download_and_install_update(self, version):
-        """Download and install the latest version from GitHub"""
-        self.log_update_event("UPDATE_DOWNLOAD_STARTED", f"Starting download of version {version}")
-        try:
-            # Construct the raw file URL
-            raw_url = f"https://raw.githubusercontent.com/{self.github_repo}/main/downdetector.py"
-            
-            print(f"\n{Back.BLUE}{Fore.WHITE} 📥 DOWNLOADING UPDATE {Style.RESET_ALL}")
-            self.loading_animation("Downloading latest version", 2.0)
-            
-            # Download the file
-            headers = {
-                'User-Agent': 'DownDetector-Updater/1.0',
-                'Accept': 'text/plain'
-            }
-            response = requests.get(raw_url, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                # Create backup of current file
-                backup_name = f"downdetector_backup_{self.current_version}.py"
-                try:
-                    shutil.copy(__file__, backup_name)
-                    print(f"{Fore.GREEN}✅ Backup created: {backup_name}")
-                except Exception as e:
-                    print(f"{Fore.YELLOW}⚠️  Could not create backup: {e}")
-                
-                # Save the new version
-                try:
-                    with open(__file__, 'w', encoding='utf-8') as f:
-                        f.write(response.text)
-                    
-                    self.log_update_event("UPDATE_INSTALLED", f"Successfully updated to version {version}")
-                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ UPDATE SUCCESSFUL {Style.RESET_ALL}", Fore.GREEN)
-                    print(f"{Fore.CYAN}📱 Version {version} has been downloaded and installed!")
-                    print(f"{Fore.YELLOW}🔄 Please restart the application to use the new version.")
-                    
-                    restart_choice = input(f"\n{Fore.CYAN}Would you like to restart now? (y/n): ").strip().lower()
-                    if restart_choice in ['y', 'yes']:
-                        self.log_update_event("UPDATE_RESTART", "Application restarting after update")
-                        print(f"\n{Back.BLUE}{Fore.WHITE} 🔄 RESTARTING APPLICATION {Style.RESET_ALL}")
-                        self.loading_animation("Restarting", 1.0)
-                        
-                        # Restart the application
-                        import sys
-                        import subprocess
-                        subprocess.Popen([sys.executable, __file__])
-                        sys.exit(0)
-                    
-                except PermissionError:
-                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ PERMISSION DENIED {Style.RESET_ALL}", Fore.RED)
-                    print(f"{Fore.YELLOW}⚠️  Cannot overwrite file. Run as administrator or manually replace the file.")
-                    print(f"{Fore.CYAN}Download URL: {raw_url}")
-                    
-                except Exception as e:
-                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ WRITE ERROR {Style.RESET_ALL}", Fore.RED)
-                    print(f"{Fore.RED}Error writing file: {e}")
-                    
-            else:
-                self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ DOWNLOAD FAILED {Style.RESET_ALL}", Fore.RED)
-                print(f"{Fore.RED}HTTP {response.status_code}: Could not download update")
-                print(f"{Fore.CYAN}Manual download URL: {raw_url}")
-                
-        except requests.exceptions.RequestException as e:
-            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ NETWORK ERROR {Style.RESET_ALL}", Fore.RED)
-            print(f"{Fore.RED}Network error: {str(e)[:50]}...")
-            print(f"{Fore.CYAN}Manual download URL: https://raw.githubusercontent.com/{self.github_repo}/main/downdetector.py")
-            
-        except Exception as e:
-            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ UPDATE ERROR {Style.RESET_ALL}", Fore.RED)
-            print(f"{Fore.RED}Unexpected error: {str(e)[:50]}...")
-    
-    def open_browser(self, url):
-        """Open URL in default browser"""
-        try:
-            system = platform.system().lower()
-            if system == 'windows':
-                os.startfile(url)
-            elif system == 'darwin':  # macOS
-                subprocess.run(['open', url])
-            else:  # Linux and others
-                subprocess.run(['xdg-open', url])
-            
-            self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ OPENED {Style.RESET_ALL} Download page opened in browser!", Fore.GREEN)
-        except Exception as e:
-            print(f"{Fore.RED}❌ Error opening browser: {e}")
-            print(f"{Fore.YELLOW}Manual download URL: {url}")
-    
-    def copy_to_clipboard(self, text):
-        """Copy text to clipboard"""
-        try:
-            system = platform.system().lower()
-            if system == 'windows':
-                subprocess.run(['clip'], input=text.encode(), check=True)
-            elif system == 'darwin':  # macOS
-                subprocess.run(['pbcopy'], input=text.encode(), check=True)
-            else:  # Linux
-                subprocess.run(['xclip', '-selection', 'clipboard'], input=text.encode(), check=True)
-            
-            self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ COPIED {Style.RESET_ALL} Download link copied to clipboard!", Fore.GREEN)
-        except Exception as e:
-            print(f"{Fore.RED}❌ Error copying to clipboard: {e}")
-            print(f"{Fore.YELLOW}Manual copy: {text}")
-    
-    def show_full_release_notes(self, notes):
-        """Display full release notes"""
-        self.clear_screen()
-        print(f"{Back.BLUE}{Fore.WHITE} 📋 FULL RELEASE NOTES {Style.RESET_ALL}\n")
-        
-        if notes:
-            print(f"{Fore.CYAN}{'='*60}")
-            print(f"{Fore.WHITE}{notes}")
-            print(f"{Fore.CYAN}{'='*60}")
-        else:
-            print(f"{Fore.YELLOW}No detailed release notes available.")
-        
-        input(f"\n{Fore.CYAN}Press Enter to continue...")
-    
-    def system_updates_menu(self):
-        """Main system updates menu with icons"""
-        self.print_header()
-        self.bounce_text(f"{Fore.WHITE}{Back.BLUE}  {self.get_icon('update')} SYSTEM UPDATES {self.get_icon('settings')}  {Style.RESET_ALL}", Fore.WHITE)
-        
-        update_menu = f"""{Fore.CYAN}
-┌─ Update Management ───────────────────────────────────────┐
-│                                                           │
-│ {self.get_icon('info')} Current Version: {Back.BLUE}{Fore.WHITE} Down Detector v{self.current_version} {Style.RESET_ALL}         {Fore.CYAN}│
-│                                                           │
-│ {self.get_icon('settings')} Auto-Check: {Back.BLUE}{Fore.WHITE} {'Enabled' if self.auto_update_check else 'Disabled'} {Style.RESET_ALL}                   {Fore.CYAN}│
-│                                                           │
-│ {Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} {self.get_icon('check')} Check for Updates                          {Fore.CYAN}│
-│ {Back.BLUE}{Fore.WHITE} 2 {Style.RESET_ALL} {self.get_icon('info')} View Current Version Info                  {Fore.CYAN}│
-│ {Back.YELLOW}{Fore.BLACK} 3 {Style.RESET_ALL} {self.get_icon('settings')} Toggle Auto-Update Check                   {Fore.CYAN}│
-│ {Back.MAGENTA}{Fore.WHITE} 4 {Style.RESET_ALL} {self.get_icon('computer')} System Information                         {Fore.CYAN}│
-│ {Back.CYAN}{Fore.BLACK} 5 {Style.RESET_ALL} {self.get_icon('log')} Update History                             {Fore.CYAN}│
-│ {Back.BLACK}{Fore.WHITE} 6 {Style.RESET_ALL} {self.get_icon('back')} Return to Main Menu                        {Fore.CYAN}│
-│                                                           │
-└───────────────────────────────────────────────────────────┘"""
-        
-        print(f"\n{update_menu}")
-        
-        choice = input(f"\n{Fore.YELLOW}Select option (1-6): ").strip()
-        
-        if choice == '1':
-            self.check_for_updates(silent=False)
-        elif choice == '2':
-            self.show_version_info()
-        elif choice == '3':
-            self.toggle_auto_update()
-        elif choice == '4':
-            self.show_system_info()
-        elif choice == '5':
-            self.show_update_history()
-        elif choice == '6':
-            return
-        else:
-            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ INVALID {Style.RESET_ALL} Please select 1-6", Fore.RED)
-        
-        if choice in ['1', '2', '3', '4', '5']:
-            input(f"\n{Fore.CYAN}Press Enter to continue...")
-            self.system_updates_menu()  # Show menu again
-    
-    def show_version_info(self):
-        """Display detailed version information with enhanced styling"""
-        self.loading_animation("Loading version information", 0.8)
-        
-        version_info = f"""{Fore.CYAN}
-┌─ Version Information ─────────────────────────────────────┐
-│                                                           │
-│ {self.get_icon('computer')} Application: Down Detector                             │
-│ {self.get_icon('info')} Version: v{self.current_version}                                      │
-│ {self.get_icon('star')} Developer: Gurraoptimus Development                             │
-│ {self.get_icon('computer')} Platform: {platform.system()} {platform.release()}                     │
-│ {self.get_icon('settings')} Python Version: {platform.python_version()}                        │
-│                                                           │
-│ {self.get_icon('success')} Features in v{self.current_version}:                                    │
-│ {self.get_icon('bullet')} Enhanced UI with comprehensive icon system            │
-│ {self.get_icon('bullet')} Real-time website monitoring                          │
-│ {self.get_icon('bullet')} Animated dashboard interface                          │
-│ {self.get_icon('bullet')} Sound notifications                                   │
-│ {self.get_icon('bullet')} Advanced logging system                               │
-│ {self.get_icon('bullet')} Direct GitHub update downloads                        │
-│ {self.get_icon('bullet')} Multi-platform support                                │
-│ {self.get_icon('bullet')} Professional visual design                            │
-│                                                           │
-└───────────────────────────────────────────────────────────┘
-"""
-        
-        print(f"\n{version_info}")
-    
-    def toggle_auto_update(self):
-        """Toggle automatic update checking"""
-        self.auto_update_check = not self.auto_update_check
-        status = "enabled" if self.auto_update_check else "disabled"
-        
-        self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ UPDATED {Style.RESET_ALL} Auto-update check {status}!", Fore.GREEN)
-        
-        # Update .env file
-        try:
-            env_lines = []
-            if os.path.exists('.env'):
-                with open('.env', 'r') as f:
-                    env_lines = f.readlines()
-            
-            # Update or add AUTO_UPDATE_CHECK line
-            updated = False
-            for i, line in enumerate(env_lines):
-                if line.startswith('AUTO_UPDATE_CHECK='):
-                    env_lines[i] = f"AUTO_UPDATE_CHECK={'true' if self.auto_update_check else 'false'}\n"
-                    updated = True
-                    break
-            
-            if not updated:
-                env_lines.append(f"AUTO_UPDATE_CHECK={'true' if self.auto_update_check else 'false'}\n")
-            
-            with open('.env', 'w') as f:
-                f.writelines(env_lines)
-                
-            print(f"{Fore.CYAN}ℹ️  Setting saved to .env file")
-        except Exception as e:
-            print(f"{Fore.YELLOW}⚠️  Could not update .env file: {e}")
-    
-    def show_system_info(self):
-        """Display comprehensive system information"""
-        self.loading_animation("Gathering system information", 1.0)
-        
-        try:
-            import psutil
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-        except (ImportError, ModuleNotFoundError):
-            cpu_percent = "N/A"
-            memory = None
-            disk = None
-        except Exception:
-            cpu_percent = "N/A"
-            memory = None
-            disk = None
-        
-        system_info = f"""{Fore.CYAN}┌─ System Information ──────────────────────────────────────┐
-│                                                           │
-│ Operating System: {platform.system()} {platform.release()}                │
-│ Architecture: {platform.machine()}                              │
-│ Processor: {platform.processor()[:30]}               │
-│ Python Version: {platform.python_version()}                         │
-│ CPU Usage: {cpu_percent}%                                      │"""
-        
-        if memory:
-            memory_percent = memory.percent
-            system_info += f"""
-│ Memory Usage: {memory_percent}%                                   │"""
-        
-        if disk:
-            disk_percent = disk.percent
-            system_info += f"""
-│ Disk Usage: {disk_percent}%                                     │"""
-        
-        system_info += f"""
-│                                                           │
-│ Application Details:                                      │
-│ • Config File: {self.websites_file}                           │
-│ • Websites Monitored: {len(self.websites)}                              │
-│ • Timeout Setting: {self.timeout}s                               │
-│ • Sound Effects: {'On' if self.enable_sounds else 'Off'}                                │
-│                                                           │
-└───────────────────────────────────────────────────────────┘"""
-        
-        print(f"\n{system_info}")
-    
-    def show_update_history(self):
-        """Display update history (simulated for now)"""
-        self.loading_animation("Loading update history", 0.8)
-        
-        # This is a simulated update history - in a real app, you'd store this data
-        history = [
-            {"version": "1.0", "date": "2025-10-21", "type": "Major", "description": "Initial release with full features"}
-        ]
-        
-        print(f"\n{Back.BLUE}{Fore.WHITE} 📊 UPDATE HISTORY {Style.RESET_ALL}")
-        print(f"\n{Fore.CYAN}┌─ Version History ─────────────────────────────────────────┐")
-        print(f"{Fore.CYAN}│ {Back.BLUE}{Fore.WHITE} Ver.  {Style.RESET_ALL} {Back.BLUE}{Fore.WHITE} Date       {Style.RESET_ALL} {Back.BLUE}{Fore.WHITE} Type  {Style.RESET_ALL} {Back.BLUE}{Fore.WHITE} Description            {Style.RESET_ALL} {Fore.CYAN}│")
-        print(f"{Fore.CYAN}├──────┼────────────┼───────┼────────────────────────┤")
-        
-        for update in history:
-            version = update["version"]
-            date = update["date"]
-            update_type = update["type"]
-            desc = update["description"][:20] + "..." if len(update["description"]) > 20 else update["description"]
-            
-            # Highlight current version
-            if version == self.current_version:
-                print(f"{Fore.CYAN}│ {Back.GREEN}{Fore.WHITE}{version:<6}{Style.RESET_ALL} │ {date}  │ {update_type:<5} │ {desc:<22} {Fore.CYAN}│")
-            else:
-                print(f"{Fore.CYAN}│ {version:<6} │ {date}  │ {update_type:<5} │ {desc:<22} │")
-        
-        print(f"{Fore.CYAN}└──────┴────────────┴───────┴────────────────────────┘")
-        print(f"{Fore.YELLOW}💡 Tip: Enable auto-update check to stay current!")
-
-    def reload_env_settings(self):
-        """Reload environment variables"""
-        load_dotenv(override=True)
-        self.timeout = int(os.getenv('TIMEOUT', '5'))
-        self.websites_file = os.getenv('WEBSITES_FILE', 'websites.json')
-        self.monitor_interval = int(os.getenv('MONITOR_INTERVAL', '5'))
-        self.animation_speed = float(os.getenv('ANIMATION_SPEED', '0.1'))
-        self.enable_sounds = os.getenv('ENABLE_SOUNDS', 'true').lower() == 'true'
-        self.auto_update_check = os.getenv('AUTO_UPDATE_CHECK', 'true').lower() == 'true'
-
-    def bootup_sequence(self):
-        """Animated bootup sequence"""
-        self.clear_screen()
-        
-        
-        # Check for .env file
-        if not os.path.exists('.env'):
-            print(f"{Fore.YELLOW}⚠️  No .env file found. Creating default configuration...")
-            if self.create_env_file():
-                print(f"{Fore.GREEN}✅ Default .env file created successfully!")
-                time.sleep(1)
-        
-        # ASCII Art Logo with enhanced visual design
-        logo = [
-            "╔═══════════════════════════════════════════════════════════════════╗",
-            "║ ██████╗  ██████╗ ██╗    ██╗███╗   ██╗    🌐                        ║",
-            "║ ██╔══██╗██╔═══██╗██║    ██║████╗  ██║   📊                         ║",
-            "║ ██║  ██║██║   ██║██║ █╗ ██║██╔██╗ ██║    ⚡                        ║",
-            "║ ██║  ██║██║   ██║██║███╗██║██║╚██╗██║                              ║",
-            "║ ██████╔╝╚██████╔╝╚███╔███╔╝██║ ╚████║     🔍                      ║",
-            "║ ╚═════╝  ╚═════╝  ╚══╝╚══╝ ╚═╝  ╚═══╝    📱                       ║",
-            "║                                          💻                       ║",
-            "║ ██████╗ ███████╗████████╗███████╗ ██████╗████████╗ ██████╗ ██████╗ ║",
-            "║ ██╔══██╗██╔════╝╚══██╔══╝██╔════╝██╔════╝╚══██╔══╝██╔═══██╗██╔══██╗║",
-            "║ ██║  ██║█████╗     ██║   █████╗  ██║        ██║   ██║   ██║██████╔╝║",
-            "║ ██║  ██║██╔══╝     ██║   ██╔══╝  ██║        ██║   ██║   ██║██╔══██╗║",
-            "║ ██████╔╝███████╗   ██║   ███████╗╚██████╗   ██║   ╚██████╔╝██║  ██║║",
-            "║ ╚═════╝ ╚══════╝   ╚═╝   ╚══════╝ ╚═════╝   ╚═╝    ╚═════╝ ╚═╝  ╚═╝║",
-            "║                      🚀 Real-Time Monitoring 🚀                   ║",
-            "╚═══════════════════════════════════════════════════════════════════╝"
-        ]
-        
-        # Display logo with animation
-        print(f"{Fore.CYAN}")
-        for line in logo:
-            print(line)
-            time.sleep(self.animation_speed * 0.5)
-        print(Style.RESET_ALL)
-        
-        # System info display with icons
-        system_info = [
-            f"{Fore.GREEN}[{self.get_icon('computer')}] Initializing Down Detector v{self.current_version}...",
-            f"{Fore.GREEN}[{self.get_icon('star')}] Developed by Gurraoptimus Development",
-            f"{Fore.GREEN}[{self.get_icon('settings')}] Loading core modules...",
-            f"{Fore.YELLOW}[{self.get_icon('check')}] Checking system requirements...",
-            f"{Fore.YELLOW}[{self.get_icon('network')}] Loading network stack...",
-            f"{Fore.YELLOW}[{self.get_icon('monitor')}] Initializing monitoring engine...",
-            f"{Fore.BLUE}[{self.get_icon('file')}] Loading configuration files...",
-            f"{Fore.BLUE}[{self.get_icon('settings')}] Loading .env settings...",
-            f"{Fore.BLUE}[{self.get_icon('settings')}] Setting up user preferences...",
-            f"{Fore.MAGENTA}[{self.get_icon('update')}] Checking for system updates...",
-            f"{Fore.MAGENTA}[{self.get_icon('success')}] System initialized successfully!"
-        ]
-        
-        print(f"\n{Fore.WHITE}SYSTEM BOOTUP SEQUENCE{Style.RESET_ALL}")
-        print("=" * 60)
-        
-        for info in system_info:
-            print(info)
-            time.sleep(self.animation_speed * 2)
-            
-        # Progress bar for final initialization
-        print(f"\n{Fore.CYAN}Final initialization:")
-        self.progress_bar(1.5, 40)
-        
-        # Success message with icons and sound
-        self.play_pop_sound("online")
-        print(f"\n{Back.GREEN}{Fore.WHITE} {self.get_icon('success')} SYSTEM READY - DOWN DETECTOR ONLINE {self.get_icon('lightning')} {Style.RESET_ALL}\n")
-        time.sleep(0.5)
-    
-    def reboot_system(self):
-        """Reboot the application with full shutdown and restart sequence"""
-        self.print_header()
-        print(f"\n{Fore.WHITE}{Back.BLUE}  🔄 SYSTEM REBOOT  {Style.RESET_ALL}\n")
-        
-        confirm = input(f"{Fore.YELLOW}⚠️  Are you sure you want to reboot the system? (y/n): ").strip().lower()
-        
-        if confirm in ['y', 'yes']:
-            # Shutdown sequence
-            self.typewriter_effect(f"{Fore.YELLOW}Initiating system reboot sequence...")
-            
-            shutdown_steps = [
-                f"{Fore.RED}[SHUTDOWN] Stopping monitoring services...",
-                f"{Fore.RED}[SHUTDOWN] Closing network connections...",
-                f"{Fore.RED}[SHUTDOWN] Saving current state...",
-                f"{Fore.RED}[SHUTDOWN] Clearing memory buffers...",
-                f"{Fore.RED}[SHUTDOWN] Terminating processes...",
-                f"{Fore.RED}[SHUTDOWN] System shutdown complete."
-            ]
-            
-            for step in shutdown_steps:
-                print(step)
-                time.sleep(0.4)
-            
-            # Shutdown progress bar
-            print(f"\n{Fore.RED}Shutdown progress:")
-            self.progress_bar(2, 40)
-            
-            self.play_pop_sound("offline")
-            print(f"\n{Back.RED}{Fore.WHITE} 🔌 SYSTEM OFFLINE {Style.RESET_ALL}")
-            time.sleep(1)
-            
-            # Clear screen and show rebooting message
-            self.clear_screen()
-            print(f"{Back.YELLOW}{Fore.BLACK} 🔄 REBOOTING... {Style.RESET_ALL}")
-            time.sleep(2)
-            
-            # Restart the application
-            self.__init__()
-            
-        else:
-            self.bounce_text(f"{Fore.YELLOW}❌ Reboot cancelled", Fore.YELLOW)
-            input(f"\n{Fore.CYAN}Press Enter to return to menu...")
-    
-    def play_pop_sound(self, sound_type="default"):
-        """Play different Windows sounds for different events"""
-        if not self.enable_sounds:
-            return
-            
-        try:
-            if sound_type == "online":
-                winsound.MessageBeep(winsound.MB_OK)
-            elif sound_type == "offline":
-                winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-            elif sound_type == "error":
-                winsound.MessageBeep(winsound.MB_ICONHAND)
-            else:
-                winsound.MessageBeep(winsound.MB_ICONASTERISK)
-        except ImportError:
-            try:
-                print('\a', end='', flush=True)
-            except:
-                pass
-    def loading_animation(self, text="Loading", duration=2):
-        """Animated loading spinner"""
-        frames = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
-        end_time = time.time() + duration
-        
-        while time.time() < end_time:
-            for frame in frames:
-                if time.time() >= end_time:
-                    break
-                print(f"\r{Fore.CYAN}{frame} {text}...", end="", flush=True)
-                time.sleep(self.animation_speed)
-        print("\r" + " " * (len(text) + 10) + "\r", end="", flush=True)
-    
-    def typewriter_effect(self, text, delay=None):
-        """Typewriter animation for text"""
-        if delay is None:
-            delay = self.animation_speed * 0.2
-        for char in text:
-            print(char, end='', flush=True)
-            time.sleep(delay)
-        print()
-    
-    def progress_bar(self, duration=2, width=40):
-        """Animated progress bar"""
-        for i in range(width + 1):
-            progress = i / width
-            filled = int(width * progress)
-            bar = f"{Fore.GREEN}{'█' * filled}{Fore.LIGHTBLACK_EX}{'░' * (width - filled)}"
-            percent = int(progress * 100)
-            print(f"\r{bar} {Fore.CYAN}{percent}%", end="", flush=True)
-            time.sleep(duration / width)
-        print()
-    
-    def bounce_text(self, text, color=Fore.CYAN):
-        """Bouncing text animation"""
-        self.play_pop_sound()
-        for _ in range(2):
-            print(f"\r{color}{text}", end="", flush=True)
-            time.sleep(self.animation_speed * 2)
-            print(f"\r{' ' * len(text)}", end="", flush=True)
-            time.sleep(self.animation_speed)
-        print(f"\r{color}{text}")
-    
-    def fade_in_text(self, text, color=Fore.WHITE):
-        """Fade in effect for text"""
-        colors = [Fore.LIGHTBLACK_EX, color]
-        for fade_color in colors:
-            print(f"\r{fade_color}{text}", end="", flush=True)
-            time.sleep(self.animation_speed * 2)
-        print()
-    
-    def animated_border(self, width=60):
-        """Animated border drawing"""
-        print(f"{Fore.CYAN}╔", end="", flush=True)
-        for _ in range(width):
-            print("═", end="", flush=True)
-            time.sleep(self.animation_speed * 0.05)
-        print("╗")
-        
-        print(f"{Fore.CYAN}║{' ' * width}║")
-        
-        print(f"{Fore.CYAN}╚", end="", flush=True)
-        for _ in range(width):
-            print("═", end="", flush=True)
-            time.sleep(self.animation_speed * 0.05)
-        print("╝")
-    
-    def pulsing_status(self, status, is_online):
-        """Pulsing status indicator"""
-        colors = [Fore.GREEN, Fore.LIGHTGREEN_EX] if is_online else [Fore.RED, Fore.LIGHTRED_EX]
-        symbol = "●"
-        
-        for color in colors:
-            print(f"\r{color}{symbol} {status}", end="", flush=True)
-            time.sleep(self.animation_speed * 2)
-        print()
-    
-    def load_websites(self):
-        """Load websites from file with animation"""
-        self.loading_animation("Loading configuration", 0.5)
-        try:
-            if os.path.exists(self.websites_file):
-                with open(self.websites_file, 'r') as f:
-                    data = json.load(f)
-                    self.websites = data.get('websites', [])
-                    # Don't override timeout from .env with file value
-        except (json.JSONDecodeError, FileNotFoundError):
-            self.websites = []
-    
-    def save_websites(self):
-        """Save websites to file with animation"""
-        try:
-            self.loading_animation("Saving configuration", 0.3)
-            data = {
-                'websites': self.websites,
-                'timeout': self.timeout
-            }
-            with open(self.websites_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            self.play_pop_sound("online")
-        except Exception as e:
-            print(f"{Fore.RED}❌ Error saving websites: {e}")
-    
-    def reset_system(self):
-        """Reset the app to default state with animations"""
-        self.print_header()
-        print(f"\n{Fore.WHITE}{Back.RED}  🔄 SYSTEM RESET  {Style.RESET_ALL}\n")
-        
-        self.typewriter_effect(f"{Fore.YELLOW}Initializing system reset...")
-        time.sleep(0.3)
-        
-        print(f"{Fore.YELLOW}┌─ Reset Options ───────────────────────────┐")
-        print(f"{Fore.YELLOW}│ This operation will:                     │")
-        print(f"{Fore.YELLOW}│ • Clear all monitored websites           │")
-        print(f"{Fore.YELLOW}│ • Reset timeout to default (5 seconds)   │")
-        print(f"{Fore.YELLOW}│ • Delete configuration file              │")
-        print(f"{Fore.YELLOW}│ • Keep .env file settings                │")
-        print(f"{Fore.YELLOW}└───────────────────────────────────────────┘")
-        
-        confirm = input(f"\n{Fore.RED}⚠️  Confirm reset (type 'yes' to proceed): ").strip().lower()
-        
-        if confirm == 'yes':
-            self.loading_animation("Resetting system", 1.5)
-            self.websites = []
-            
-            try:
-                if os.path.exists(self.websites_file):
-                    os.remove(self.websites_file)
-                self.bounce_text(f"{Fore.GREEN}✅ System successfully reset!", Fore.GREEN)
-                print(f"{Fore.CYAN}ℹ️  All configuration data cleared")
-                print(f"{Fore.CYAN}ℹ️  .env file preserved")
-            except Exception as e:
-                print(f"\n{Fore.RED}❌ Reset failed: {e}")
-        else:
-            self.bounce_text(f"{Fore.YELLOW}❌ Reset cancelled", Fore.YELLOW)
-        
-        input(f"\n{Fore.CYAN}Press Enter to return to menu...")
-    
-    def clear_screen(self):
-        """Clear the terminal screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
-    
-    def display_app_icon(self):
-        """Display the main application icon"""
-        icon_art = f"""
-{Fore.CYAN}         ╔═══════════════════════════════╗
-         ║        {self.get_icon('network')} DOWN DETECTOR {self.get_icon('monitor')}        ║
-         ║                               ║
-         ║   {self.get_icon('check')} Real-Time Monitoring {self.get_icon('lightning')}   ║
-         ║   {self.get_icon('computer')} Website Status Checker {self.get_icon('wifi')} ║
-         ║                               ║
-         ║     {self.get_icon('star')} v{self.current_version} - Ready! {self.get_icon('success')}     ║
-         ╚═══════════════════════════════╝{Style.RESET_ALL}
-        """
-        print(icon_art)
-    
-    def display_status_icons(self, status, website_name=""):
-        """Display status-specific icons with animations"""
-        if status.upper() == "ONLINE" or status == True:
-            icon = self.get_icon('online')
-            color = Fore.GREEN
-            bg_color = Back.GREEN
-            text_color = Fore.WHITE
-        elif status.upper() == "OFFLINE" or status == False:
-            icon = self.get_icon('offline')
-            color = Fore.RED
-            bg_color = Back.RED
-            text_color = Fore.WHITE
-        elif status.upper() == "CHECKING":
-            icon = self.get_icon('checking')
-            color = Fore.BLUE
-            bg_color = Back.BLUE
-            text_color = Fore.WHITE
-        elif status.upper() == "WARNING":
-            icon = self.get_icon('warning')
-            color = Fore.YELLOW
-            bg_color = Back.YELLOW
-            text_color = Fore.BLACK
-        else:
-            icon = self.get_icon('info')
-            color = Fore.CYAN
-            bg_color = Back.CYAN
-            text_color = Fore.BLACK
-        
-        if website_name:
-            print(f"{bg_color}{text_color} {icon} {status.upper()} {Style.RESET_ALL} {color}{website_name}{Style.RESET_ALL}")
-        else:
-            print(f"{bg_color}{text_color} {icon} {status.upper()} {Style.RESET_ALL}")
-        
-        return icon
-    
-    def print_header(self):
-        """Print the app header with animated design and icons"""
-        self.clear_screen()
-        
-        # Enhanced header with icons
-        header_lines = [
-            "╔══════════════════════════════════════════════════════════╗",
-            f"║               {self.get_icon('network')} DOWN DETECTOR {self.get_icon('monitor')}               ║",
-            f"║              {self.get_icon('computer')} Real-Time Website Monitor {self.get_icon('wifi')}            ║",
-            f"║            {self.get_icon('settings')} Built by: Gurraoptimus Development {self.get_icon('star')}         ║",
-            "╚══════════════════════════════════════════════════════════╝"
-        ]
-        
-        print(f"{Back.BLUE}{Fore.WHITE}")
-        for line in header_lines:
-            print(line)
-        print(Style.RESET_ALL)
-        
-        # Enhanced navigation with icons
-        nav_items = f" {self.get_icon('home')} HOME {self.get_icon('monitor')} MONITOR {self.get_icon('settings')} SETTINGS {self.get_icon('update')} UPDATES {self.get_icon('info')} ABOUT "
-        print(f"{Back.CYAN}{Fore.BLACK} {nav_items} {Style.RESET_ALL}\n")
-    
-    def print_menu(self):
-        """Print the main menu with animations and icons"""
-        menu_content = f"""{Fore.CYAN}┌─ Main Menu ──────────────────────────────────────────────┐
-│                                                           │
-│  {Back.GREEN}{Fore.BLACK} 1 {Style.RESET_ALL} {self.get_icon('add')} Add Website    {Back.GREEN}{Fore.BLACK} 2 {Style.RESET_ALL} {self.get_icon('remove')} Remove Website {Fore.CYAN}│
-│                                                           │
-│  {Back.BLUE}{Fore.WHITE} 3 {Style.RESET_ALL} {self.get_icon('file')} View List      {Back.BLUE}{Fore.WHITE} 4 {Style.RESET_ALL} {self.get_icon('check')} Check All      {Fore.CYAN}│
-│                                                           │
-│  {Back.MAGENTA}{Fore.WHITE} 5 {Style.RESET_ALL} {self.get_icon('monitor')} Start Monitor  {Back.YELLOW}{Fore.BLACK} 6 {Style.RESET_ALL} {self.get_icon('settings')} Settings       {Fore.CYAN}│
-│                                                           │
-│  {Back.CYAN}{Fore.BLACK} 7 {Style.RESET_ALL} {self.get_icon('update')} System Updates {Back.RED}{Fore.WHITE} 8 {Style.RESET_ALL} {self.get_icon('refresh')} Reset System   {Fore.CYAN}│
-│                                                           │
-│  {Back.LIGHTBLACK_EX}{Fore.WHITE} 9 {Style.RESET_ALL} {self.get_icon('computer')} Reboot App     {Back.BLACK}{Fore.WHITE} 0 {Style.RESET_ALL} {self.get_icon('exit')} Exit App       {Fore.CYAN}│
-│                                                           │
-└───────────────────────────────────────────────────────────┘"""
-        
-        print(menu_content)
-        
-        # Enhanced status bar with icons
-        status_info = f" {self.get_icon('stats')} Status: {len(self.websites)} websites | {self.get_icon('info')} v{self.current_version} | {self.get_icon('clock')} Timeout: {self.timeout}s | {self.get_icon('settings')} Sounds: {'ON' if self.enable_sounds else 'OFF'} "
-        print(f"\n{Back.LIGHTBLACK_EX}{Fore.WHITE}{status_info}{Style.RESET_ALL}")
-        self.pulsing_status("System Ready", True)
-    
-    def add_website(self):
-        """Add a website to monitor with animated design and icons"""
-        self.print_header()
-        self.bounce_text(f"{Fore.WHITE}{Back.GREEN}  {self.get_icon('add')} ADD NEW WEBSITE {self.get_icon('network')}  {Style.RESET_ALL}", Fore.WHITE)
-        
-        print(f"\n{Fore.CYAN}┌─ Website Registration Form ──────────────────────────────┐")
-        print(f"{Fore.CYAN}│                                                           │")
-        
-        url = input(f"{Fore.CYAN}│ {self.get_icon('network')} Website URL: {Fore.YELLOW}").strip()
-        print(f"{Fore.CYAN}│                                                           │")
-        print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
-        
-        if url:
-            self.loading_animation("Validating URL", 0.8)
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            if url not in self.websites:
-                self.websites.append(url)
-                self.save_websites()
-                self.log_system_event("WEBSITE_ADDED", f"Added website: {url}")
-                self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ SUCCESS {Style.RESET_ALL} Website added successfully!", Fore.GREEN)
-            else:
-                self.log_system_event("WEBSITE_ADD_FAILED", f"Website already exists: {url}")
-                self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} ⚠️  WARNING {Style.RESET_ALL} Website already exists!", Fore.YELLOW)
-        else:
-            self.log_system_event("WEBSITE_ADD_FAILED", "Invalid URL provided")
-            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ ERROR {Style.RESET_ALL} Invalid URL provided!", Fore.RED)
-        
-        input(f"\n{Fore.CYAN}Press Enter to continue...")
-
-    def remove_website(self):
-        """Remove a website from monitoring with improved UI and animations"""
-        self.print_header()
-        self.bounce_text(f"{Fore.WHITE}{Back.RED}  ➖ REMOVE WEBSITE  {Style.RESET_ALL}", Fore.WHITE)
-        
-        if not self.websites:
-            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ NO WEBSITES {Style.RESET_ALL} No websites configured!", Fore.RED)
-            input(f"\n{Fore.CYAN}Press Enter to continue...")
-            return
-        
-        options = f"""{Fore.YELLOW}┌─ Removal Options ────────────────────────────────────────┐
-│ {Back.BLUE}{Fore.WHITE} 1 {Style.RESET_ALL} Remove single website                            {Fore.YELLOW}│
-│ {Back.RED}{Fore.WHITE} 2 {Style.RESET_ALL} Remove all websites                              {Fore.YELLOW}│
-│ {Back.BLACK}{Fore.WHITE} 3 {Style.RESET_ALL} Cancel operation                                 {Fore.YELLOW}│
-└───────────────────────────────────────────────────────────┘"""
-        
-        print(f"\n{options}")
-        
-        option = input(f"\n{Fore.CYAN}Select option (1-3): ").strip()
-        
-        if option == '1':
-            self.loading_animation("Loading website list", 0.5)
-            print(f"\n{Fore.CYAN}┌─ Website Selection ───────────────────────────────────────┐")
-            for i, website in enumerate(self.websites, 1):
-                print(f"{Fore.CYAN}│ {Back.GREEN}{Fore.WHITE} {i} {Style.RESET_ALL} {website[:50]:<50} {Fore.CYAN}│")
-            print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
-            
-            try:
-                choice = int(input(f"\n{Fore.YELLOW}Enter website number: "))
-                if 1 <= choice <= len(self.websites):
-                    self.loading_animation("Removing website", 0.8)
-                    removed = self.websites.pop(choice - 1)
-                    self.save_websites()
-                    self.log_system_event("WEBSITE_REMOVED", f"Removed website: {removed}")
-                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ REMOVED {Style.RESET_ALL} {removed}", Fore.GREEN)
-                else:
-                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ INVALID {Style.RESET_ALL} Please select a valid number!", Fore.RED)
-            except ValueError:
-                self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ ERROR {Style.RESET_ALL} Invalid input!", Fore.RED)
-        
-        elif option == '2':
-            confirm = input(f"\n{Fore.RED}⚠️  Type 'DELETE ALL' to confirm removal: ").strip()
-            if confirm == 'DELETE ALL':
-                self.loading_animation("Removing all websites", 1.2)
-                count = len(self.websites)
-                self.websites.clear()
-                self.save_websites()
-                self.log_system_event("ALL_WEBSITES_REMOVED", f"Removed {count} websites")
-                self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ SUCCESS {Style.RESET_ALL} All websites removed!", Fore.GREEN)
-            else:
-                self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} ❌ CANCELLED {Style.RESET_ALL} Operation cancelled!", Fore.YELLOW)
-        
-        input(f"\n{Fore.CYAN}Press Enter to continue...")
-    
-    def view_websites(self):
-        """Display all websites in a table format with animations and icons"""
-        self.print_header()
-        self.bounce_text(f"{Fore.WHITE}{Back.BLUE}  {self.get_icon('dashboard')} WEBSITE DASHBOARD {self.get_icon('monitor')}  {Style.RESET_ALL}", Fore.WHITE)
-        
-        if not self.websites:
-            self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} {self.get_icon('warning')} NO DATA {Style.RESET_ALL} No websites configured yet!", Fore.YELLOW)
-        else:
-            self.loading_animation("Loading dashboard", 0.8)
-            
-            print(f"\n{Fore.CYAN}┌─ Monitored Websites ──────────────────────────────────────┐")
-            print(f"{Fore.CYAN}│ {Back.BLUE}{Fore.WHITE} # {Style.RESET_ALL} {Back.BLUE}{Fore.WHITE} {self.get_icon('network')} Website URL                                 {Style.RESET_ALL} {Fore.CYAN}│")
-            print(f"{Fore.CYAN}├───┼──────────────────────────────────────────────────────┤")
-            
-            for i, website in enumerate(self.websites, 1):
-                print(f"{Fore.CYAN}│ {i:>1} │ {self.get_icon('bullet')} {website:<46} │")
-            
-            print(f"{Fore.CYAN}└───┴──────────────────────────────────────────────────────┘")
-        
-        input(f"\n{Fore.CYAN}Press Enter to continue...")
-    
-    def check_website(self, url):
-        """Check if a single website is up or down"""
-        start_time = time.time()
-        try:
-            headers = {
-                'User-Agent': os.getenv('USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-            }
-            response = requests.get(url, timeout=self.timeout, headers=headers)
-            response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-            
-            if response.status_code == 200:
-                self.log_website_check(url, True, response.status_code, response_time)
-                return True, response.status_code
-            else:
-                self.log_website_check(url, False, response.status_code, response_time)
-                return False, response.status_code
-        except requests.exceptions.RequestException as e:
-            response_time = (time.time() - start_time) * 1000
-            error_msg = str(e)[:50]
-            self.log_website_check(url, False, error_msg, response_time)
-            return False, error_msg
-        except Exception as e:
-            response_time = (time.time() - start_time) * 1000
-            error_msg = f"Error: {str(e)[:40]}"
-            self.log_website_check(url, False, error_msg, response_time)
-            return False, error_msg
-    
-    def check_all_websites(self):
-        """Check all websites once with animated dashboard-style results and icons"""
-        self.print_header()
-        self.bounce_text(f"{Fore.WHITE}{Back.MAGENTA}  {self.get_icon('check')} WEBSITE STATUS CHECK {self.get_icon('monitor')}  {Style.RESET_ALL}", Fore.WHITE)
-        
-        if not self.websites:
-            self.bounce_text(f"{Back.RED}{Fore.WHITE} {self.get_icon('error')} NO WEBSITES {Style.RESET_ALL} No websites to check!", Fore.RED)
-            input(f"\n{Fore.CYAN}Press Enter to continue...")
-            return
-        
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\n{Back.LIGHTBLACK_EX}{Fore.WHITE} {self.get_icon('clock')} Scan Time: {timestamp} {Style.RESET_ALL}")
-        
-        print(f"\n{Fore.CYAN}┌─ Live Status Report ──────────────────────────────────────┐")
-        
-        for website in self.websites:
-            self.loading_animation(f"Checking {website[:30]}", 0.3)
-            is_up, status = self.check_website(website)
-            
-            if is_up:
-                status_display = f"{Back.GREEN}{Fore.WHITE} {self.get_icon('online')} ONLINE {Style.RESET_ALL}"
-                self.play_pop_sound("online")
-            else:
-                status_display = f"{Back.RED}{Fore.WHITE} {self.get_icon('offline')} OFFLINE {Style.RESET_ALL}"
-                self.play_pop_sound("offline")
-            
-            print(f"{Fore.CYAN}│ {status_display} {website[:40]:<40} {Fore.YELLOW}({status}) {Fore.CYAN}│")
-        
-        print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
-        input(f"\n{Fore.CYAN}Press Enter to continue...")
-    
-    def monitor_websites(self):
-        """Start continuous monitoring with animated real-time dashboard"""
-        if not self.websites:
-            self.print_header()
-            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ NO WEBSITES {Style.RESET_ALL} No websites configured!", Fore.RED)
-            input(f"\n{Fore.CYAN}Press Enter to continue...")
-            return
-        
-        interval = input(f"{Fore.YELLOW}Monitor interval (seconds, default {self.monitor_interval}): ").strip()
-        try:
-            interval = int(interval) if interval else self.monitor_interval
-        except ValueError:
-            interval = self.monitor_interval
-        
-        self.loading_animation("Starting monitoring system", 1.5)
-        self.log_system_event("MONITORING_STARTED", f"Started monitoring {len(self.websites)} websites with {interval}s interval")
-        
-        try:
-            cycle = 0
-            while True:
-                self.clear_screen()
-                
-                monitor_header = f"{Fore.WHITE}{Back.MAGENTA}  🚀 LIVE MONITORING ACTIVE  {Style.RESET_ALL}"
-                print(monitor_header)
-                
-                print(f"\n{Back.BLUE}{Fore.WHITE} Interval: {interval}s | Websites: {len(self.websites)} | Cycle: {cycle} | Press Ctrl+C to stop {Style.RESET_ALL}")
-                
-                timestamp = datetime.now().strftime('%H:%M:%S')
-                print(f"\n{Back.CYAN}{Fore.BLACK} ⟲ Live Update - {timestamp} {Style.RESET_ALL}")
-                
-                self.progress_bar(0.3, 30)
-                print("═" * 60)
-                
-                for website in self.websites:
-                    print(f"{Fore.YELLOW}⟳ Checking {website[:35]:<35}", end="", flush=True)
-                    is_up, status = self.check_website(website)
-                    print("\r" + " " * 60 + "\r", end="")
-                    
-                    if is_up:
-                        status_indicator = f"{Back.GREEN}{Fore.WHITE} ● {Style.RESET_ALL}"
-                        status_text = f"{Fore.GREEN}ONLINE"
-                        self.play_pop_sound("online")
-                    else:
-                        status_indicator = f"{Back.RED}{Fore.WHITE} ● {Style.RESET_ALL}"
-                        status_text = f"{Fore.RED}OFFLINE"
-                        self.play_pop_sound("offline")
-                    
-                    print(f"{status_indicator} {website[:35]:<35} {status_text} {Fore.YELLOW}({status})")
-                
-                print("═" * 60)
-                
-                for remaining in range(interval, 0, -1):
-                    print(f"\r{Fore.CYAN}Next check in: {Fore.YELLOW}{remaining}s", end="", flush=True)
-                    time.sleep(1)
-                print("\r" + " " * 20 + "\r", end="")
-                
-                cycle += 1
-                
-        except KeyboardInterrupt:
-            self.loading_animation("Stopping monitoring", 0.8)
-            self.log_system_event("MONITORING_STOPPED", f"Monitoring stopped after {cycle} cycles")
-            self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} 🛑 MONITORING STOPPED {Style.RESET_ALL}", Fore.YELLOW)
-            input(f"\n{Fore.CYAN}Press Enter to continue...")
-    
-    def settings(self):
-        """Configure app settings with animated form-style interface"""
-        self.print_header()
-        self.bounce_text(f"{Fore.WHITE}{Back.YELLOW}  ⚙️  CONFIGURATION PANEL  {Style.RESET_ALL}", Fore.WHITE)
-        
-        self.loading_animation("Loading settings", 0.5)
-        
-        settings_content = f"""{Fore.CYAN}┌─ Current Settings ────────────────────────────────────────┐
-│                                                           │
-│ Timeout Duration: {Back.BLUE}{Fore.WHITE} {self.timeout} seconds {Style.RESET_ALL}                     {Fore.CYAN}│
-│ Monitor Interval: {Back.BLUE}{Fore.WHITE} {self.monitor_interval} seconds {Style.RESET_ALL}                     {Fore.CYAN}│
-│ Animation Speed: {Back.BLUE}{Fore.WHITE} {self.animation_speed} {Style.RESET_ALL}                          {Fore.CYAN}│
-│ Sound Effects: {Back.BLUE}{Fore.WHITE} {'Enabled' if self.enable_sounds else 'Disabled'} {Style.RESET_ALL}                       {Fore.CYAN}│
-│ Auto Updates: {Back.BLUE}{Fore.WHITE} {'Enabled' if self.auto_update_check else 'Disabled'} {Style.RESET_ALL}                        {Fore.CYAN}│
-│ Log File: {self.log_file:<37}        │
-│ Debug Mode: {Back.BLUE}{Fore.WHITE} {'Enabled' if self.debug_mode else 'Disabled'} {Style.RESET_ALL}                      {Fore.CYAN}│
-│                                                           │
-│ {Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} Change Timeout   {Back.GREEN}{Fore.WHITE} 2 {Style.RESET_ALL} Toggle Sounds      {Fore.CYAN}│
-│ {Back.GREEN}{Fore.WHITE} 3 {Style.RESET_ALL} Edit .env File   {Back.GREEN}{Fore.WHITE} 4 {Style.RESET_ALL} Reload Settings    {Fore.CYAN}│
-│ {Back.CYAN}{Fore.WHITE} 5 {Style.RESET_ALL} View Log File    {Back.BLACK}{Fore.WHITE} 6 {Style.RESET_ALL} Return to Menu     {Fore.CYAN}│
-│                                                           │
-└───────────────────────────────────────────────────────────┘"""
-        
-        print(f"\n{settings_content}")
-        
-        choice = input(f"\n{Fore.YELLOW}Select option (1-6): ").strip()
-        
-        if choice == '1':
-            new_timeout = input(f"\n{Fore.YELLOW}New timeout value (current: {self.timeout}): ").strip()
-            if new_timeout:
-                try:
-                    self.loading_animation("Applying settings", 0.8)
-                    self.timeout = int(new_timeout)
-                    self.save_websites()
-                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ SAVED {Style.RESET_ALL} Timeout updated to {self.timeout} seconds!", Fore.GREEN)
-                except ValueError:
-                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ ERROR {Style.RESET_ALL} Invalid timeout value!", Fore.RED)
-        
-        elif choice == '2':
-            self.enable_sounds = not self.enable_sounds
-            self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ TOGGLED {Style.RESET_ALL} Sounds {'enabled' if self.enable_sounds else 'disabled'}!", Fore.GREEN)
-        
-        elif choice == '3':
-            print(f"\n{Fore.YELLOW}📝 Edit your .env file manually and select option 4 to reload.")
-            print(f"{Fore.CYAN}Current .env location: {os.path.abspath('.env')}")
-        
-        elif choice == '4':
-            self.loading_animation("Reloading environment settings", 1.0)
-            self.reload_env_settings()
-            self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ RELOADED {Style.RESET_ALL} Settings updated from .env file!", Fore.GREEN)
-        
-        elif choice == '5':
-            self.view_log_file()
-        
-        elif choice == '6':
-            return
-        
-        if choice in ['1', '2', '3', '4', '5']:
-            input(f"\n{Fore.CYAN}Press Enter to continue...")
-            self.settings()  # Show settings menu again
-    
-    def view_log_file(self):
-        """View the contents of the log file"""
-        self.print_header()
-        self.bounce_text(f"{Fore.WHITE}{Back.CYAN}  📋 LOG FILE VIEWER  {Style.RESET_ALL}", Fore.WHITE)
-        
-        try:
-            if not os.path.exists(self.log_file):
-                self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} ⚠️  NO LOG FILE {Style.RESET_ALL} Log file not found!", Fore.YELLOW)
-                print(f"{Fore.CYAN}Log file path: {os.path.abspath(self.log_file)}")
-                return
-            
-            self.loading_animation("Loading log file", 0.8)
-            
-            # Get file size
-            file_size = os.path.getsize(self.log_file)
-            
-            print(f"\n{Back.LIGHTBLACK_EX}{Fore.WHITE} Log File: {self.log_file} | Size: {file_size:,} bytes {Style.RESET_ALL}")
-            
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            if not lines:
-                print(f"\n{Fore.YELLOW}Log file is empty.")
-                return
-            
-            print(f"\n{Fore.CYAN}┌─ Log Contents ────────────────────────────────────────────┐")
-            
-            # Show last 50 lines
-            display_lines = lines[-50:] if len(lines) > 50 else lines
-            
-            if len(lines) > 50:
-                print(f"{Fore.CYAN}│ ... showing last 50 of {len(lines)} total lines ...          │")
-                print(f"{Fore.CYAN}├───────────────────────────────────────────────────────────┤")
-            
-            for line in display_lines:
-                # Truncate long lines
-                display_line = line.strip()
-                if len(display_line) > 55:
-                    display_line = display_line[:52] + "..."
-                
-                # Color code based on log level
-                if "ERROR" in line:
-                    color = Fore.RED
-                elif "WARNING" in line:
-                    color = Fore.YELLOW
-                elif "INFO" in line:
-                    color = Fore.GREEN
-                else:
-                    color = Fore.WHITE
-                
-                print(f"{Fore.CYAN}│ {color}{display_line:<55}{Fore.CYAN} │")
-            
-            print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
-            
-            print(f"\n{Fore.YELLOW}Log Options:")
-            print(f"{Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} Open log file in notepad")
-            print(f"{Back.BLUE}{Fore.WHITE} 2 {Style.RESET_ALL} Clear log file")
-            print(f"{Back.RED}{Fore.WHITE} 3 {Style.RESET_ALL} Return to settings")
-            
-            choice = input(f"\n{Fore.CYAN}Select option (1-3): ").strip()
-            
-            if choice == '1':
-                try:
-                    subprocess.run(['notepad.exe', self.log_file])
-                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ OPENED {Style.RESET_ALL} Log file opened in notepad!", Fore.GREEN)
-                except Exception as e:
-                    print(f"{Fore.RED}❌ Error opening notepad: {e}")
-            
-            elif choice == '2':
-                confirm = input(f"\n{Fore.RED}⚠️  Are you sure you want to clear the log file? (y/n): ").strip().lower()
-                if confirm in ['y', 'yes']:
-                    try:
-                        with open(self.log_file, 'w') as f:
-                            f.write("")
-                        self.log_system_event("LOG_CLEARED", "Log file cleared by user")
-                        self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ CLEARED {Style.RESET_ALL} Log file cleared!", Fore.GREEN)
-                    except Exception as e:
-                        print(f"{Fore.RED}❌ Error clearing log file: {e}")
-                else:
-                    self.bounce_text(f"{Fore.YELLOW}Operation cancelled", Fore.YELLOW)
-            
-        except Exception as e:
-            self.log_error("LOG_VIEW_ERROR", str(e))
-            print(f"{Fore.RED}❌ Error reading log file: {e}")
-    
-    def run(self):
-        """Main application loop"""
-        self.log_system_event("APP_STARTED", f"Down Detector v{self.current_version} main loop started")
-        while True:
-            try:
-                self.print_header()
-                self.print_menu()
-                
-                choice = input(f"\n{Fore.YELLOW}Select option: ").strip()
-                if choice:
-                    self.play_pop_sound()
-            except (EOFError, KeyboardInterrupt):
-                self.clear_screen()
-                self.typewriter_effect(f"{Back.GREEN}{Fore.WHITE} 👋 THANK YOU FOR USING DOWN DETECTOR {Style.RESET_ALL}")
-                sys.exit(0)
-            
-            if choice == '1':
-                self.add_website()
-            elif choice == '2':
-                self.remove_website()
-            elif choice == '3':
-                self.view_websites()
-            elif choice == '4':
-                self.check_all_websites()
-            elif choice == '5':
-                self.monitor_websites()
-            elif choice == '6':
-                self.settings()
-            elif choice == '7':
-                self.system_updates_menu()
-            elif choice == '8':
-                self.reset_system()
-            elif choice == '9':
-                self.reboot_system()
-            elif choice == '0':
-                self.clear_screen()
-                self.typewriter_effect(f"{Back.GREEN}{Fore.WHITE} 👋 THANK YOU FOR USING DOWN DETECTOR {Style.RESET_ALL}")
-                sys.exit(0)
-            else:
-                self.print_header()
-                self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ INVALID SELECTION {Style.RESET_ALL} Please choose 0-9", Fore.RED)
-                input(f"\n{Fore.CYAN}Press Enter to continue...")
-
-
-if __name__ == "__main__":
-    try:
-        app = DownDetectorApp()
-        app.run()
-    except KeyboardInterrupt:
-        os.system('cls' if os.name == 'nt' else 'clear')
-        print(f"\n{Back.YELLOW}{Fore.BLACK} 👋 APPLICATION CLOSED {Style.RESET_ALL}")
-    except Exception as e:
-        os.system('cls' if os.name == 'nt' else 'clear')
-        print(f"\n{Back.RED}{Fore.WHITE} ❌ APPLICATION ERROR: {str(e)} {Style.RESET_ALL}")
-        sys.exit(1)
\ No newline at end of file
+import importlib.util
+import time
+import os
+import sys
+import json
+import platform
+import subprocess
+import shutil
+import logging
+import logging.handlers
+import atexit
+import queue
+import threading
+import asyncio
+import ssl
+import collections
+import contextlib
+import csv
+import heapq
+import bisect
+import itertools
+import random
+import signal
+import select
+import argparse
+import math
+import ipaddress
+import socket
+import re
+import unicodedata
+import contextvars
+import struct
+import tempfile
+import mmap
+import gzip
+import hashlib
+import hmac
+import sqlite3
+import multiprocessing
+import multiprocessing.connection
+
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, urljoin
+from colorama import Fore, Back, Style, init
+from dotenv import find_dotenv, load_dotenv
+
+def lazy_import(name):
+    """Import a module on first attribute access instead of at startup"""
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# requests costs ~200ms to import; deferring it keeps headless startup fast
+requests = lazy_import('requests')
+
+try:
+    import winsound
+except ImportError:
+    winsound = None  # Not on Windows - play_pop_sound falls back to the terminal bell
+
+# Single key presses on the live dashboard: msvcrt on Windows, termios elsewhere
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = tty = None
+# Locks on files shared between processes, such as the history's sites.idx
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Optional: dnspython gives real record TTLs to the DNS cache; without it DNS_CACHE_TTL is used
+dns_resolver = lazy_import('dns.resolver') if importlib.util.find_spec('dns') else None
+
+# Per-thread timing breakdown of the check in progress, filled in by the connection layer
+check_timings = threading.local()
+
+# Lease of the check a remote worker is running; a context variable, so asyncio checks each see their own
+current_lease = contextvars.ContextVar('current_lease', default=None)
+
+# Phases of a check, each reported in milliseconds as timings['<phase>_ms']
+CHECK_PHASES = ('dns', 'connect', 'tls', 'ttfb', 'transfer')
+CHECK_PHASE_KEYS = tuple(f"{phase}_ms" for phase in CHECK_PHASES)
+
+# Load environment variables from .env file
+# update: .env file
+# update: app version 1.0 from github raw repository
+load_dotenv()
+
+# Initialize colorama for cross-platform colored terminal text
+init(autoreset=True)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Hands log records to a bounded queue so the calling thread never touches the disk
+    
+    Overflow policy: when the queue is full, INFO and DEBUG records (the bulk of
+    CHECK lines) are dropped and counted; WARNING and above wait up to
+    block_timeout seconds for room before they are dropped too.
+    """
+
+    def __init__(self, log_queue, block_timeout=1.0):
+        super().__init__(log_queue)
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.drop_lock = threading.Lock()  # Any check thread can overflow the queue
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread; only one process reads this queue
+        return record
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self.drop_lock:
+                self.dropped += 1
+
+
+class BatchedFileHandler(logging.FileHandler):
+    """File handler that flushes every batch_size records or flush_interval seconds"""
+
+    def __init__(self, filename, encoding=None, batch_size=256, flush_interval=1.0):
+        super().__init__(filename, encoding=encoding)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self.unflushed += 1
+            if self.unflushed >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        super().flush()
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+
+
+class LogSegmentIndex:
+    """Summary of one log segment: time range, websites, level and event counts
+    
+    Saved next to each rotated segment as <segment>.idx.json so searches can
+    skip archives that cannot contain a match without decompressing them.
+    """
+
+    def __init__(self):
+        self.first = None
+        self.last = None
+        self.sites = set()
+        self.levels = collections.Counter()
+        self.events = collections.Counter()
+        self.down_checks = 0
+
+    def __len__(self):
+        return sum(self.levels.values())
+
+    def add(self, timestamp, level, message):
+        """Count one record; message is the text after the level column"""
+        if self.first is None:
+            self.first = timestamp
+        self.last = timestamp
+        self.levels[level] += 1
+        parts = message.split(' | ', 3)
+        category = parts[0]
+        if len(parts) < 2 or not category.isupper():
+            return  # Free-form line such as the startup banner
+        self.events[category] += 1
+        if category == 'CHECK':
+            self.sites.add(parts[1])
+            if len(parts) > 2 and parts[2] == 'DOWN':
+                self.down_checks += 1
+        else:
+            self.events[parts[1]] += 1
+
+    def add_line(self, line):
+        parts = line.split(' | ', 2)
+        if len(parts) == 3:
+            self.add(parts[0], parts[1].strip(), parts[2])
+
+    def to_dict(self):
+        return {
+            'first': self.first,
+            'last': self.last,
+            'records': len(self),
+            'errors': self.levels['ERROR'] + self.levels['CRITICAL'],
+            'down_checks': self.down_checks,
+            'levels': dict(self.levels),
+            'events': dict(self.events),
+            'sites': sorted(self.sites),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        index.first = data.get('first')
+        index.last = data.get('last')
+        index.sites = set(data.get('sites', []))
+        index.levels.update(data.get('levels', {}))
+        index.events.update(data.get('events', {}))
+        index.down_checks = data.get('down_checks', 0)
+        return index
+
+    def may_match(self, line_filter):
+        """False only when no line of the segment can pass line_filter"""
+        if line_filter is None:
+            return True
+        if line_filter.since and (self.last is None or self.last < line_filter.since):
+            return False
+        if line_filter.min_level and not any(
+                LogFilter.LEVELS.get(level, 0) >= line_filter.min_level for level in self.levels):
+            return False
+        if line_filter.event and line_filter.event not in self.events:
+            return False
+        if line_filter.site and not any(line_filter.site in site.lower() for site in self.sites):
+            return False
+        return True
+
+
+class RotatingBatchedFileHandler(BatchedFileHandler):
+    """Batched file handler that rotates by size and/or at midnight
+    
+    A rotated segment is renamed to <log>.<YYYYmmdd-HHMMSS-mmm>, gets a sidecar
+    index and is gzipped on a background thread. Only the newest
+    backup_count segments are kept.
+    """
+
+    def __init__(self, filename, encoding=None, batch_size=256, flush_interval=1.0,
+                 max_bytes=0, daily=False, backup_count=30, compress=True):
+        super().__init__(filename, encoding=encoding, batch_size=batch_size, flush_interval=flush_interval)
+        self.max_bytes = max_bytes
+        self.daily = daily
+        self.backup_count = backup_count
+        self.compress = compress
+        self.index = LogSegmentIndex()
+        self.bytes_written = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        # Lines already in the file are only indexed at rollover, so starting the app never reads the log
+        self.index_complete = not self.bytes_written
+        self.compressing = set()
+        self.next_rollover = self._next_midnight(time.time())
+
+    @staticmethod
+    def _next_midnight(now):
+        tomorrow = datetime.fromtimestamp(now).date() + timedelta(days=1)
+        return datetime(tomorrow.year, tomorrow.month, tomorrow.day).timestamp()
+
+    def emit(self, record):
+        if (self.daily and record.created >= self.next_rollover) or (
+                self.max_bytes and self.bytes_written >= self.max_bytes):
+            try:
+                self.rollover(record.created)
+            except Exception:
+                self.handleError(record)
+        super().emit(record)
+
+    def format(self, record):
+        line = super().format(record)
+        self.bytes_written += (len(line) if line.isascii() else len(line.encode(self.encoding or 'utf-8', 'replace'))) + len(os.linesep)
+        timestamp = getattr(record, 'asctime', None) or time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created))
+        self.index.add(timestamp, record.levelname, record.message)
+        return line
+
+    def rollover(self, now):
+        """Close the current file and move it to a timestamped archive segment"""
+        if self.stream is not None:
+            self.flush()
+            self.stream.close()
+            self.stream = None
+        self.next_rollover = self._next_midnight(now)
+        if not os.path.exists(self.baseFilename) or not os.path.getsize(self.baseFilename):
+            return
+        
+        stamp = datetime.fromtimestamp(now).strftime('%Y%m%d-%H%M%S-%f')[:-3]
+        target = f"{self.baseFilename}.{stamp}"
+        suffix = 1
+        while os.path.exists(target) or os.path.exists(target + '.gz') or os.path.exists(target + '.idx.json'):
+            target = f"{self.baseFilename}.{stamp}-{suffix}"
+            suffix += 1
+        os.replace(self.baseFilename, target)
+        if not self.index_complete:
+            # The segment started before this process: index it once, now that it is complete
+            self.index = LogSegmentIndex()
+            for line in LogReader(target).iter_lines():
+                self.index.add_line(line)
+        with open(target + '.idx.json', 'w', encoding='utf-8') as f:
+            json.dump(self.index.to_dict(), f)
+        self.reset_segment()
+        
+        if self.compress:
+            # Compress off the writer thread; readers use the plain segment until the .gz is complete
+            self.compressing.add(target)
+            threading.Thread(target=self._compress, args=(target,), name='log-compress').start()
+        LogArchive(self.baseFilename).remove_old(self.backup_count, busy=self.compressing)
+
+    def reset_segment(self):
+        """Start counting and indexing a new, empty segment"""
+        self.index = LogSegmentIndex()
+        self.index_complete = True
+        self.bytes_written = 0
+
+    def truncate(self):
+        """Empty the current log file, as "Clear log file" does"""
+        self.acquire()
+        try:
+            self.flush()
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            open(self.baseFilename, 'w').close()
+            self.reset_segment()
+        finally:
+            self.release()
+
+    def _compress(self, path):
+        try:
+            with open(path, 'rb') as source, gzip.open(path + '.gz.tmp', 'wb') as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            os.replace(path + '.gz.tmp', path + '.gz')
+            os.remove(path)
+        finally:
+            self.compressing.discard(path)
+
+
+class LogArchive:
+    """Rotated segments of a log file, found through their .idx.json sidecars"""
+
+    def __init__(self, log_file):
+        self.log_file = os.path.abspath(log_file)
+        self.skipped = 0
+
+    def segments(self):
+        """Return [(segment_path, LogSegmentIndex)] oldest first"""
+        folder = os.path.dirname(self.log_file)
+        prefix = os.path.basename(self.log_file) + '.'
+        found = []
+        for name in os.listdir(folder):
+            if not (name.startswith(prefix) and name.endswith('.idx.json')):
+                continue
+            segment = os.path.join(folder, name[:-len('.idx.json')])
+            try:
+                with open(segment + '.idx.json', 'r', encoding='utf-8') as f:
+                    index = LogSegmentIndex.from_dict(json.load(f))
+            except (OSError, ValueError):
+                continue
+            found.append((segment, index))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    @staticmethod
+    def _open_segment(segment):
+        if os.path.exists(segment + '.gz'):
+            return gzip.open(segment + '.gz', 'rt', encoding='utf-8', errors='replace')
+        return open(segment, 'r', encoding='utf-8', errors='replace')
+
+    def remove_old(self, keep, busy=()):
+        """Delete all but the newest keep segments; those in busy (still being compressed) wait for the next call"""
+        segments = self.segments()
+        for segment, _ in segments[:max(0, len(segments) - keep)]:
+            if segment in busy:
+                continue
+            for path in (segment + '.gz', segment, segment + '.idx.json'):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def search(self, line_filter=None):
+        """Stream matching lines from every archive that may match, then from the live log"""
+        self.skipped = 0
+        for segment, index in self.segments():
+            if not index.may_match(line_filter):
+                self.skipped += 1
+                continue
+            try:
+                with self._open_segment(segment) as f:
+                    for line in f:
+                        line = line.rstrip('\r\n')
+                        if line and (line_filter is None or line_filter(line)):
+                            yield line
+            except FileNotFoundError:
+                continue  # Removed by retention while we were reading
+        if os.path.exists(self.log_file):
+            yield from LogReader(self.log_file).iter_lines(line_filter)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that drains records in bursts and flushes whenever the queue goes idle"""
+
+    def __init__(self, log_queue, *handlers, flush_interval=1.0, queue_handler=None):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self.queue_handler = queue_handler
+        self.reported_drops = 0
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        # The burst is over: write it out, then sleep until the next record arrives
+        self.report_drops()
+        for handler in self.handlers:
+            if getattr(handler, 'unflushed', 1):
+                handler.flush()
+        return self.queue.get()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def report_drops(self):
+        """Write a warning when the overflow policy has discarded records"""
+        if self.queue_handler is None or self.queue_handler.dropped == self.reported_drops:
+            return
+        dropped = self.queue_handler.dropped - self.reported_drops
+        self.reported_drops = self.queue_handler.dropped
+        self.handle(logging.makeLogRecord({
+            'name': 'DownDetector', 'levelno': logging.WARNING, 'levelname': 'WARNING',
+            'msg': f"SYSTEM | LOG_QUEUE_OVERFLOW | Dropped {dropped} log records"
+        }))
+
+    def enqueue_sentinel(self):
+        # put_nowait could fail on a full bounded queue and leave the thread running
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        if self._thread is None:
+            return  # Already stopped (stop is also registered with atexit)
+        super().stop()
+        self.report_drops()
+        for handler in self.handlers:
+            handler.flush()
+
+
+class LogFilter:
+    """Line predicate for the log viewer: minimum level, site substring, event type and start time"""
+
+    LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+
+    def __init__(self, level=None, site=None, event=None, since=None):
+        self.min_level = self.LEVELS.get(level.upper(), 0) if level else 0
+        self.site = site.lower() if site else None
+        self.event = event.upper() if event else None
+        self.since = since
+
+    def __bool__(self):
+        return bool(self.min_level or self.site or self.event or self.since)
+
+    def describe(self):
+        parts = []
+        if self.min_level:
+            parts.append(f"level>={logging.getLevelName(self.min_level)}")
+        if self.site:
+            parts.append(f"site~{self.site}")
+        if self.event:
+            parts.append(f"event={self.event}")
+        if self.since:
+            parts.append(f"since {self.since}")
+        return ", ".join(parts)
+
+    def __call__(self, line):
+        # Lines look like "2024-05-01 12:00:00 | INFO     | CHECK | https://... | UP | 200 | 12.34ms"
+        parts = line.split(' | ', 4)
+        if len(parts) < 3:
+            return not self
+        if self.since and parts[0] < self.since:
+            return False
+        if self.min_level and self.LEVELS.get(parts[1].strip(), 0) < self.min_level:
+            return False
+        if self.event and self.event != parts[2] and (len(parts) < 4 or self.event != parts[3]):
+            return False
+        if self.site and self.site not in ' | '.join(parts[2:]).lower():
+            return False
+        return True
+
+
+class LogReader:
+    """Read a log file from the end in fixed-size blocks, never holding the whole file"""
+
+    BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def _decode(raw):
+        return raw.decode('utf-8', errors='replace').rstrip('\r')
+
+    def tail(self, count, line_filter=None):
+        """Return the last count lines (matching line_filter, if given), oldest first"""
+        found = []
+        with open(self.path, 'rb') as f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b''
+            while position > 0 and len(found) < count:
+                read_size = min(self.BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                parts = (f.read(read_size) + remainder).split(b'\n')
+                # The first piece may be the tail of a line that starts in an earlier block
+                remainder = parts[0] if position > 0 else b''
+                pieces = parts[1:] if position > 0 else parts
+                for raw in reversed(pieces):
+                    line = self._decode(raw)
+                    if line and (line_filter is None or line_filter(line)):
+                        found.append(line)
+                        if len(found) >= count:
+                            break
+        found.reverse()
+        return found
+
+    def iter_lines(self, line_filter=None):
+        """Stream every line (matching line_filter, if given) from the start of the file"""
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                line = self._decode(raw.rstrip(b'\n'))
+                if line and (line_filter is None or line_filter(line)):
+                    yield line
+
+    def follow(self, line_filter=None, poll_interval=0.5):
+        """Yield lines appended after the call, like tail -f
+        
+        Starts over from the beginning if the file is truncated or replaced.
+        """
+        f = open(self.path, 'rb')
+        try:
+            f.seek(0, os.SEEK_END)
+            partial = b''
+            while True:
+                chunk = f.read(self.BLOCK_SIZE)
+                if chunk:
+                    lines = (partial + chunk).split(b'\n')
+                    partial = lines.pop()
+                    for raw in lines:
+                        line = self._decode(raw)
+                        if line and (line_filter is None or line_filter(line)):
+                            yield line
+                    continue
+                
+                try:
+                    current = os.stat(self.path)
+                except FileNotFoundError:
+                    time.sleep(poll_interval)
+                    continue
+                if current.st_ino != os.fstat(f.fileno()).st_ino:
+                    f.close()
+                    f = open(self.path, 'rb')
+                    partial = b''
+                elif current.st_size < f.tell():
+                    f.seek(0)
+                    partial = b''
+                else:
+                    time.sleep(poll_interval)
+        finally:
+            f.close()
+
+
+class CheckEngine:
+    """Bounded worker pool that runs website checks and streams results back"""
+
+    def __init__(self, check_func, max_workers=20):
+        self.check_func = check_func
+        self.max_workers = max(1, int(max_workers))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='check')
+        self.results = queue.Queue()
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def submit(self, url):
+        """Queue a single check; its result is delivered through get_result()"""
+        with self.lock:
+            self.pending += 1
+        self.executor.submit(self._run_check, url)
+
+    def _run_check(self, url):
+        """Worker body - never lets an exception escape so every submit yields a result"""
+        try:
+            is_up, status = self.check_func(url)
+        except Exception as e:
+            is_up, status = False, f"Error: {str(e)[:40]}"
+        self.results.put((url, is_up, status))
+
+    def get_result(self, timeout=None):
+        """Return the next finished (url, is_up, status), or None if nothing finished in time"""
+        try:
+            result = self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self.lock:
+            self.pending -= 1
+        return result
+
+    def run_batch(self, urls):
+        """Check every URL and yield (url, is_up, status) in completion order"""
+        urls = list(urls)
+        for url in urls:
+            self.submit(url)
+        for _ in range(len(urls)):
+            yield self.get_result()
+
+    def shutdown(self, wait=False):
+        """Stop accepting work and release the worker threads"""
+        self.executor.shutdown(wait=wait)
+
+
+class AsyncCheckEngine(CheckEngine):
+    """Check engine that runs coroutine checks on a private asyncio event loop"""
+
+    def __init__(self, check_coro, max_concurrency=20):
+        self.check_coro = check_coro
+        self.max_workers = max(1, int(max_concurrency))
+        self.results = queue.Queue()
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.backlog = collections.deque()  # Only touched from the event loop thread
+        self.active = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name='check-loop', daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            # Stopped by shutdown: drop the checks still running, then free the selector and sockets
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+
+    def submit(self, url):
+        """Queue a single check; its result is delivered through get_result()"""
+        self.submit_many([url])
+
+    def submit_many(self, urls):
+        """Queue several checks with a single hand-off to the event loop thread"""
+        urls = list(urls)
+        with self.lock:
+            self.pending += len(urls)
+        self.loop.call_soon_threadsafe(self._schedule, urls)
+
+    def _schedule(self, urls):
+        self.backlog.extend(urls)
+        self._start_checks()
+
+    def _start_checks(self):
+        # Tasks are only created for free slots, so a 100k-site batch never holds 100k tasks
+        while self.backlog and self.active < self.max_workers:
+            self.active += 1
+            self.loop.create_task(self._run_check(self.backlog.popleft()))
+
+    async def _run_check(self, url):
+        try:
+            is_up, status = await self.check_coro(url)
+        except Exception as e:
+            is_up, status = False, f"Error: {str(e)[:40]}"
+        self.results.put((url, is_up, status))
+        self.active -= 1
+        self._start_checks()
+
+    def run_batch(self, urls):
+        """Check every URL and yield (url, is_up, status) in completion order"""
+        urls = list(urls)
+        self.submit_many(urls)
+        for _ in range(len(urls)):
+            yield self.get_result()
+
+    def shutdown(self, wait=False):
+        """Stop the event loop thread, which closes the loop on its way out"""
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if wait:
+            self.thread.join()
+
+
+def split_address(address, default_port=7400):
+    """(host, port) of a "host:port", "host" or "[ipv6]:port" address"""
+    host, separator, port = address.rpartition(':')
+    if not separator or host.endswith(':') or (address.startswith('[') and not host.endswith(']')):
+        host, port = address, default_port  # No port, or a bare IPv6 address
+    return host.strip('[]') or '0.0.0.0', int(port)
+
+
+class _LeaseHolder:
+    """A worker connected to a RemoteCheckEngine and the leases it holds"""
+
+    __slots__ = ('name', 'capacity', 'writer', 'leases', 'last_seen')
+
+    def __init__(self, name, capacity, writer):
+        self.name = name
+        self.capacity = capacity
+        self.writer = writer
+        self.leases = set()
+        self.last_seen = time.time()
+
+
+class RemoteCheckEngine(CheckEngine):
+    """Check engine that leases checks to worker processes over TCP instead of running them
+    
+    Messages are JSON lines. A worker opens with {"type": "hello", "name",
+    "capacity", "token"} and is answered {"type": "welcome", "heartbeat"}. It
+    is then sent {"type": "lease", "checks": [[id, url, settings], ...]},
+    never more than capacity checks at a time, and replies with {"type":
+    "results", "results": [[id, is_up, status, response_time, phases], ...]}.
+    Both sides send something at least every heartbeat seconds. The leases
+    of a worker that disconnects or stays silent for three heartbeats go to
+    the other workers; a lease not answered within lease_timeout is handed
+    out again, and after MAX_LEASE_ATTEMPTS the check is reported DOWN.
+    """
+
+    MAX_LEASE_ATTEMPTS = 3
+
+    def __init__(self, record_result, host, port, token='', lease_timeout=30.0, heartbeat=5.0,
+                 site_settings=None, on_event=None):
+        self.record_result = record_result  # Called on the event loop thread with every result
+        self.token = token
+        self.lease_timeout = lease_timeout
+        self.heartbeat = heartbeat
+        self.site_settings = site_settings or (lambda url: {})
+        self.on_event = on_event or (lambda event, message: None)
+        self.results = queue.Queue()
+        self.pending = 0
+        self.lock = threading.Lock()
+        # Only touched from the event loop thread
+        self.backlog = collections.deque()  # (url, attempts) waiting for a free worker slot
+        self.leases = {}  # id -> (url, holder, expires_at, attempts)
+        self.holders = set()
+        self.writers = set()  # Every open connection, including workers still saying hello
+        self.lease_ids = itertools.count(1)
+        self.stopping = False
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self._serve_worker, host, port, limit=16 * 1024 * 1024))
+        self.address = self.server.sockets[0].getsockname()[:2]
+        self.thread = threading.Thread(target=self._run_loop, name='coordinator', daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.lease_task = self.loop.create_task(self._check_leases())
+        self.loop.run_forever()
+
+    @property
+    def max_workers(self):
+        """Checks the connected workers can run at once"""
+        return sum(holder.capacity for holder in list(self.holders))
+
+    def submit(self, url):
+        """Queue a single check; its result is delivered through get_result()"""
+        self.submit_many([url])
+
+    def submit_many(self, urls):
+        """Queue several checks with a single hand-off to the event loop thread"""
+        urls = list(urls)
+        with self.lock:
+            self.pending += len(urls)
+        self.loop.call_soon_threadsafe(self._schedule, urls)
+
+    def _schedule(self, urls):
+        self.backlog.extend((url, 0) for url in urls)
+        self._dispatch()
+
+    @staticmethod
+    def _send(writer, message):
+        writer.write(json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n')
+
+    def _dispatch(self):
+        """Lease waiting checks to the workers with the most free slots"""
+        while self.backlog:
+            holders = [holder for holder in self.holders if not holder.writer.is_closing()]
+            holder = max(holders, key=lambda h: h.capacity - len(h.leases), default=None)
+            if holder is None or len(holder.leases) >= holder.capacity:
+                return
+            expires_at = time.time() + self.lease_timeout
+            checks = []
+            for _ in range(min(holder.capacity - len(holder.leases), len(self.backlog))):
+                url, attempts = self.backlog.popleft()
+                lease_id = next(self.lease_ids)
+                self.leases[lease_id] = (url, holder, expires_at, attempts)
+                holder.leases.add(lease_id)
+                checks.append([lease_id, url, self.site_settings(url)])
+            self._send(holder.writer, {'type': 'lease', 'checks': checks})
+
+    def _release(self, lease_id, count_attempt):
+        """Queue the check of a lease that won't be answered again, or give up after MAX_LEASE_ATTEMPTS"""
+        url, holder, _, attempts = self.leases.pop(lease_id)
+        holder.leases.discard(lease_id)
+        attempts += 1 if count_attempt else 0
+        if attempts >= self.MAX_LEASE_ATTEMPTS:
+            status = f"Error: no worker finished the check in {attempts} leases"
+            self.record_result(url, False, status, None, None, worker=None)
+            self.results.put((url, False, status))
+        else:
+            self.backlog.appendleft((url, attempts))  # Already late, so ahead of the rest
+
+    async def _serve_worker(self, reader, writer):
+        peer = writer.get_extra_info('peername') or ('?', 0)
+        holder = None
+        self.writers.add(writer)
+        try:
+            hello = json.loads(await asyncio.wait_for(reader.readline(), 3 * self.heartbeat) or b'null')
+            if not isinstance(hello, dict) or hello.get('type') != 'hello':
+                return
+            if self.token and not hmac.compare_digest(str(hello.get('token') or ''), self.token):
+                self._send(writer, {'type': 'error', 'error': 'invalid token'})
+                self.on_event("WORKER_REJECTED", f"{peer[0]}:{peer[1]} sent an invalid token")
+                return
+            name = str(hello.get('name') or f"{peer[0]}:{peer[1]}")[:100]
+            holder = _LeaseHolder(name, max(1, int(hello.get('capacity') or 1)), writer)
+            self.holders.add(holder)
+            self._send(writer, {'type': 'welcome', 'heartbeat': self.heartbeat})
+            self.on_event("WORKER_JOINED", f"{name} ({peer[0]}) joined with capacity {holder.capacity}")
+            self._dispatch()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                holder.last_seen = time.time()
+                for lease_id, is_up, status, response_time, phases in json.loads(line).get('results', ()):
+                    lease = self.leases.get(lease_id)
+                    if lease is None or lease[1] is not holder:
+                        continue  # Expired and leased to another worker meanwhile
+                    del self.leases[lease_id]
+                    holder.leases.discard(lease_id)
+                    self.record_result(lease[0], bool(is_up), status, response_time,
+                                       tuple(phases) if phases else None, worker=holder.name)
+                    self.results.put((lease[0], bool(is_up), status))
+                self._dispatch()
+        except ConnectionError:
+            pass  # Worker killed or its machine gone; handled like any other disconnect
+        except (OSError, ValueError, TypeError, AttributeError, asyncio.TimeoutError) as e:
+            self.on_event("WORKER_ERROR", f"{holder.name if holder else peer[0]}: {str(e)[:80] or type(e).__name__}")
+        finally:
+            if holder is not None and not self.stopping:
+                self.holders.discard(holder)
+                lost = list(holder.leases)
+                for lease_id in lost:
+                    self._release(lease_id, count_attempt=False)
+                self.on_event("WORKER_LEFT", f"{holder.name} left, {len(lost)} checks leased again")
+                self._dispatch()
+            self.writers.discard(writer)
+            writer.close()
+
+    async def _check_leases(self):
+        """Once a second: lease overdue checks again, drop silent workers and send heartbeats"""
+        next_heartbeat = 0.0
+        while True:
+            await asyncio.sleep(1.0)
+            now = time.time()
+            expired = [lease_id for lease_id, lease in self.leases.items() if lease[2] <= now]
+            for lease_id in expired:
+                self._release(lease_id, count_attempt=True)
+            for holder in list(self.holders):
+                if holder.writer.is_closing():
+                    continue
+                if now - holder.last_seen > 3 * self.heartbeat:
+                    holder.writer.transport.abort()  # _serve_worker sees the connection drop and releases its leases
+                elif now >= next_heartbeat:
+                    self._send(holder.writer, {'type': 'heartbeat'})
+            if now >= next_heartbeat:
+                next_heartbeat = now + self.heartbeat
+            if expired:
+                self._dispatch()
+
+    async def _stop(self):
+        self.stopping = True
+        self.server.close()
+        self.lease_task.cancel()
+        for writer in list(self.writers):
+            writer.transport.abort()
+        # Connection handlers see the drop and return; cancelling them instead makes asyncio log an error
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.wait(tasks, timeout=2)
+        self.loop.stop()
+
+    def shutdown(self, wait=False):
+        """Disconnect the workers, stop listening and stop the event loop thread"""
+        with contextlib.suppress(Exception):
+            asyncio.run_coroutine_threadsafe(self._stop(), self.loop).result(timeout=5)
+        if wait:
+            self.thread.join()
+
+
+class SiteHistory:
+    """Fixed-capacity ring buffer of one website's check results in typed arrays
+    
+    Each sample costs 11 bytes: uint32 epoch seconds, float32 latency in ms,
+    uint16 status code (0 for connection errors) and a uint8 up flag. The
+    buffer is allocated in full on creation so memory use is predictable.
+    Only the latest check's phase timings are kept, in phases. Readers copy
+    the samples under lock (the CheckHistory lock that writers hold), so a
+    sample is never seen half-written.
+    """
+
+    __slots__ = ('capacity', 'timestamps', 'latencies', 'status_codes', 'up_flags', 'next_index', 'count', 'phases', 'lock')
+
+    def __init__(self, capacity, lock=None):
+        self.capacity = max(1, int(capacity))
+        self.lock = lock or threading.Lock()
+        self.timestamps = array('I', bytes(4 * self.capacity))
+        self.latencies = array('f', bytes(4 * self.capacity))
+        self.status_codes = array('H', bytes(2 * self.capacity))
+        self.up_flags = array('B', bytes(self.capacity))
+        self.next_index = 0
+        self.count = 0
+        self.phases = None
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, latency_ms, status_code, is_up):
+        """Store a sample, overwriting the oldest one when full"""
+        i = self.next_index
+        self.timestamps[i] = int(timestamp)
+        self.latencies[i] = latency_ms or 0.0
+        self.status_codes[i] = status_code if isinstance(status_code, int) and 0 <= status_code < 65536 else 0
+        self.up_flags[i] = 1 if is_up else 0
+        self.next_index = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _indexes(self):
+        start = (self.next_index - self.count) % self.capacity
+        for offset in range(self.count):
+            yield (start + offset) % self.capacity
+
+    def samples(self, since=None):
+        """Return [(timestamp, latency_ms, status_code, is_up)] from oldest to newest"""
+        with self.lock:
+            return [
+                (self.timestamps[i], self.latencies[i], self.status_codes[i], bool(self.up_flags[i]))
+                for i in self._indexes()
+                if since is None or self.timestamps[i] >= since
+            ]
+
+    def latest(self):
+        """Most recent sample, or None"""
+        with self.lock:
+            if not self.count:
+                return None
+            i = (self.next_index - 1) % self.capacity
+            return self.timestamps[i], self.latencies[i], self.status_codes[i], bool(self.up_flags[i])
+
+    def uptime(self, since=None):
+        """Percentage of samples that were up, or None without samples"""
+        total = up = 0
+        for _, _, _, is_up in self.samples(since):
+            total += 1
+            up += is_up
+        return up * 100.0 / total if total else None
+
+
+class CheckHistory:
+    """Recent check results for every website, kept in per-site ring buffers"""
+
+    def __init__(self, capacity=1000):
+        self.capacity = max(1, int(capacity))
+        self.sites = {}
+        self.lock = threading.Lock()
+
+    def record(self, url, timestamp, latency_ms, status_code, is_up, phases=None):
+        """Append a check result for url"""
+        with self.lock:
+            history = self.sites.get(url)
+            if history is None:
+                history = self.sites[url] = SiteHistory(self.capacity, self.lock)
+            history.append(timestamp, latency_ms, status_code, is_up)
+            history.phases = phases
+
+    def get(self, url):
+        """SiteHistory for url, or None if it has never been checked"""
+        return self.sites.get(url)
+
+    def remove(self, url):
+        with self.lock:
+            self.sites.pop(url, None)
+
+    def clear(self):
+        with self.lock:
+            self.sites.clear()
+
+
+class LatencySketch:
+    """Mergeable latency quantile sketch with logarithmic buckets (DDSketch-style)
+    
+    Every quantile is within relative_accuracy of the true value. Bucket i
+    covers (gamma^(i-1), gamma^i], so latencies from 0.1ms to 10 minutes need
+    at most ~400 buckets at 2% accuracy, however many samples are added.
+    Two sketches merge by adding bucket counts.
+    """
+
+    __slots__ = ('gamma', 'log_gamma', 'buckets', 'count', 'total', 'minimum', 'maximum')
+
+    MIN_VALUE = 0.1  # ms; anything faster shares the lowest bucket
+
+    def __init__(self, relative_accuracy=0.02):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def key(self, value):
+        """Bucket index of value"""
+        return math.ceil(math.log(max(value, self.MIN_VALUE)) / self.log_gamma)
+
+    def add(self, value, key=None):
+        """Add a sample; pass key when it was already computed for a sketch with the same accuracy"""
+        if key is None:
+            key = self.key(value)
+        buckets = self.buckets
+        buckets[key] = buckets.get(key, 0) + 1
+        if not self.count:
+            self.minimum = self.maximum = value
+        elif value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+            self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        """Estimated q-quantile (0-1), or None when empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.minimum), self.maximum)
+        return self.maximum
+
+
+class StatsWindow:
+    """Rolling window of fixed time slots, each holding check counts and a latency sketch
+    
+    Phase timings are summed per slot in flat arrays, allocated on the first
+    timed check, so the summary can report the mean of each phase.
+    """
+
+    __slots__ = ('slot_seconds', 'slot_ids', 'checks', 'up', 'sketches', 'phase_totals', 'phase_counts')
+
+    def __init__(self, slot_seconds, slots):
+        self.slot_seconds = slot_seconds
+        self.slot_ids = [-1] * slots
+        self.checks = [0] * slots
+        self.up = [0] * slots
+        self.sketches = [None] * slots
+        self.phase_totals = self.phase_counts = None
+
+    def add(self, timestamp, latency_ms, is_up, key=None, phases=None):
+        slot_id = int(timestamp // self.slot_seconds)
+        i = slot_id % len(self.slot_ids)
+        if self.slot_ids[i] != slot_id:
+            if slot_id < self.slot_ids[i]:
+                return  # Older than the window
+            self.slot_ids[i] = slot_id
+            self.checks[i] = self.up[i] = 0
+            self.sketches[i] = None
+            if self.phase_totals is not None:
+                base = i * len(CHECK_PHASES)
+                for j in range(base, base + len(CHECK_PHASES)):
+                    self.phase_totals[j] = self.phase_counts[j] = 0
+        self.checks[i] += 1
+        if is_up:
+            self.up[i] += 1
+            if latency_ms:
+                if self.sketches[i] is None:
+                    self.sketches[i] = LatencySketch()
+                self.sketches[i].add(latency_ms, key)
+        if phases:
+            if self.phase_totals is None:
+                self.phase_totals = array('d', bytes(8 * len(CHECK_PHASES) * len(self.slot_ids)))
+                self.phase_counts = array('I', bytes(4 * len(CHECK_PHASES) * len(self.slot_ids)))
+            base = i * len(CHECK_PHASES)
+            for j, value in enumerate(phases, base):
+                if value is not None:
+                    self.phase_totals[j] += value
+                    self.phase_counts[j] += 1
+
+    def summary(self, now):
+        """Uptime and latency statistics over the slots still inside the window"""
+        oldest = int(now // self.slot_seconds) - len(self.slot_ids) + 1
+        checks = up = 0
+        merged = LatencySketch()
+        for i, slot_id in enumerate(self.slot_ids):
+            if slot_id >= oldest:
+                checks += self.checks[i]
+                up += self.up[i]
+                if self.sketches[i] is not None:
+                    merged.merge(self.sketches[i])
+        if not checks:
+            return None
+        latencies = [merged.mean()] + [merged.quantile(q) for q in (0.50, 0.95, 0.99)]
+        summary = {'checks': checks, 'uptime': round(up * 100.0 / checks, 3)}
+        for key, value in zip(('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'), latencies):
+            summary[key] = round(value, 2) if value is not None else None
+        if self.phase_totals is not None:
+            totals = [0.0] * len(CHECK_PHASES)
+            counts = [0] * len(CHECK_PHASES)
+            for i, slot_id in enumerate(self.slot_ids):
+                if slot_id >= oldest:
+                    for j in range(len(CHECK_PHASES)):
+                        totals[j] += self.phase_totals[i * len(CHECK_PHASES) + j]
+                        counts[j] += self.phase_counts[i * len(CHECK_PHASES) + j]
+            if any(counts):
+                summary['phases_ms'] = {phase: round(total / count, 2) if count else None
+                                        for phase, total, count in zip(CHECK_PHASES, totals, counts)}
+        return summary
+
+
+class CheckStatistics:
+    """Per-site uptime and latency percentiles over the last hour, day and week
+    
+    Memory per site is constant: 12 five-minute, 24 hourly and 28 six-hour
+    slots, each with a bounded LatencySketch of successful check latencies.
+    """
+
+    WINDOWS = collections.OrderedDict([
+        ('1h', (300, 12)),
+        ('24h', (3600, 24)),
+        ('7d', (21600, 28)),
+    ])
+
+    def __init__(self):
+        self.sites = {}
+        self.lock = threading.Lock()
+        self.key_sketch = LatencySketch()
+
+    def record(self, url, timestamp, latency_ms, is_up, phases=None):
+        # The bucket index is the same in every window, so compute the logarithm once
+        key = self.key_sketch.key(latency_ms) if is_up and latency_ms else None
+        with self.lock:
+            windows = self.sites.get(url)
+            if windows is None:
+                windows = self.sites[url] = [StatsWindow(*spec) for spec in self.WINDOWS.values()]
+            for window in windows:
+                window.add(timestamp, latency_ms, is_up, key, phases)
+
+    def summary(self, url, window='24h', now=None):
+        """Statistics dict for url over window, or None without checks in it"""
+        windows = self.sites.get(url)
+        if windows is None:
+            return None
+        now = time.time() if now is None else now
+        with self.lock:
+            return windows[list(self.WINDOWS).index(window)].summary(now)
+
+    def snapshot(self, urls=None, now=None):
+        """{url: {window: summary}} for every site (or urls), suitable for JSON"""
+        now = time.time() if now is None else now
+        urls = list(self.sites) if urls is None else urls
+        return {url: {window: self.summary(url, window, now) for window in self.WINDOWS} for url in urls}
+
+    def load_from_archive(self, archive, urls, end):
+        """Replay the last week of on-disk history up to end, e.g. to warm up after a restart"""
+        for url in urls:
+            for timestamp, latency, _, is_up in archive.query(url, end - 7 * 86400, end):
+                self.record(url, timestamp, latency, is_up)
+
+    def remove(self, url):
+        with self.lock:
+            self.sites.pop(url, None)
+
+    def clear(self):
+        with self.lock:
+            self.sites.clear()
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on path (created if needed) that other processes respect
+    
+    Yields the file, opened for appending and reading; write through it while
+    the lock is held.
+    """
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield f
+        finally:
+            f.flush()  # Buffered writes must land before another process gets the lock
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class HistoryArchive:
+    """Append-only on-disk check history in fixed-width binary day segments
+    
+    Layout under root: sites.idx maps URLs to numeric ids, and each UTC day
+    has a directory of shard files (site id modulo shard count). A shard
+    starts with a 16-byte header followed by 16-byte records of
+    (uint32 timestamp, uint32 site id, float32 latency, uint16 status, uint8 up).
+    Live shards are in arrival order, which is only roughly time order when
+    several processes append, so queries scan them in full; processes append
+    under a lock on the shard file. compact() rewrites finished days sorted
+    by (site id, timestamp) so a query for one site binary-searches straight
+    to its records and only touches those pages of the mmap.
+    """
+
+    MAGIC = b'DDHS'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHB7x')
+    RECORD = struct.Struct('<IIfHBx')
+    KEY = struct.Struct('<II')  # Leading (timestamp, site id) of a record
+    FLAG_SORTED = 1
+
+    def __init__(self, root, shards=64, flush_interval=2.0, retention_days=90, writer=True):
+        self.root = root
+        self.shards = max(1, int(shards))
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.site_ids = {}
+        self.index_path = os.path.join(root, 'sites.idx')
+        self.index_offset = 0  # Bytes of sites.idx already read
+        self.next_site_id = 0
+        self.pending = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.maintenance_thread = None
+        self.stop_event = threading.Event()
+        self.flush_thread = None
+        self._load_site_index()
+        if writer:
+            # Readers such as the history command don't record checks, so they skip the folder and thread
+            os.makedirs(root, exist_ok=True)
+            self.flush_thread = threading.Thread(target=self._flush_loop, name='history-writer', daemon=True)
+            self.flush_thread.start()
+            atexit.register(self.close)
+
+    def _load_site_index(self):
+        """Read the sites.idx lines added since the last call, by this or any other process"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                f.seek(self.index_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        complete = data[:data.rfind(b'\n') + 1]  # A line still being written is read next time
+        self.index_offset += len(complete)
+        for line in complete.decode('utf-8', 'replace').splitlines():
+            site_id, _, url = line.partition('\t')
+            if url and site_id.isdigit():
+                self.site_ids[url] = int(site_id)
+                self.next_site_id = max(self.next_site_id, int(site_id) + 1)
+
+    def _register_sites(self, urls):
+        """Give each new url an id in sites.idx (caller holds self.flush_lock)
+        
+        A cron check and a running monitor can share the history directory, so
+        ids are handed out under a lock file, after reading the ids other
+        processes registered meanwhile.
+        """
+        with file_lock(self.index_path + '.lock'):
+            self._load_site_index()
+            lines = []
+            for url in urls:
+                if url not in self.site_ids:
+                    self.site_ids[url] = self.next_site_id
+                    lines.append(f"{self.next_site_id}\t{url}\n")
+                    self.next_site_id += 1
+            if lines:
+                with open(self.index_path, 'a', encoding='utf-8', newline='\n') as f:
+                    f.write(''.join(lines))
+                self._load_site_index()  # Only our own lines, read back to move the offset past them
+
+    @staticmethod
+    def day_name(timestamp):
+        return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+
+    def segment_path(self, day, shard, sorted_segment=False):
+        suffix = '.sorted.bin' if sorted_segment else '.bin'
+        return os.path.join(self.root, day, f"shard-{shard:03d}{suffix}")
+
+    def append(self, url, timestamp, latency_ms, status_code, is_up):
+        """Buffer a check result; the writer thread appends it to disk"""
+        status = status_code if isinstance(status_code, int) and 0 <= status_code < 65536 else 0
+        with self.lock:
+            self.pending.append((int(timestamp), url, latency_ms or 0.0, status, 1 if is_up else 0))
+
+    def _flush_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to their day/shard segments"""
+        with self.lock:
+            records, self.pending = self.pending, []
+        if not records:
+            return
+        with self.flush_lock:
+            # Ids go to disk before any record that uses them
+            new_urls = [url for url in dict.fromkeys(record[1] for record in records) if url not in self.site_ids]
+            if new_urls:
+                self._register_sites(new_urls)
+            batches = collections.defaultdict(bytearray)
+            for timestamp, url, latency_ms, status, is_up in records:
+                site_id = self.site_ids[url]
+                batches[(self.day_name(timestamp), site_id % self.shards)] += self.RECORD.pack(
+                    timestamp, site_id, latency_ms, status, is_up)
+            for (day, shard), data in batches.items():
+                path = self.segment_path(day, shard)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Other processes append to the same segments, and compaction empties them
+                with file_lock(path) as f:
+                    if not os.fstat(f.fileno()).st_size:
+                        f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.RECORD.size, 0))
+                    f.write(data)
+
+    def close(self):
+        self.stop_event.set()
+        self.flush()
+
+    def _record_key(self, view, index):
+        """(site id, timestamp) of record index, used for binary search on sorted segments"""
+        timestamp, site_id = self.KEY.unpack_from(view, self.HEADER.size + index * self.RECORD.size)
+        return site_id, timestamp
+
+    def _bisect(self, count, key_func, target):
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_func(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _scan_segment(self, path, site_id, start, end, is_sorted):
+        with open(path, 'rb') as f:
+            if not is_sorted:
+                # Live segments are in arrival order, which several buffering writers don't keep
+                # in time order, so they are read in full (at most a day). Reading rather than
+                # mapping them is safe when compaction empties the file meanwhile.
+                chunk = f.read()[self.HEADER.size:]
+                chunk = chunk[:len(chunk) - len(chunk) % self.RECORD.size]  # A record still being written
+            else:
+                size = os.fstat(f.fileno()).st_size
+                if size <= self.HEADER.size:
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    count = (size - self.HEADER.size) // self.RECORD.size
+                    lo = self._bisect(count, lambda i: self._record_key(mapped, i), (site_id, start))
+                    hi = self._bisect(count, lambda i: self._record_key(mapped, i), (site_id, end + 1))
+                    offset = self.HEADER.size
+                    chunk = mapped[offset + lo * self.RECORD.size:offset + hi * self.RECORD.size]
+        return [
+            (timestamp, latency, status, bool(up))
+            for timestamp, record_site, latency, status, up in self.RECORD.iter_unpack(chunk)
+            if record_site == site_id and start <= timestamp <= end
+        ]
+
+    def query(self, url, start, end=None):
+        """Return [(timestamp, latency_ms, status_code, is_up)] for url between start and end"""
+        end = time.time() if end is None else end
+        self.flush()
+        if url not in self.site_ids:
+            with self.flush_lock:
+                self._load_site_index()  # Maybe registered by another process since we started
+        site_id = self.site_ids.get(url)
+        if site_id is None:
+            return []
+        shard = site_id % self.shards
+        results = []
+        day = datetime.fromtimestamp(start, timezone.utc).date()
+        last_day = datetime.fromtimestamp(end, timezone.utc).date()
+        while day <= last_day:
+            name = day.strftime('%Y-%m-%d')
+            for is_sorted in (True, False):
+                path = self.segment_path(name, shard, is_sorted)
+                if os.path.exists(path):
+                    results.extend(self._scan_segment(path, site_id, int(start), int(end), is_sorted))
+            day += timedelta(days=1)
+        results.sort()
+        return results
+
+    def compact(self, now=None):
+        """Sort finished days by (site, time) and delete days past retention; returns (sorted, deleted)"""
+        now = time.time() if now is None else now
+        today = self.day_name(now)
+        cutoff = self.day_name(now - self.retention_days * 86400)
+        compacted = deleted = 0
+        if not os.path.isdir(self.root):
+            return compacted, deleted
+        for day in sorted(os.listdir(self.root)):
+            day_dir = os.path.join(self.root, day)
+            if not os.path.isdir(day_dir):
+                continue
+            if day < cutoff:
+                shutil.rmtree(day_dir, ignore_errors=True)
+                deleted += 1
+                continue
+            if day >= today:
+                continue
+            for name in os.listdir(day_dir):
+                if name.endswith('.bin') and not name.endswith('.sorted.bin'):
+                    compacted += self._sort_segment(os.path.join(day_dir, name))
+        return compacted, deleted
+
+    def _sort_segment(self, path):
+        """Merge a live segment into its sorted one and empty it; returns 1 if there was anything to merge
+        
+        The live file is emptied under its lock rather than removed, so a
+        process waiting to append to it never writes to a deleted file.
+        """
+        with self.flush_lock, file_lock(path) as segment:
+            segment.seek(0)
+            data = segment.read()
+            if len(data) <= self.HEADER.size:
+                return 0
+            data = data[self.HEADER.size:]
+            records = list(self.RECORD.iter_unpack(data[:len(data) - len(data) % self.RECORD.size]))
+            sorted_path = path[:-len('.bin')] + '.sorted.bin'
+            if os.path.exists(sorted_path):
+                # A late write landed on an already compacted day: merge it in
+                with open(sorted_path, 'rb') as f:
+                    records.extend(self.RECORD.iter_unpack(f.read()[self.HEADER.size:]))
+            records.sort(key=lambda record: (record[1], record[0]))
+            temp_path = sorted_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.RECORD.size, self.FLAG_SORTED))
+                f.write(b''.join(self.RECORD.pack(*record) for record in records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, sorted_path)
+            segment.truncate(0)
+            return 1
+
+    def run_maintenance(self):
+        """Run compact() on a background thread unless a run is already in progress"""
+        if self.maintenance_thread is not None and self.maintenance_thread.is_alive():
+            return
+        self.maintenance_thread = threading.Thread(target=self.compact, name='history-compaction', daemon=True)
+        self.maintenance_thread.start()
+
+
+class SiteIndex(dict):
+    """url -> settings dict that can also find the URL at a position in O(log n)
+    
+    URLs keep their insertion slot in order, and a Fenwick tree counts the
+    live slots, so at(i) is a tree descent rather than a walk through the
+    dict. Removed slots stay behind as None until they outnumber the live
+    ones, when the slots are rebuilt.
+    """
+
+    def __init__(self, items=()):
+        super().__init__()
+        self.order = []  # URL per slot, None once removed; iterating it never needs a copy
+        self.slots = {}
+        self.tree = [0]  # 1-based Fenwick tree of live slots
+        self.removed = 0
+        for url, settings in (items.items() if isinstance(items, dict) else items):
+            self[url] = settings
+
+    def __setitem__(self, url, settings):
+        if url not in self.slots:
+            slot = self.slots[url] = len(self.order)
+            self.order.append(url)
+            # A new Fenwick node covers itself plus the nodes below it in its range
+            node = slot + 1
+            low = node - (node & -node)
+            self.tree.append(1 + self._prefix(node - 1) - self._prefix(low))
+        super().__setitem__(url, settings)
+
+    def __delitem__(self, url):
+        super().__delitem__(url)
+        slot = self.slots.pop(url)
+        self.order[slot] = None
+        node = slot + 1
+        while node < len(self.tree):
+            self.tree[node] -= 1
+            node += node & -node
+        self.removed += 1
+        if self.removed > 64 and self.removed > len(self):
+            self._rebuild()
+
+    def pop(self, url, *default):
+        if url not in self:
+            if default:
+                return default[0]
+            raise KeyError(url)
+        settings = super().__getitem__(url)
+        del self[url]
+        return settings
+
+    def popitem(self):
+        url = next(reversed(self))
+        return url, self.pop(url)
+
+    def setdefault(self, url, settings=None):
+        if url not in self:
+            self[url] = settings
+        return super().__getitem__(url)
+
+    def update(self, *args, **kwargs):
+        for url, settings in dict(*args, **kwargs).items():
+            self[url] = settings
+
+    def clear(self):
+        super().clear()
+        self.order = []
+        self.slots = {}
+        self.tree = [0]
+        self.removed = 0
+
+    def _prefix(self, node):
+        total = 0
+        while node > 0:
+            total += self.tree[node]
+            node -= node & -node
+        return total
+
+    def _rebuild(self):
+        items = list(self.items())
+        self.clear()
+        for url, settings in items:
+            self[url] = settings
+
+    def at(self, index):
+        """URL at position index (0-based, insertion order)"""
+        if not 0 <= index < len(self):
+            raise IndexError("site index out of range")
+        node, step = 0, 1 << (len(self.tree) - 1).bit_length()
+        remaining = index + 1
+        while step:
+            if node + step < len(self.tree) and self.tree[node + step] < remaining:
+                node += step
+                remaining -= self.tree[node]
+            step >>= 1
+        return self.order[node]
+
+    def iter_urls(self):
+        """URLs in insertion order without copying; changes made meanwhile may or may not be seen"""
+        return (url for url in self.order if url is not None)
+
+
+class SiteRegistry:
+    """Monitored websites and their per-site settings, in the order they were added
+    
+    Reads are served from an in-memory SiteIndex, so lookups are O(1), access
+    by position is O(log n) and the check path never touches the backing store. Every change is written through to
+    the store; changes made inside transaction() are applied all at once, or
+    not at all if the block raises. Subclasses implement the store.
+    """
+
+    path = None
+
+    def __init__(self):
+        self.sites = SiteIndex()  # url -> settings dict, in insertion order
+        self.undo = None  # [(url, previous settings or None)] while a transaction is open
+        self.reload_on_rollback = False  # Set by add_many, which doesn't list what it added in undo
+
+    def __len__(self):
+        return len(self.sites)
+
+    def __iter__(self):
+        return self.sites.iter_urls()
+
+    def __contains__(self, url):
+        return url in self.sites
+
+    def __getitem__(self, index):
+        """Website URL(s) by position, like a list"""
+        if isinstance(index, slice):
+            return [self.sites.at(i) for i in range(*index.indices(len(self.sites)))]
+        if index < 0:
+            index += len(self.sites)
+        return self.sites.at(index)
+
+    def get(self, url, default=None):
+        """Settings dict of url, or default if it isn't registered"""
+        return self.sites.get(url, default)
+
+    def items(self):
+        return list(self.sites.items())
+
+    def tagged(self, tag):
+        """URLs of the websites carrying tag"""
+        return [url for url, settings in self.sites.items() if tag in settings.get('tags', ())]
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Group changes so they are stored together; nested blocks join the outer one
+        
+        If the block or the commit fails, the changes are undone in memory and
+        in the store, and the error is raised.
+        """
+        if self.undo is not None:
+            yield self
+            return
+        self.undo = []
+        try:
+            self._begin()  # Cleans up after itself if it fails
+        except BaseException:
+            self.undo = None
+            raise
+        try:
+            yield self
+            self._commit()
+        except BaseException:
+            if self.reload_on_rollback:
+                # The store has undone everything, so read the sites back from it
+                self._rollback()
+                self.sites = SiteIndex(self._load())
+            else:
+                for url, previous in reversed(self.undo):
+                    if previous is None:
+                        self.sites.pop(url, None)
+                    else:
+                        self.sites[url] = previous
+                self._rollback()
+            raise
+        finally:
+            self.undo = None
+            self.reload_on_rollback = False
+
+    def add_many(self, entries, batch_size=10000):
+        """Register (url, settings) pairs in one transaction; returns (added, duplicates)
+        
+        entries may be any iterable, including a generator over a huge file:
+        it is consumed once and stored in batches, never held in full. Registries
+        with a store don't remember the added URLs for undo: if the import fails,
+        the store rolls back and the sites are read back from it.
+        """
+        added = duplicates = 0
+        batch = []
+        with self.transaction():
+            stored = self.path is not None
+            if stored:
+                self.reload_on_rollback = True
+            for url, settings in entries:
+                if url in self.sites:
+                    duplicates += 1
+                    continue
+                settings = dict(settings or {})
+                if not stored:
+                    self.undo.append((url, None))
+                self.sites[url] = settings
+                batch.append((url, settings))
+                if len(batch) >= batch_size:
+                    self._store_add_many(batch)
+                    added += len(batch)
+                    batch = []
+            self._store_add_many(batch)
+            added += len(batch)
+        return added, duplicates
+
+    def add(self, url, settings=None):
+        """Register url; returns False if it already is"""
+        if url in self.sites:
+            return False
+        with self.transaction():
+            self.undo.append((url, None))
+            self.sites[url] = dict(settings or {})
+            self._store_add(url, self.sites[url])
+        return True
+
+    def update(self, url, settings):
+        """Replace the settings of a registered url"""
+        with self.transaction():
+            self.undo.append((url, self.sites[url]))
+            self.sites[url] = dict(settings)
+            self._store_update(url, self.sites[url])
+
+    def remove(self, url):
+        """Unregister url; returns False if it wasn't registered"""
+        if url not in self.sites:
+            return False
+        with self.transaction():
+            self.undo.append((url, self.sites.pop(url)))
+            self._store_remove(url)
+        return True
+
+    def clear(self):
+        with self.transaction():
+            self.undo.extend(reversed(list(self.sites.items())))
+            self.sites.clear()
+            self._store_clear()
+
+    def reset(self):
+        """Remove every website and leave the store as if it had just been created"""
+        self.clear()
+
+    def reload(self):
+        """Re-read the store after it was changed from outside; returns (added, removed, updated) URL lists
+        
+        The in-memory index is swapped in one step, so checks running on other
+        threads see either the old or the new settings.
+        """
+        old = self.sites
+        new = self._load()
+        added = [url for url in new if url not in old]
+        removed = [url for url in old if url not in new]
+        updated = [url for url in new if url in old and new[url] != old[url]]
+        self.sites = SiteIndex(new)
+        return added, removed, updated
+
+    def watch_paths(self):
+        """Files whose changes mean the store should be reloaded"""
+        return []
+
+    def close(self):
+        pass
+
+    def _load(self):
+        return dict(self.sites)
+
+    def _begin(self):
+        pass
+
+    def _commit(self):
+        pass
+
+    def _rollback(self):
+        pass
+
+    def _store_add(self, url, settings):
+        pass
+
+    def _store_add_many(self, batch):
+        for url, settings in batch:
+            self._store_add(url, settings)
+
+    def _store_update(self, url, settings):
+        pass
+
+    def _store_remove(self, url):
+        pass
+
+    def _store_clear(self):
+        pass
+
+    @staticmethod
+    def parse_entries(entries):
+        """(url, settings) pairs from a websites.json "websites" list of URLs or {"url": ...} objects"""
+        for entry in entries:
+            if isinstance(entry, dict):
+                url = entry.get('url')
+                if url:
+                    yield url, {key: value for key, value in entry.items() if key != 'url'}
+            elif entry:
+                yield entry, {}
+
+
+def atomic_write(path, write):
+    """Replace path with what write(f) writes, so readers and crashes see the old or the new file, never half of one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    if os.name != 'nt':
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class JsonSiteRegistry(SiteRegistry):
+    """Site registry kept in websites.json plus an append-only change journal
+    
+    Each committed transaction is appended to <file>.journal as one JSON line
+    and fsynced, so an edit costs as much as the change, not the list. When
+    the journal outgrows the main file it is compacted: websites.json is
+    rewritten atomically with a higher "journal_generation" and the journal
+    is emptied. Loading replays journal lines of the file's generation; a
+    torn or damaged line (a transaction that never committed) is skipped, so
+    a transaction is all or nothing, and the journal is compacted before
+    anything is appended after it.
+    """
+
+    COMPACT_MIN_BYTES = 65536
+
+    def __init__(self, path, compact_journal=True):
+        super().__init__()
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.journal = None
+        self.journal_bytes = 0
+        self.journal_damaged = False  # Seen a torn line, which a plain append would run into
+        self.main_bytes = 0
+        self.pending = []  # Journal operations of the open transaction
+        self.extra = {}  # Other top-level keys of the file, such as "timeout"
+        self.generation = 0
+        try:
+            self.sites = SiteIndex(self._load())
+        except ValueError:
+            pass  # Corrupt file: start empty, as before
+        if (self.journal_bytes or self.journal_damaged) and compact_journal:
+            self.compact()
+
+    def _load(self):
+        """Websites from the main file plus the journal; ValueError if the file is corrupt or half-written"""
+        sites = {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.main_bytes = os.path.getsize(self.path)
+            self.extra = {key: value for key, value in data.items() if key != 'websites'}
+            for url, settings in self.parse_entries(data.get('websites', [])):
+                sites.setdefault(url, settings)
+        except FileNotFoundError:
+            pass
+        self.generation = self.extra.get('journal_generation', 0)
+        self.replay(sites)
+        return sites
+
+    def watch_paths(self):
+        return [self.path, self.journal_path]
+
+    def replay(self, sites):
+        """Apply the journal's transactions of the current generation to sites; returns how many were applied"""
+        applied = 0
+        self.journal_bytes = 0
+        self.journal_damaged = False
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        if entry.get('generation') != self.generation:
+                            continue  # Already part of the compacted file
+                        operations = [self.check_operation(operation) for operation in entry['ops']]
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        # Torn or damaged write: that transaction never committed, but later ones did
+                        self.journal_damaged = True
+                        continue
+                    for operation in operations:
+                        self.apply(sites, operation)
+                    self.journal_bytes += len(line)
+                    applied += 1
+        except FileNotFoundError:
+            pass
+        return applied
+
+    @staticmethod
+    def check_operation(operation):
+        """operation as an (action, url, settings) tuple; ValueError if it isn't one apply() understands"""
+        action, url, settings = operation
+        if action not in ('add', 'update', 'remove', 'clear'):
+            raise ValueError(f"unknown journal operation {action!r}")
+        if action != 'clear' and not isinstance(url, str):
+            raise ValueError(f"journal operation {action} without a URL")
+        if action in ('add', 'update') and not isinstance(settings, dict):
+            raise ValueError(f"journal operation {action} without settings")
+        return action, url, settings
+
+    @staticmethod
+    def apply(sites, operation):
+        action, url, settings = operation
+        if action == 'add':
+            sites.setdefault(url, settings)
+        elif action == 'update' and url in sites:
+            sites[url] = settings
+        elif action == 'remove':
+            sites.pop(url, None)
+        elif action == 'clear':
+            sites.clear()
+
+    def compact(self):
+        """Write every website to the main file atomically and start an empty journal"""
+        self.generation += 1
+        self.extra['journal_generation'] = self.generation
+        
+        def write(f):
+            # Streamed entry by entry so a huge list isn't built up in memory as one string
+            f.write('{\n  "websites": [')
+            for i, (url, settings) in enumerate(self.sites.items()):
+                f.write((',\n    ' if i else '\n    ') + json.dumps(dict({'url': url}, **settings) if settings else url))
+            f.write('\n  ]')
+            for key, value in self.extra.items():
+                f.write(f',\n  {json.dumps(key)}: {json.dumps(value)}')
+            f.write('\n}\n')
+        
+        atomic_write(self.path, write)
+        self.main_bytes = os.path.getsize(self.path)
+        # A crash before the truncation is harmless: the old lines have an older generation
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        with open(self.journal_path, 'w'):
+            pass
+        self.journal_bytes = 0
+        self.journal_damaged = False
+
+    def reset(self):
+        """Remove every website, drop the other keys of the main file and empty the journal
+        
+        The journal is closed and truncated through this registry, so websites
+        added afterwards don't go to a file that has been deleted underneath it.
+        """
+        self.sites.clear()
+        self.extra = {}
+        self.compact()
+
+    def _begin(self):
+        self.pending = []
+
+    def _commit(self):
+        if not self.pending:
+            return
+        if self.journal_damaged or len(self.pending) > max(1000, len(self.sites) // 2):
+            # A bulk change rewrites most of the file anyway, and a line appended
+            # after a torn one would be torn with it: skip the journal
+            self.pending = []
+            self.compact()
+            return
+        line = json.dumps({'generation': self.generation, 'ops': self.pending}) + '\n'
+        self.pending = []
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a', encoding='utf-8')
+        self.journal.write(line)
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.journal_bytes += len(line)
+        if self.journal_bytes > max(self.COMPACT_MIN_BYTES, self.main_bytes):
+            self.compact()
+
+    def _rollback(self):
+        self.pending = []
+
+    def _store_add(self, url, settings):
+        self.pending.append(('add', url, settings))
+
+    def _store_update(self, url, settings):
+        self.pending.append(('update', url, settings))
+
+    def _store_remove(self, url):
+        self.pending.append(('remove', url, None))
+
+    def _store_clear(self):
+        self.pending.append(('clear', None, None))
+
+    def close(self):
+        if self.journal_bytes:
+            self.compact()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+
+class SqliteSiteRegistry(SiteRegistry):
+    """Site registry in a SQLite database (WAL mode), changed row by row
+    
+    Every add, update and remove touches only its own row through the unique
+    url index, so edits cost O(log n) however many websites are registered.
+    interval, probe mode, expected status and tags have their own columns
+    (tags in an indexed side table); any other settings are kept as JSON.
+    """
+
+    COLUMNS = ('interval', 'probe', 'expected_status')
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sites (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL UNIQUE,
+            interval REAL,
+            probe TEXT,
+            expected_status TEXT,
+            options TEXT
+        );
+        CREATE TABLE IF NOT EXISTS site_tags (
+            tag TEXT NOT NULL,
+            site_id INTEGER NOT NULL REFERENCES sites(id) ON DELETE CASCADE,
+            PRIMARY KEY (tag, site_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS site_tags_site ON site_tags(site_id);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.lock = threading.RLock()
+        # Transactions are managed explicitly in _begin/_commit/_rollback
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('PRAGMA foreign_keys=ON')
+        self.db.executescript(self.SCHEMA)
+        self.sites = SiteIndex(self._load())
+
+    def _load(self):
+        sites = {}
+        with self.lock:
+            tags = collections.defaultdict(list)
+            for tag, site_id in self.db.execute('SELECT tag, site_id FROM site_tags'):
+                tags[site_id].append(tag)
+            rows = self.db.execute('SELECT id, url, interval, probe, expected_status, options FROM sites ORDER BY id')
+            for site_id, url, interval, probe, expected_status, options in rows:
+                settings = json.loads(options) if options else {}
+                for key, value in zip(self.COLUMNS, (interval, probe, expected_status)):
+                    if value is not None:
+                        settings[key] = json.loads(value) if key == 'expected_status' else value
+                if site_id in tags:
+                    settings['tags'] = sorted(tags[site_id])
+                sites[url] = settings
+        return sites
+
+    def watch_paths(self):
+        # Other processes' commits land in the write-ahead log first
+        return [self.path, self.path + '-wal']
+
+    def migrate_from(self, json_path):
+        """Import websites.json once; returns the number of websites imported
+        
+        The migration is recorded in the database, so websites removed later
+        are not brought back on the next start. The JSON file and its journal
+        are then renamed to <name>.migrated, so nobody keeps editing a file
+        that is no longer read.
+        """
+        with self.lock:
+            if self.db.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone():
+                return 0
+            source = JsonSiteRegistry(json_path) if os.path.exists(json_path) else SiteRegistry()
+            source.close()
+            with self.transaction():
+                for url, settings in source.sites.items():
+                    self.add(url, settings)
+                self.db.execute("INSERT INTO meta VALUES ('migrated_from', ?)", (os.path.abspath(json_path),))
+            for path in (json_path, json_path + '.journal'):
+                if os.path.exists(path):
+                    os.replace(path, path + '.migrated')
+            return len(source)
+
+    def _begin(self):
+        self.lock.acquire()
+        try:
+            self.db.execute('BEGIN IMMEDIATE')
+        except BaseException:
+            self.lock.release()
+            raise
+
+    def _commit(self):
+        # If COMMIT fails, transaction() undoes the change and calls _rollback, which releases the lock
+        self.db.execute('COMMIT')
+        self.lock.release()
+
+    def _rollback(self):
+        try:
+            if self.db.in_transaction:  # Nothing to undo if BEGIN itself failed
+                self.db.execute('ROLLBACK')
+        finally:
+            self.lock.release()
+
+    def _row(self, settings):
+        if not settings:
+            return (None, None, None, None)
+        options = {key: value for key, value in settings.items() if key not in self.COLUMNS and key != 'tags'}
+        expected = settings.get('expected_status')
+        return (settings.get('interval'), settings.get('probe'),
+                json.dumps(expected) if expected is not None else None,
+                json.dumps(options) if options else None)
+
+    def _store_tags(self, pairs):
+        """Insert (tag, url) pairs, looking each site id up inside SQLite"""
+        self.db.executemany('INSERT OR IGNORE INTO site_tags SELECT ?, id FROM sites WHERE url = ?', pairs)
+
+    def _store_add(self, url, settings):
+        self.db.execute('INSERT INTO sites (url, interval, probe, expected_status, options) VALUES (?, ?, ?, ?, ?)',
+                        (url,) + self._row(settings))
+        self._store_tags([(tag, url) for tag in settings.get('tags') or ()])
+
+    def _store_add_many(self, batch):
+        self.db.executemany('INSERT INTO sites (url, interval, probe, expected_status, options) VALUES (?, ?, ?, ?, ?)',
+                            [(url,) + self._row(settings) for url, settings in batch])
+        self._store_tags([(tag, url) for url, settings in batch for tag in settings.get('tags') or ()])
+
+    def _store_update(self, url, settings):
+        self.db.execute('UPDATE sites SET interval = ?, probe = ?, expected_status = ?, options = ? WHERE url = ?',
+                        self._row(settings) + (url,))
+        self.db.execute('DELETE FROM site_tags WHERE site_id = (SELECT id FROM sites WHERE url = ?)', (url,))
+        self._store_tags([(tag, url) for tag in settings.get('tags') or ()])
+
+    def _store_remove(self, url):
+        self.db.execute('DELETE FROM sites WHERE url = ?', (url,))
+
+    def _store_clear(self):
+        self.db.execute('DELETE FROM site_tags')
+        self.db.execute('DELETE FROM sites')
+
+    def tagged(self, tag):
+        with self.lock:
+            rows = self.db.execute('SELECT url FROM site_tags JOIN sites ON sites.id = site_id '
+                                   'WHERE tag = ? ORDER BY site_id', (tag,)).fetchall()
+        return [url for url, in rows]
+
+    def close(self):
+        self.db.close()
+
+
+def normalize_url(url):
+    """Website URL as add_website stores it: trimmed, with https:// added when there is no scheme"""
+    url = url.strip()
+    if url and not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+
+SITE_FILE_FORMATS = ('txt', 'csv', 'jsonl', 'json')
+# Scheme plus a host name (labels of letters, digits and inner hyphens) or an IP address;
+# much cheaper than urlsplit for million-line imports
+SITE_URL_PATTERN = re.compile(
+    r'https?://(?:[^/?#\s@]*@)?'
+    r'(?:(?:[^\W_](?:[\w-]{0,61}[^\W_])?\.)*[^\W_](?:[\w-]{0,61}[^\W_])?\.?|\[[0-9A-Fa-f:.]+\])'
+    r'(?::\d{1,5})?(?:[/?#]|$)'
+)
+SITE_CSV_COLUMNS = ('url', 'interval', 'probe', 'expected_status', 'tags', 'options')
+
+
+def site_file_format(path, default='txt'):
+    """Site list format from a file name's extension"""
+    extension = os.path.splitext(path)[1].lower()
+    return {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'json'}.get(extension, default)
+
+
+class SiteFileReader:
+    """Streams (url, settings) pairs out of a site list, one line at a time
+    
+    txt: one URL per line; blank lines and # comments are skipped.
+    csv: a "url" column, optionally interval, probe, expected_status and tags
+         (both ;-separated lists) and options (JSON of any other settings).
+    jsonl: one websites.json entry - a URL string or an object - per line.
+    json: a whole websites.json document (the only format read at once).
+    URLs are normalized like add_website does; unusable lines are counted in .invalid.
+    """
+
+    def __init__(self, stream, fmt='txt'):
+        if fmt not in SITE_FILE_FORMATS:
+            raise ValueError(f"Unknown site list format: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self.invalid = 0
+
+    def __iter__(self):
+        entries = getattr(self, f"_read_{self.fmt}")()
+        for url, settings in entries:
+            url = normalize_url(url) if isinstance(url, str) else ''
+            if not SITE_URL_PATTERN.match(url):
+                self.invalid += 1
+                continue
+            tags = settings.get('tags')
+            if isinstance(tags, str):
+                # "tags": "prod" is one tag, not four
+                settings['tags'] = [tags] if tags else []
+            elif tags is not None and not isinstance(tags, list):
+                self.invalid += 1
+                continue
+            yield url, settings
+
+    def _read_txt(self):
+        for line in self.stream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line.split()[0], {}
+
+    def _read_csv(self):
+        for row in csv.DictReader(self.stream):
+            try:
+                settings = json.loads(row['options']) if row.get('options') else {}
+                if row.get('interval'):
+                    settings['interval'] = float(row['interval'])
+                if row.get('probe'):
+                    settings['probe'] = row['probe']
+                if row.get('expected_status'):
+                    codes = [int(code) for code in row['expected_status'].split(';')]
+                    settings['expected_status'] = codes[0] if len(codes) == 1 else codes
+                if row.get('tags'):
+                    settings['tags'] = row['tags'].split(';')
+                yield row.get('url') or '', settings
+            except (ValueError, AttributeError):
+                self.invalid += 1
+
+    def _read_jsonl(self):
+        for line in self.stream:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                self.invalid += 1
+                continue
+            if isinstance(entry, dict):
+                yield entry.get('url'), {key: value for key, value in entry.items() if key != 'url'}
+            else:
+                yield entry, {}
+
+    def _read_json(self):
+        return SiteRegistry.parse_entries(json.load(self.stream).get('websites', []))
+
+
+def write_site_entries(stream, items, fmt='txt'):
+    """Write (url, settings) pairs to stream in one of SITE_FILE_FORMATS; returns the count"""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(SITE_CSV_COLUMNS)
+        for url, settings in items:
+            expected = settings.get('expected_status')
+            options = {key: value for key, value in settings.items() if key not in SITE_CSV_COLUMNS}
+            writer.writerow((
+                url, settings.get('interval', ''), settings.get('probe', ''),
+                ';'.join(map(str, expected if isinstance(expected, list) else [expected])) if expected is not None else '',
+                ';'.join(settings.get('tags', ())), json.dumps(options) if options else ''
+            ))
+            count += 1
+        return count
+    if fmt == 'json':
+        stream.write('{\n  "websites": [')
+    for url, settings in items:
+        if fmt == 'txt':
+            stream.write(url + '\n')
+        else:
+            entry = json.dumps(dict({'url': url}, **settings) if settings else url)
+            stream.write(entry + '\n' if fmt == 'jsonl' else (',\n    ' if count else '\n    ') + entry)
+        count += 1
+    if fmt == 'json':
+        stream.write('\n  ]\n}\n')
+    return count
+
+
+class DNSResolutionError(OSError):
+    """Host name could not be resolved (possibly served from the negative cache)"""
+
+
+class DNSCache:
+    """Bounded LRU cache of host name lookups that honours record TTLs
+    
+    Failed lookups are cached for negative_ttl seconds so a broken name does
+    not hit the resolver on every check. Concurrent misses for the same host
+    share a single lookup.
+    """
+
+    def __init__(self, max_entries=10000, default_ttl=300, negative_ttl=30, min_ttl=1):
+        self.max_entries = max(1, int(max_entries))
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.entries = collections.OrderedDict()  # host -> (expires, addresses, error)
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, host):
+        """Fresh cache entry for host as (addresses, error), or None"""
+        with self.lock:
+            entry = self.entries.get(host)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self.entries.move_to_end(host)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def _lookup(self, host):
+        """Resolve host, returning (addresses, ttl)"""
+        if dns_resolver is not None:
+            try:
+                addresses, ttl = [], None
+                for record_type in ('A', 'AAAA'):
+                    try:
+                        answer = dns_resolver.resolve(host, record_type)
+                    except (dns_resolver.NoAnswer, dns_resolver.NXDOMAIN):
+                        continue
+                    addresses.extend(record.to_text() for record in answer)
+                    ttl = answer.rrset.ttl if ttl is None else min(ttl, answer.rrset.ttl)
+                if addresses:
+                    return addresses, ttl
+            except Exception:
+                pass  # Fall back to the system resolver, which also knows the hosts file
+        try:
+            infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise DNSResolutionError(f"{host}: {e.strerror or e}") from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        return addresses, self.default_ttl
+
+    def resolve(self, host):
+        """Return (addresses, lookup_ms) for host; lookup_ms is 0 for cache hits"""
+        try:
+            ipaddress.ip_address(host)
+            return [host], 0.0
+        except ValueError:
+            pass
+        
+        while True:
+            entry = self.cached(host)
+            if entry is not None:
+                addresses, error = entry
+                if error:
+                    raise DNSResolutionError(error)
+                return addresses, 0.0
+            with self.lock:
+                waiting = self.in_flight.get(host)
+                if waiting is None:
+                    done = self.in_flight[host] = threading.Event()
+                    self.misses += 1
+                    break
+            waiting.wait()
+        
+        start = time.perf_counter()
+        try:
+            try:
+                addresses, ttl = self._lookup(host)
+                entry = (time.monotonic() + max(self.min_ttl, ttl), addresses, None)
+            except DNSResolutionError as e:
+                entry = (time.monotonic() + self.negative_ttl, None, str(e))
+            except Exception as e:
+                # e.g. UnicodeError for a label over 63 characters: as unresolvable as NXDOMAIN
+                entry = (time.monotonic() + self.negative_ttl, None, f"{host}: {e}")
+            lookup_ms = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.entries[host] = entry
+                self.entries.move_to_end(host)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        finally:
+            # Waiters must never be left blocked on a lookup that didn't finish
+            with self.lock:
+                self.in_flight.pop(host, None)
+            done.set()
+        if entry[2]:
+            raise DNSResolutionError(entry[2])
+        return entry[1], lookup_ms
+
+    def prewarm(self, hosts, max_workers=20):
+        """Resolve hosts in parallel so the first checks start with a warm cache; returns failures"""
+        def resolve_quietly(host):
+            try:
+                self.resolve(host)
+                return True
+            except Exception:
+                return False
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            return list(executor.map(resolve_quietly, set(hosts))).count(False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_instrumented_adapter_class = None
+
+
+def instrumented_adapter_class():
+    """requests HTTPAdapter whose connections use a DNSCache and time each phase of a request
+    
+    Lookup, TCP connect, TLS handshake and time to the response headers are
+    added to the running check's check_timings.value. The pool's dns_cache may
+    be None (resolve with getaddrinfo) and phase_timings False (only DNS is
+    timed). Built on first use so urllib3 is still only imported when the
+    first check runs.
+    """
+    global _instrumented_adapter_class
+    if _instrumented_adapter_class is not None:
+        return _instrumented_adapter_class
+    
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+    from urllib3.util import connection
+    
+    class InstrumentedConnectionMixin:
+        dns_cache = None
+        phase_timings = False
+        setup_ms = 0.0  # Lookup and TCP connect time of the last new socket
+        sent_at = None
+        
+        def _resolve(self):
+            if self.dns_cache is not None:
+                return self.dns_cache.resolve(self.host)
+            start = time.perf_counter()
+            try:
+                infos = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)
+            except socket.gaierror as e:
+                raise DNSResolutionError(f"{self.host}: {e.strerror or e}") from e
+            return list(dict.fromkeys(info[4][0] for info in infos)), (time.perf_counter() - start) * 1000
+        
+        def _new_conn(self):
+            timings = getattr(check_timings, 'value', None)
+            try:
+                addresses, lookup_ms = self._resolve()
+            except DNSResolutionError as e:
+                if timings is not None:
+                    timings['dns_error'] = str(e)
+                raise NewConnectionError(self, str(e)) from e
+            if timings is not None:
+                timings['dns_ms'] = timings.get('dns_ms', 0.0) + lookup_ms
+            
+            last_error = None
+            for address in addresses:
+                start = time.perf_counter()
+                try:
+                    sock = connection.create_connection(
+                        (address, self.port), self.timeout,
+                        source_address=self.source_address,
+                        socket_options=self.socket_options
+                    )
+                except socket.timeout as e:
+                    raise ConnectTimeoutError(
+                        self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+                    ) from e
+                except OSError as e:
+                    last_error = e
+                    continue
+                if timings is not None and self.phase_timings:
+                    connect_ms = (time.perf_counter() - start) * 1000
+                    timings['connect_ms'] = timings.get('connect_ms', 0.0) + connect_ms
+                    self.setup_ms = lookup_ms + connect_ms
+                return sock
+            raise NewConnectionError(self, f"Failed to establish a new connection: {last_error}") from last_error
+        
+        def connect(self):
+            timings = getattr(check_timings, 'value', None) if self.phase_timings else None
+            if timings is None or not isinstance(self, HTTPSConnection):
+                return super().connect()
+            start = time.perf_counter()
+            self.setup_ms = 0.0
+            super().connect()
+            # Everything connect() spent beyond the lookup and the TCP handshake is the TLS handshake
+            tls_ms = (time.perf_counter() - start) * 1000 - self.setup_ms
+            timings['tls_ms'] = timings.get('tls_ms', 0.0) + max(0.0, tls_ms)
+        
+        def request(self, *args, **kwargs):
+            super().request(*args, **kwargs)
+            self.sent_at = time.perf_counter()
+        
+        def getresponse(self, *args, **kwargs):
+            response = super().getresponse(*args, **kwargs)
+            timings = getattr(check_timings, 'value', None) if self.phase_timings else None
+            if timings is not None and self.sent_at is not None:
+                now = time.perf_counter()
+                timings['ttfb_ms'] = timings.get('ttfb_ms', 0.0) + (now - self.sent_at) * 1000
+                timings['headers_at'] = now  # check_website times the body from here
+            return response
+    
+    class InstrumentedHTTPConnection(InstrumentedConnectionMixin, HTTPConnection):
+        pass
+    
+    class InstrumentedHTTPSConnection(InstrumentedConnectionMixin, HTTPSConnection):
+        pass
+    
+    class InstrumentedAdapter(requests.adapters.HTTPAdapter):
+        def __init__(self, dns_cache, phase_timings=True, **kwargs):
+            # One pair of pool classes per adapter, so the connections know which cache to use
+            settings = {'dns_cache': dns_cache, 'phase_timings': phase_timings}
+            http_connection = type('HTTPConnection', (InstrumentedHTTPConnection,), settings)
+            https_connection = type('HTTPSConnection', (InstrumentedHTTPSConnection,), settings)
+            self.pool_classes = {
+                'http': type('HTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_connection}),
+                'https': type('HTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_connection}),
+            }
+            super().__init__(**kwargs)
+        
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = self.pool_classes
+    
+    _instrumented_adapter_class = InstrumentedAdapter
+    return _instrumented_adapter_class
+
+
+class HostSessionPool:
+    """Long-lived keep-alive sessions, one per host, shared across checks and monitor cycles"""
+
+    def __init__(self, pool_maxsize=4, idle_timeout=300, dns_cache=None, phase_timings=True):
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self.idle_timeout = idle_timeout
+        self.dns_cache = dns_cache
+        self.phase_timings = phase_timings
+        self.host_sizes = {}
+        self.sessions = {}  # host -> [session, pool size, last used]
+        self.lock = threading.Lock()
+
+    def configure(self, urls):
+        """Size each host's pool by how many monitored URLs share it, capped at pool_maxsize"""
+        counts = collections.Counter(urlsplit(url).hostname for url in urls)
+        sizes = {host: min(count, self.pool_maxsize) for host, count in counts.items() if host}
+        with self.lock:
+            self.host_sizes = sizes
+            # Rebuild pools whose size changed; they are recreated lazily on next use
+            stale = [host for host, entry in self.sessions.items() if entry[1] != sizes.get(host, 1)]
+            closing = [self.sessions.pop(host)[0] for host in stale]
+        for session in closing:
+            session.close()
+
+    def get_session(self, url):
+        """Return the session for url's host, creating it on first use"""
+        host = urlsplit(url).hostname
+        with self.lock:
+            entry = self.sessions.get(host)
+            if entry is None:
+                size = self.host_sizes.get(host, 1)
+                session = requests.Session()
+                if self.dns_cache is not None or self.phase_timings:
+                    adapter = instrumented_adapter_class()(self.dns_cache, self.phase_timings,
+                                                           pool_connections=4, pool_maxsize=size)
+                else:
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                entry = self.sessions[host] = [session, size, 0]
+            entry[2] = time.monotonic()
+            return entry[0]
+
+    def evict_idle(self):
+        """Close sessions that have not been used for idle_timeout seconds"""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self.lock:
+            idle = [host for host, entry in self.sessions.items() if entry[2] < cutoff]
+            closing = [self.sessions.pop(host)[0] for host in idle]
+        for session in closing:
+            session.close()
+        return len(closing)
+
+    def close(self):
+        """Close every pooled connection"""
+        with self.lock:
+            closing = [entry[0] for entry in self.sessions.values()]
+            self.sessions.clear()
+        for session in closing:
+            session.close()
+
+
+class SiteScheduler:
+    """Priority queue of per-site next-due times with jittered, drift-free cadence"""
+
+    def __init__(self, jitter=0.1):
+        self.jitter = max(0.0, min(float(jitter), 0.5))
+        self.heap = []  # (due, seq, url, slot)
+        self.intervals = {}
+        self.entries = {}  # url -> seq of its live heap entry; older entries are skipped
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def __contains__(self, url):
+        return url in self.intervals
+
+    def add(self, url, interval, now=None):
+        """Start scheduling url; its first check lands at a random point within one interval"""
+        now = time.time() if now is None else now
+        interval = max(0.1, float(interval))
+        self.intervals[url] = interval
+        # Spread first checks over the interval so a large list doesn't burst at startup
+        self._push(url, now + random.uniform(0, interval))
+
+    def remove(self, url):
+        """Stop scheduling url (its heap entry is discarded lazily)"""
+        self.intervals.pop(url, None)
+        self.entries.pop(url, None)
+
+    def _push(self, url, slot):
+        seq = next(self.counter)
+        self.entries[url] = seq
+        spread = self.jitter * self.intervals[url]
+        due = slot + random.uniform(-spread, spread) if spread else slot
+        heapq.heappush(self.heap, (due, seq, url, slot))
+
+    def _drop_stale(self):
+        while self.heap and self.entries.get(self.heap[0][2]) != self.heap[0][1]:
+            heapq.heappop(self.heap)
+
+    def pop_due(self, now=None):
+        """Return [(url, lag_seconds)] for every site that is due and schedule its next check"""
+        now = time.time() if now is None else now
+        due_sites = []
+        while True:
+            self._drop_stale()
+            if not self.heap or self.heap[0][0] > now:
+                return due_sites
+            due, _, url, slot = heapq.heappop(self.heap)
+            due_sites.append((url, now - due))
+            # Next slot is computed from the un-jittered grid so jitter and lag never accumulate
+            interval = self.intervals[url]
+            next_slot = slot + interval
+            if next_slot <= now:
+                next_slot += interval * int((now - next_slot) // interval + 1)
+            self._push(url, next_slot)
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the earliest due check, or None when nothing is scheduled"""
+        self._drop_stale()
+        if not self.heap:
+            return None
+        now = time.time() if now is None else now
+        return max(0.0, self.heap[0][0] - now)
+
+
+class TokenBucket:
+    """Token bucket allowing rate events per second with bursts of up to burst events"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst if burst else rate))
+        self.tokens = self.burst
+        self.updated = None
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 if one is available now)"""
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """Global and per-host check rate limits plus a per-host concurrency cap
+    
+    A limit of 0 means unlimited. Hosts can get their own rate and cap (from
+    the "rate_limit" and "max_concurrency" website settings); when several
+    websites on one host disagree, the strictest value wins.
+    """
+
+    def __init__(self, global_rate=0, host_rate=0, host_concurrency=0):
+        self.global_bucket = TokenBucket(global_rate) if global_rate > 0 else None
+        self.host_rate = host_rate
+        self.host_concurrency = host_concurrency
+        self.host_rates = {}
+        self.host_caps = {}
+        self.host_buckets = {}
+        self.active = collections.Counter()
+
+    def set_host_limits(self, host, rate=None, concurrency=None):
+        """Tighten the limits of one host; they never go above the defaults for every host"""
+        if rate:
+            rate = min(rate, self.host_rate) if self.host_rate > 0 else rate
+            self.host_rates[host] = min(rate, self.host_rates.get(host, rate))
+        if concurrency:
+            concurrency = min(concurrency, self.host_concurrency) if self.host_concurrency > 0 else concurrency
+            self.host_caps[host] = min(concurrency, self.host_caps.get(host, concurrency))
+
+    @property
+    def enabled(self):
+        return bool(self.global_bucket or self.host_rate > 0 or self.host_concurrency > 0
+                    or self.host_rates or self.host_caps)
+
+    def _host_bucket(self, host):
+        bucket = self.host_buckets.get(host)
+        if bucket is None:
+            rate = self.host_rates.get(host, self.host_rate)
+            if rate <= 0:
+                return None
+            bucket = self.host_buckets[host] = TokenBucket(rate)
+        return bucket
+
+    def acquire(self, host, now):
+        """Try to start a check on host
+        
+        Returns 0 when the check may start (tokens and a concurrency slot are
+        taken), the number of seconds to wait for a token, or None when the
+        host is at its concurrency cap and must wait for a release().
+        """
+        cap = self.host_caps.get(host, self.host_concurrency)
+        if cap > 0 and self.active[host] >= cap:
+            return None
+        buckets = [bucket for bucket in (self.global_bucket, self._host_bucket(host)) if bucket is not None]
+        wait = max([bucket.wait_time(now) for bucket in buckets], default=0.0)
+        if wait > 0:
+            return wait
+        for bucket in buckets:
+            bucket.take()
+        self.active[host] += 1
+        return 0.0
+
+    def release(self, host):
+        if self.active[host] > 0:
+            self.active[host] -= 1
+
+
+class ThrottledDispatcher:
+    """Feeds URLs to a check engine as fast as a RateLimiter allows, without busy-waiting
+    
+    URLs that are out of tokens wait in a heap keyed by the time a token will
+    be available; URLs blocked by a host's concurrency cap wait in a per-host
+    queue until a check on that host finishes.
+    """
+
+    def __init__(self, engine, limiter):
+        self.engine = engine
+        self.limiter = limiter
+        self.deferred = []  # (ready_at, seq, url)
+        self.blocked = collections.defaultdict(collections.deque)
+        self.sequence = itertools.count()
+        self.in_flight = set()
+        self.pending = set()  # Accepted but not finished: in flight, deferred or blocked
+        self.hosts = {}
+
+    def _host(self, url):
+        host = self.hosts.get(url)
+        if host is None:
+            host = self.hosts[url] = urlsplit(url).hostname or url
+        return host
+
+    def offer(self, urls, now=None):
+        """Start urls now where the limits allow and queue the rest"""
+        now = time.time() if now is None else now
+        ready = []
+        for url in urls:
+            self.pending.add(url)
+            if not self.limiter.enabled:
+                ready.append(url)
+                continue
+            self._try_start(url, now, ready)
+        self._submit(ready)
+
+    def _try_start(self, url, now, ready):
+        host = self._host(url)
+        wait = self.limiter.acquire(host, now)
+        if wait is None:
+            self.blocked[host].append(url)
+        elif wait > 0:
+            heapq.heappush(self.deferred, (now + wait, next(self.sequence), url))
+        else:
+            ready.append(url)
+
+    def _submit(self, urls):
+        if not urls:
+            return
+        self.in_flight.update(urls)
+        if len(urls) > 1 and hasattr(self.engine, 'submit_many'):
+            self.engine.submit_many(urls)
+        else:
+            for url in urls:
+                self.engine.submit(url)
+
+    def poll(self, now=None):
+        """Start deferred URLs whose tokens should now be available"""
+        now = time.time() if now is None else now
+        ready = []
+        while self.deferred and self.deferred[0][0] <= now:
+            _, _, url = heapq.heappop(self.deferred)
+            self._try_start(url, now, ready)
+        self._submit(ready)
+
+    def seconds_until_ready(self, now=None):
+        """Seconds until the earliest deferred URL may start, or None"""
+        if not self.deferred:
+            return None
+        now = time.time() if now is None else now
+        return max(0.0, self.deferred[0][0] - now)
+
+    def set_limiter(self, limiter):
+        """Switch to new limits without losing track of running or waiting checks"""
+        limiter.active = self.limiter.active
+        self.limiter = limiter
+        waiting = [url for _, _, url in self.deferred] + [url for urls in self.blocked.values() for url in urls]
+        self.deferred = []
+        self.blocked.clear()
+        self.offer(waiting)
+
+    def complete(self, url, now=None):
+        """Record that url's check finished, freeing its host slot for a blocked URL"""
+        self.in_flight.discard(url)
+        self.pending.discard(url)
+        if not self.limiter.enabled:
+            return
+        host = self._host(url)
+        self.limiter.release(host)
+        if self.blocked[host]:
+            ready = []
+            self._try_start(self.blocked[host].popleft(), time.time() if now is None else now, ready)
+            self._submit(ready)
+
+
+class _StatusProtocol(asyncio.Protocol):
+    """Sends one request and resolves a future with the raw response head"""
+
+    MAX_HEAD_SIZE = 65536
+
+    def __init__(self, request, done):
+        self.request = request
+        self.done = done
+        self.buffer = bytearray()
+        self.transport = None
+        self.sent_at = self.headers_at = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def send(self):
+        """Write the request once connected (and, for https, after the TLS handshake)"""
+        self.transport.write(self.request)
+        self.sent_at = time.perf_counter()
+
+    def data_received(self, data):
+        self.buffer += data
+        end = self.buffer.find(b'\r\n\r\n')
+        if end != -1:
+            if not self.done.done():
+                self.headers_at = time.perf_counter()
+                self.done.set_result(bytes(self.buffer[:end]))
+            # The body is never needed, so hang up as soon as the headers are in
+            self.transport.close()
+        elif len(self.buffer) > self.MAX_HEAD_SIZE and not self.done.done():
+            self.done.set_exception(ConnectionError("Response headers too large"))
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        if not self.done.done():
+            self.done.set_exception(exc or ConnectionError("Connection closed before response headers"))
+
+
+class AsyncHTTPProbe:
+    """Minimal non-blocking HTTP/1.1 client that only reads as far as the status line and headers"""
+
+    REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+    def __init__(self, user_agent, max_redirects=10, dns_cache=None, phase_timings=True):
+        self.user_agent = user_agent
+        self.max_redirects = max_redirects
+        self.dns_cache = dns_cache
+        self.phase_timings = phase_timings
+        self.ssl_context = ssl.create_default_context()
+
+    async def fetch_status(self, url, timeout, method='GET', extra_headers=None, timings=None):
+        """Return the final HTTP status code for url, following redirects like requests.get
+        
+        If timings is a dict, DNS lookup time is added to timings['dns_ms'] and,
+        with phase_timings, connect, TLS and time to the headers to
+        timings['connect_ms'], ['tls_ms'] and ['ttfb_ms']. There is no transfer
+        phase: the probe hangs up once the headers are in.
+        """
+        loop = asyncio.get_event_loop()
+        task = asyncio.current_task()
+        expired = []
+        
+        def expire():
+            expired.append(True)
+            task.cancel()
+        
+        # A single timer for the whole check is much cheaper than asyncio.wait_for per request
+        timer = loop.call_later(timeout, expire)
+        try:
+            for _ in range(self.max_redirects + 1):
+                status_code, location = await self._request(loop, url, method, extra_headers, timings)
+                if status_code in self.REDIRECT_CODES and location:
+                    url = urljoin(url, location)
+                    method = self.redirect_method(method, status_code)
+                    continue
+                return status_code
+            raise ConnectionError(f"Exceeded {self.max_redirects} redirects")
+        except asyncio.CancelledError:
+            if expired:
+                raise asyncio.TimeoutError()
+            raise
+        finally:
+            timer.cancel()
+
+    @staticmethod
+    def redirect_method(method, status_code):
+        """Method for the request that follows a redirect, chosen as requests does
+        
+        303 and 302 turn anything but HEAD into GET, and 301 turns POST into
+        GET. HEAD stays HEAD (RFC 7231 6.4.4), as with the session.head of the
+        threads backend, so both backends report the same status.
+        """
+        if status_code in (302, 303) and method != 'HEAD':
+            return 'GET'
+        if status_code == 301 and method == 'POST':
+            return 'GET'
+        return method
+
+    async def _resolve(self, loop, host, timings):
+        """Addresses for host from the DNS cache; misses are resolved on a worker thread"""
+        if self.dns_cache is None:
+            return [host]
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        entry = self.dns_cache.cached(host)
+        if entry is not None and not entry[1]:
+            if timings is not None:
+                timings.setdefault('dns_ms', 0.0)
+            return entry[0]
+        try:
+            addresses, lookup_ms = await loop.run_in_executor(None, self.dns_cache.resolve, host)
+        except DNSResolutionError as e:
+            if timings is not None:
+                timings['dns_error'] = str(e)
+            raise
+        if timings is not None:
+            timings['dns_ms'] = timings.get('dns_ms', 0.0) + lookup_ms
+        return addresses
+
+    async def _request(self, loop, url, method, extra_headers, timings=None):
+        parts = urlsplit(url)
+        is_https = parts.scheme == 'https'
+        host = parts.hostname
+        if not host:
+            raise ValueError(f"Invalid URL: {url}")
+        port = parts.port or (443 if is_https else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        host_header = host if parts.port is None else f"{host}:{parts.port}"
+        extra = ''.join(f"{name}: {value}\r\n" for name, value in (extra_headers or {}).items())
+        request = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {host_header}\r\n"
+            f"User-Agent: {self.user_agent}\r\n"
+            "Accept: */*\r\n"
+            f"{extra}"
+            "Connection: close\r\n\r\n"
+        ).encode('latin-1')
+        
+        transport = last_error = None
+        for address in await self._resolve(loop, host, timings):
+            done = loop.create_future()
+            start = time.perf_counter()
+            try:
+                # TCP and TLS are set up in two steps so each can be timed
+                transport, protocol = await loop.create_connection(lambda: _StatusProtocol(request, done), address, port)
+                connected_at = time.perf_counter()
+                if is_https:
+                    try:
+                        transport = protocol.transport = await loop.start_tls(
+                            transport, protocol, self.ssl_context, server_hostname=host
+                        )
+                    except BaseException:
+                        transport.close()
+                        raise
+                break
+            except OSError as e:
+                transport = None
+                last_error = e
+                if done.done():
+                    done.exception()  # Already reported as last_error
+        if transport is None:
+            raise last_error
+        try:
+            protocol.send()
+            head = await done
+        finally:
+            transport.close()
+        if timings is not None and self.phase_timings:
+            timings['connect_ms'] = timings.get('connect_ms', 0.0) + (connected_at - start) * 1000
+            if is_https:
+                timings['tls_ms'] = timings.get('tls_ms', 0.0) + (protocol.sent_at - connected_at) * 1000
+            timings['ttfb_ms'] = timings.get('ttfb_ms', 0.0) + (protocol.headers_at - protocol.sent_at) * 1000
+        
+        lines = head.decode('latin-1').split('\r\n')
+        fields = lines[0].split(None, 2)
+        if len(fields) < 2 or not fields[0].startswith('HTTP/'):
+            raise ConnectionError(f"Malformed status line from {host}")
+        status_code = int(fields[1])
+        
+        location = None
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'location':
+                location = value.strip()
+                break
+        return status_code, location
+
+
+class ScreenRenderer:
+    """Differential full-screen renderer for the live dashboard
+    
+    Keeps the previous frame and, on each render, moves the cursor (ANSI CUP)
+    to every row that changed and rewrites only that row. The whole update
+    goes out in one write. A terminal resize forces a full redraw.
+    """
+
+    ANSI_PATTERN = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.previous = []
+        self.size = None
+        self.terminal_mode = None
+
+    def terminal_size(self):
+        return shutil.get_terminal_size((80, 24))
+
+    @classmethod
+    def clip(cls, line, width):
+        """Cut line to width terminal columns, keeping escape sequences intact"""
+        parts = []
+        columns = 0
+        position = 0
+        for match in cls.ANSI_PATTERN.finditer(line + '\x1b[0m'):
+            for char in line[position:match.start()]:
+                char_width = 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+                if columns + char_width > width:
+                    return ''.join(parts) + Style.RESET_ALL
+                parts.append(char)
+                columns += char_width
+            parts.append(match.group())
+            position = match.end()
+        return ''.join(parts)
+
+    def start(self):
+        """Clear the screen, hide the cursor and read keys without waiting for Enter"""
+        self.previous = []
+        self.size = None
+        if termios is not None and sys.stdin.isatty():
+            self.terminal_mode = termios.tcgetattr(sys.stdin.fileno())
+            tty.setcbreak(sys.stdin.fileno())
+        self.stream.write('\x1b[?25l\x1b[2J\x1b[H')
+        self.stream.flush()
+
+    def read_key(self):
+        """Last key pressed since the previous call (lower case), or None; never blocks"""
+        key = None
+        if msvcrt is not None:
+            while msvcrt.kbhit():
+                key = msvcrt.getwch()
+        elif self.terminal_mode is not None:
+            while select.select([sys.stdin], [], [], 0)[0]:
+                data = os.read(sys.stdin.fileno(), 64)
+                if not data:
+                    break
+                key = data.decode('utf-8', 'replace')[-1]
+        return key.lower() if key else None
+
+    def render(self, lines):
+        """Draw lines (one string per screen row), writing only rows that differ from the last frame"""
+        size = self.terminal_size()
+        output = []
+        if size != self.size:
+            self.size = size
+            self.previous = []
+            output.append('\x1b[2J')
+        lines = [self.clip(line, size.columns - 1) for line in lines[:size.lines]]
+        for row, line in enumerate(lines):
+            if row >= len(self.previous) or self.previous[row] != line:
+                output.append(f"\x1b[{row + 1};1H{line}{Style.RESET_ALL}\x1b[K")
+        for row in range(len(lines), len(self.previous)):
+            output.append(f"\x1b[{row + 1};1H\x1b[K")
+        self.previous = lines
+        if output:
+            self.stream.write(''.join(output))
+            self.stream.flush()
+
+    def stop(self):
+        """Move the cursor below the last frame, show it again and restore line input"""
+        if self.terminal_mode is not None:
+            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, self.terminal_mode)
+            self.terminal_mode = None
+        self.stream.write(f"\x1b[{len(self.previous) + 1};1H\x1b[?25h\n")
+        self.stream.flush()
+        self.previous = []
+
+
+class ConfigWatcher:
+    """Reports which of a set of files changed, using inotify on Linux and mtime polling elsewhere
+    
+    The parent directories are watched rather than the files, so editors that
+    save by writing a new file and renaming it are noticed too. A file is only
+    reported once it has been quiet for settle seconds, so it is never read
+    half-written. changed() never blocks; call it from the monitor loop.
+    """
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, paths, poll_interval=1.0, settle=0.2):
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.pending = {}  # path -> time of its last change
+        self.stats = {path: self._stat(path) for path in self.paths}
+        self.next_poll = 0.0
+        self.fd = None
+        self.directories = {}  # inotify watch descriptor -> directory
+        if sys.platform.startswith('linux'):
+            try:
+                self._start_inotify()
+            except (OSError, AttributeError):
+                self.fd = None  # No inotify (or out of watches): poll instead
+
+    @property
+    def backend(self):
+        return 'inotify' if self.fd is not None else 'poll'
+
+    def _start_inotify(self):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        for directory in {os.path.dirname(path) for path in self.paths}:
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), mask)
+            if wd < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self.directories[wd] = directory
+        self.fd = fd
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size, st.st_ino
+        except OSError:
+            return None
+
+    def _read_events(self, now):
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = self.EVENT.unpack_from(data, offset)
+                name = data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b'\0')
+                offset += self.EVENT.size + length
+                path = os.path.join(self.directories.get(wd, ''), os.fsdecode(name))
+                if path in self.paths:
+                    self.pending[path] = now
+
+    def _poll(self, now):
+        if now < self.next_poll:
+            return
+        self.next_poll = now + self.poll_interval
+        for path in self.paths:
+            stat = self._stat(path)
+            if stat != self.stats[path]:
+                self.stats[path] = stat
+                self.pending[path] = now
+
+    def changed(self, now=None):
+        """Set of watched paths that changed and have since been quiet for settle seconds"""
+        now = time.time() if now is None else now
+        if self.fd is not None:
+            self._read_events(now)
+        else:
+            self._poll(now)
+        ready = {path for path, when in self.pending.items() if now - when >= self.settle}
+        for path in ready:
+            del self.pending[path]
+        return ready
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class MonitorMetrics:
+    """Check metrics of a running monitor, rendered in the Prometheus text format
+    
+    Nothing here takes a lock. Each site's counters are an immutable tuple
+    that record() replaces in one dict assignment, and the loop gauges are
+    plain attributes. A scrape copies the dict and reads whatever tuples it
+    finds, so it never holds up a check. record() may run in any check
+    thread; a site only ever has one check in flight, so its updates can't
+    interleave.
+    """
+
+    BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    RESULTS = ('up', 'down', 'error')
+    EMPTY = (0, (0,) * (len(BUCKETS) + 1), 0.0, (0, 0, 0))  # up, bucket counts, seconds sum, counts by result
+
+    def __init__(self):
+        self.sites = {}
+        self.started = time.time()
+        self.scheduler_lag = 0.0
+        self.scheduled = 0
+        self.queued = 0
+        self.in_flight = 0
+        self.skipped = 0
+
+    def record(self, url, is_up, status, response_time=None):
+        up, buckets, seconds, results = self.sites.get(url, self.EMPTY)
+        result = 0 if is_up else 1 if isinstance(status, int) else 2
+        results = results[:result] + (results[result] + 1,) + results[result + 1:]
+        if response_time is not None:
+            value = response_time / 1000
+            index = bisect.bisect_left(self.BUCKETS, value)
+            buckets = buckets[:index] + (buckets[index] + 1,) + buckets[index + 1:]
+            seconds += value
+        self.sites[url] = (1 if is_up else 0, buckets, seconds, results)
+
+    def record_loop(self, lags, skipped, scheduled, queued, in_flight):
+        """Called by the monitor loop with the lags of the checks it just dispatched"""
+        if lags:
+            self.scheduler_lag = max(lags)
+        self.skipped += skipped
+        self.scheduled = scheduled
+        self.queued = queued
+        self.in_flight = in_flight
+
+    def remove(self, url):
+        self.sites.pop(url, None)
+
+    @staticmethod
+    def label(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def render(self, chunk_sites=1000):
+        """Yield the exposition text in chunks of chunk_sites websites"""
+        sites = list(self.sites.items())
+        yield (
+            "# HELP downdetector_sites Websites being monitored\n"
+            "# TYPE downdetector_sites gauge\n"
+            f"downdetector_sites {self.scheduled}\n"
+            "# HELP downdetector_scheduler_lag_seconds How late the most recently dispatched checks started\n"
+            "# TYPE downdetector_scheduler_lag_seconds gauge\n"
+            f"downdetector_scheduler_lag_seconds {self.scheduler_lag:.6f}\n"
+            "# HELP downdetector_queue_depth Due checks waiting for a rate limit\n"
+            "# TYPE downdetector_queue_depth gauge\n"
+            f"downdetector_queue_depth {self.queued}\n"
+            "# HELP downdetector_checks_in_flight Checks handed to the check engine and not finished yet\n"
+            "# TYPE downdetector_checks_in_flight gauge\n"
+            f"downdetector_checks_in_flight {self.in_flight}\n"
+            "# HELP downdetector_checks_skipped_total Due checks skipped because the previous check of the site was still running\n"
+            "# TYPE downdetector_checks_skipped_total counter\n"
+            f"downdetector_checks_skipped_total {self.skipped}\n"
+            "# HELP downdetector_start_time_seconds Unix time the monitor started\n"
+            "# TYPE downdetector_start_time_seconds gauge\n"
+            f"downdetector_start_time_seconds {self.started:.3f}\n"
+        )
+        families = (
+            ("downdetector_up", "gauge", "1 if the last check of the website succeeded, else 0"),
+            ("downdetector_checks_total", "counter", "Checks by result: up, down (unexpected status) or error (no response)"),
+            ("downdetector_check_duration_seconds", "histogram", "Check duration including retries"),
+        )
+        for index, (name, kind, text) in enumerate(families):
+            lines = [f"# HELP {name} {text}\n# TYPE {name} {kind}\n"]
+            for count, (url, (up, buckets, seconds, results)) in enumerate(sites, 1):
+                site = f'site="{self.label(url)}"'
+                if index == 0:
+                    lines.append(f"{name}{{{site}}} {up}\n")
+                elif index == 1:
+                    lines.extend(f'{name}{{{site},result="{result}"}} {value}\n' for result, value in zip(self.RESULTS, results))
+                else:
+                    cumulative = 0
+                    for bound, value in zip(self.BUCKETS, buckets):
+                        cumulative += value
+                        lines.append(f'{name}_bucket{{{site},le="{bound}"}} {cumulative}\n')
+                    cumulative += buckets[-1]
+                    lines.append(f'{name}_bucket{{{site},le="+Inf"}} {cumulative}\n'
+                                 f"{name}_sum{{{site}}} {seconds:.6f}\n"
+                                 f"{name}_count{{{site}}} {cumulative}\n")
+                if count % chunk_sites == 0:
+                    yield ''.join(lines)
+                    lines = []
+            yield ''.join(lines)
+
+
+class HashRing:
+    """Consistent hash ring: adding or removing a node only moves the keys that node gains or loses
+    
+    Each node is placed at replicas points so keys spread evenly even with a
+    handful of nodes.
+    """
+
+    def __init__(self, nodes=(), replicas=160):
+        self.replicas = replicas
+        self.points = []  # Sorted hashes of every node's points
+        self.owners = {}  # point -> node
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        return len(set(self.owners.values()))
+
+    @staticmethod
+    def hash(key):
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def add(self, node):
+        for replica in range(self.replicas):
+            point = self.hash(f"{node}#{replica}")
+            if point not in self.owners:
+                self.owners[point] = node
+                bisect.insort(self.points, point)
+
+    def remove(self, node):
+        self.points = [point for point in self.points if self.owners[point] != node]
+        self.owners = {point: owner for point, owner in self.owners.items() if owner != node}
+
+    def node_for(self, key):
+        """Node owning key: the first point clockwise from its hash, or None on an empty ring"""
+        if not self.points:
+            return None
+        i = bisect.bisect(self.points, self.hash(key)) % len(self.points)
+        return self.owners[self.points[i]]
+
+
+class ShardSiteRegistry(SiteRegistry):
+    """In-memory site list of a shard worker, changed only by assignments from the parent process"""
+
+    def __init__(self, shard):
+        super().__init__()
+        self.path = f"shard-{shard}"
+        self.incoming = []  # (upserts, removals) not yet picked up by reload()
+
+    def assign(self, upserts, removals):
+        """Queue websites to add or update ((url, settings) pairs) and URLs to remove for the next reload()"""
+        self.incoming.append((upserts, removals))
+
+    def watch_paths(self):
+        return [self.path]
+
+    def _load(self):
+        sites = dict(self.sites)
+        for upserts, removals in self.incoming:
+            for url in removals:
+                sites.pop(url, None)
+            sites.update(upserts)
+        self.incoming = []
+        return sites
+
+
+class ShardChannel:
+    """A shard worker's link to its parent, used by run_monitor_loop in place of a ConfigWatcher
+    
+    changed() hands the parent's site assignments to the registry and reports
+    them as a changed file, so they are applied by apply_config_changes like
+    any edit to the site list. It also sends queued check results and log
+    records up to the parent in batches.
+    """
+
+    settle = 0.05
+    FLUSH_SIZE = 500
+
+    def __init__(self, commands, results, shards):
+        self.commands = commands
+        self.results = results
+        self.shards = shards
+        self.registry = None
+        self.env_path = None
+        self.outbox = collections.deque()  # Appended to from any check thread
+        self.flushed_at = 0.0
+        self.parent_checked_at = 0.0
+        self.parent = multiprocessing.parent_process()
+
+    def changed(self, now=None):
+        """Paths to treat as changed: the registry's after an assignment, .env after a settings change"""
+        now = time.time() if now is None else now
+        changed = set()
+        while True:
+            try:
+                message = self.commands.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'stop':
+                raise KeyboardInterrupt()
+            if message[0] == 'sites':
+                self.registry.assign(message[1], message[2])
+                changed.add(os.path.abspath(self.registry.path))
+            elif message[0] == 'env':
+                self.shards = message[1]
+                changed.add(self.env_path)
+        self.flush(now)
+        if now - self.parent_checked_at >= 1.0:
+            # The parent was killed without stopping us
+            self.parent_checked_at = now
+            if self.parent is not None and not self.parent.is_alive():
+                raise KeyboardInterrupt()
+        return changed
+
+    def flush(self, now=None, force=False):
+        """Send queued results once FLUSH_SIZE are waiting or settle seconds have passed"""
+        now = time.time() if now is None else now
+        if not self.outbox or not (force or len(self.outbox) >= self.FLUSH_SIZE or now - self.flushed_at >= self.settle):
+            return
+        batch = [self.outbox.popleft() for _ in range(len(self.outbox))]
+        try:
+            self.results.send(batch)
+        except (BrokenPipeError, EOFError):
+            raise KeyboardInterrupt()  # The parent is gone
+        self.flushed_at = now
+
+    def close(self):
+        with contextlib.suppress(KeyboardInterrupt, OSError):
+            self.flush(force=True)
+        self.results.close()
+
+
+class OutboxLogHandler(logging.Handler):
+    """Queues log records of a shard worker for its parent, which writes them to the one log file"""
+
+    def __init__(self, outbox):
+        super().__init__()
+        self.outbox = outbox
+
+    def emit(self, record):
+        self.outbox.append(('log', record.levelno, record.getMessage()))
+
+
+class ShardSupervisor:
+    """Runs the shard worker processes of a sharded monitor and routes every website to one of them
+    
+    Websites are placed on a HashRing by host (SHARD_KEY=host, so per-host
+    limits, connection pools and DNS lookups stay in one process) or by URL.
+    Adding or removing websites only touches the shards that own them, and
+    changing the number of shards only moves the websites whose owner
+    changed. A worker that dies is restarted with its websites; one that
+    keeps dying is retired and its websites move to the other shards.
+    """
+
+    RESTART_LIMIT = 5  # Restarts of one shard within RESTART_WINDOW before it is retired
+    RESTART_WINDOW = 60
+
+    def __init__(self, registry, default_interval, key='host'):
+        # spawn, not fork: the parent has log, metrics and watcher threads that must not be copied mid-flight
+        self.context = multiprocessing.get_context('spawn')
+        self.registry = registry
+        self.default_interval = default_interval
+        self.key = key
+        self.ring = HashRing()
+        self.workers = {}  # shard -> (process, command queue, result connection)
+        self.assigned = {}  # url -> shard
+        self.restarts = collections.defaultdict(list)
+
+    def shard_key(self, url):
+        if self.key == 'url':
+            return url
+        return urlsplit(url).hostname or url
+
+    def start(self, shards):
+        """Start shards workers and hand every website to its owner"""
+        self.resize(shards)
+        self.update(assign=list(self.registry))
+
+    def _spawn(self, shard):
+        commands = self.context.Queue()
+        results, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(target=run_shard_worker, name=f"downdetector-shard-{shard}", daemon=True,
+                                       args=(shard, len(self.ring), self.default_interval, commands, sender))
+        process.start()
+        sender.close()  # Only the worker writes, so the parent sees EOF once it exits
+        self.workers[shard] = (process, commands, results)
+
+    def _stop_worker(self, shard, notify=True, timeout=5.0):
+        process, commands, results = self.workers.pop(shard)
+        if notify:
+            commands.put(('stop',))
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join(1.0)
+        results.close()
+        # Don't wait at exit to hand commands to a worker that is gone
+        commands.cancel_join_thread()
+        commands.close()
+        return process.exitcode
+
+    def update(self, assign=(), unassign=()):
+        """Send the websites in assign (with their current settings) to the shards that own them and
+        tell the owners of those in unassign to drop them, in one message per shard"""
+        batches = collections.defaultdict(lambda: ([], []))
+        for url in unassign:
+            shard = self.assigned.pop(url, None)
+            if shard is not None:
+                batches[shard][1].append(url)
+        for url in assign:
+            shard = self.ring.node_for(self.shard_key(url))
+            self.assigned[url] = shard
+            batches[shard][0].append((url, self.registry.get(url, {})))
+        for shard, (upserts, removals) in batches.items():
+            if shard in self.workers:
+                self.workers[shard][1].put(('sites', upserts, removals))
+
+    def rebalance(self):
+        """Move the websites whose owner changed with the ring; returns how many moved"""
+        moved = [url for url, shard in self.assigned.items() if self.ring.node_for(self.shard_key(url)) != shard]
+        self.update(assign=moved, unassign=moved)
+        return len(moved)
+
+    def resize(self, shards):
+        """Run shards workers, starting or stopping only the difference; returns how many websites moved"""
+        shards = max(1, shards)
+        added = [shard for shard in range(shards) if shard not in self.workers]
+        removed = [shard for shard in self.workers if shard >= shards]
+        for shard in added:
+            self.ring.add(shard)
+        for shard in removed:
+            self.ring.remove(shard)
+        for shard in added:
+            self._spawn(shard)
+        moved = self.rebalance()
+        for shard in removed:
+            self._stop_worker(shard)
+        return moved
+
+    def notify_env(self):
+        """Tell every worker to re-read .env (and how many shards there are)"""
+        for _, commands, _ in self.workers.values():
+            commands.put(('env', len(self.workers)))
+
+    def receive(self, timeout):
+        """Entries sent by the workers within timeout seconds, and the shards whose worker died
+        
+        Entries are ('check', url, is_up, status, response_time, phases, timestamp)
+        or ('log', level, message).
+        """
+        connections = {results: shard for shard, (_, _, results) in self.workers.items()}
+        entries, dead = [], []
+        for connection in multiprocessing.connection.wait(list(connections), timeout):
+            try:
+                # Bounded so one busy worker can't starve the others
+                for _ in range(64):
+                    entries.extend(connection.recv())
+                    if not connection.poll():
+                        break
+            except (EOFError, OSError):
+                dead.append(connections[connection])
+        return entries, dead
+
+    def restart(self, shard):
+        """Replace the dead worker of shard; returns (exit code, restarted)
+        
+        When the shard has died RESTART_LIMIT times within RESTART_WINDOW
+        seconds it is retired instead and its websites move to the other
+        shards. Raises RuntimeError when no shard is left.
+        """
+        exitcode = self._stop_worker(shard, notify=False, timeout=1.0)
+        now = time.time()
+        self.restarts[shard] = [when for when in self.restarts[shard] if now - when < self.RESTART_WINDOW]
+        if len(self.restarts[shard]) >= self.RESTART_LIMIT:
+            self.ring.remove(shard)
+            if not self.workers:
+                raise RuntimeError(f"every shard worker keeps exiting (last exit code {exitcode})")
+            self.rebalance()
+            self.notify_env()
+            return exitcode, False
+        self.restarts[shard].append(now)
+        self._spawn(shard)
+        self.update(assign=[url for url, owner in self.assigned.items() if owner == shard])
+        return exitcode, True
+
+    def stop(self):
+        """Stop every worker; checks still running are abandoned"""
+        for _, commands, _ in self.workers.values():
+            commands.put(('stop',))
+        for shard in list(self.workers):
+            self._stop_worker(shard, notify=False)
+
+
+class DownDetectorApp:
+    # Per-site probe modes that can be set with "probe" in websites.json
+    PROBE_MODES = ('get', 'head', 'headers', 'range')
+    MONITOR_PAGE_SECONDS = 5
+    # Status codes that mean a server refused HEAD rather than reporting its health
+    HEAD_FALLBACK_CODES = (400, 403, 405, 501)
+    # Status codes of overloaded or restarting servers, worth another try within the deadline
+    RETRY_STATUS_CODES = (502, 503, 504)
+    RETRY_MIN_ATTEMPT_SECONDS = 0.5
+    HEDGE_MIN_CHECKS = 20
+    
+    def __init__(self, headless=False):
+        self.headless = headless  # Skip animations, prompts and the startup update check
+        self.websites = SiteRegistry()  # Replaced by the configured store in load_websites
+        self.current_version = "2.0"  # Current app version
+        self.github_repo = "gurraoptimus/downdetector"  # Replace with your actual repo
+        self.update_url = f"https://api.github.com/repos/{self.github_repo}/releases/latest"
+        
+        # Load settings from environment variables with defaults
+        self.timeout = int(os.getenv('TIMEOUT', '5'))
+        self.websites_file = os.getenv('WEBSITES_FILE', 'websites.json')
+        self.site_store = os.getenv('SITE_STORE', 'sqlite').lower()
+        self.site_db = os.getenv('SITE_DB', 'websites.db')
+        self.monitor_interval = int(os.getenv('MONITOR_INTERVAL', '5'))
+        self.animation_speed = float(os.getenv('ANIMATION_SPEED', '0.1'))
+        self.enable_sounds = os.getenv('ENABLE_SOUNDS', 'true').lower() == 'true'
+        self.auto_update_check = os.getenv('AUTO_UPDATE_CHECK', 'true').lower() == 'true'
+        self.log_file = os.getenv('LOG_FILE', 'downdetector.log')
+        self.debug_mode = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
+        self.max_concurrency = int(os.getenv('MAX_CONCURRENCY', '20'))
+        self.probe_backend = os.getenv('PROBE_BACKEND', 'threads').lower()
+        self.pool_maxsize = int(os.getenv('POOL_MAXSIZE_PER_HOST', '4'))
+        self.pool_idle_timeout = int(os.getenv('POOL_IDLE_TIMEOUT', '300'))
+        self.probe_mode = os.getenv('PROBE_MODE', 'get').lower()
+        self.probe_max_bytes = max(1, int(os.getenv('PROBE_MAX_BYTES', '1024')))  # 0 would send "bytes=0--1"
+        self.schedule_jitter = float(os.getenv('SCHEDULE_JITTER', '0.1'))
+        self.max_retries = int(os.getenv('MAX_RETRIES', '3'))
+        self.retry_backoff = float(os.getenv('RETRY_BACKOFF', '0.2'))
+        self.hedge_requests = os.getenv('HEDGE_REQUESTS', 'false').lower() == 'true'
+        self.hedge_delays = {}  # url -> (expires_at, seconds or None)
+        self.hedge_executor = None
+        self.history = CheckHistory(int(os.getenv('HISTORY_SAMPLES', '1000')))
+        self.statistics = CheckStatistics()
+        self.statistics_since = time.time()
+        self.metrics = MonitorMetrics()
+        self.metrics_server = None
+        self.statistics_loaded = False
+        self.history_archive = self.build_history_archive()
+        self.check_engine = None
+        self.async_probe = None
+        self.dns_cache = None
+        if os.getenv('DNS_CACHE_ENABLED', 'true').lower() == 'true':
+            self.dns_cache = DNSCache(
+                max_entries=int(os.getenv('DNS_CACHE_SIZE', '10000')),
+                default_ttl=int(os.getenv('DNS_CACHE_TTL', '300')),
+                negative_ttl=int(os.getenv('DNS_NEGATIVE_TTL', '30'))
+            )
+        self.dns_prewarm = os.getenv('DNS_PREWARM', 'true').lower() == 'true'
+        self.phase_timings = os.getenv('PHASE_TIMINGS', 'true').lower() == 'true'
+        self.monitor_shards = int(os.getenv('MONITOR_SHARDS', '1')) or os.cpu_count() or 1
+        self.shard_key = os.getenv('SHARD_KEY', 'host').lower()
+        self.session_pool = HostSessionPool(self.pool_maxsize, self.pool_idle_timeout, self.dns_cache, self.phase_timings)
+        
+        # Setup logging
+        self.setup_logging()
+        
+        if not self.headless:
+            self.bootup_sequence()
+        self.load_websites()
+        
+        # Check for updates on startup if enabled
+        if self.auto_update_check and not self.headless:
+            self.check_for_updates(silent=True)
+    
+    def build_history_archive(self, writer=True):
+        """On-disk check history, or None when HISTORY_ENABLED is false or the folder is unusable"""
+        if os.getenv('HISTORY_ENABLED', 'true').lower() != 'true':
+            return None
+        try:
+            return HistoryArchive(
+                os.getenv('HISTORY_DIR', 'history'),
+                retention_days=int(os.getenv('HISTORY_RETENTION_DAYS', '90')),
+                writer=writer
+            )
+        except OSError as e:
+            print(f"{Fore.YELLOW}⚠️  Check history disabled: {e}")
+            return None
+    
+    def get_icon(self, icon_type):
+        """Get ASCII art icons for various elements"""
+        icons = {
+            # Status Icons
+            'online': '🟢',
+            'offline': '🔴',
+            'warning': '🟡',
+            'checking': '🔵',
+            'loading': '⏳',
+            'success': '✅',
+            'error': '❌',
+            'info': 'ℹ️',
+            'check': '✓',
+            
+            # Action Icons
+            'add': '➕',
+            'remove': '➖',
+            'edit': '✏️',
+            'save': '💾',
+            'delete': '🗑️',
+            'refresh': '🔄',
+            'settings': '⚙️',
+            'update': '📱',
+            'download': '⬇️',
+            'upload': '⬆️',
+            
+            # System Icons
+            'computer': '💻',
+            'network': '🌐',
+            'wifi': '📶',
+            'clock': '🕐',
+            'calendar': '📅',
+            'folder': '📁',
+            'file': '📄',
+            'log': '📋',
+            
+            # Navigation Icons
+            'home': '🏠',
+            'back': '⬅️',
+            'forward': '➡️',
+            'up': '⬆️',
+            'down': '⬇️',
+            'menu': '☰',
+            'exit': '🚪',
+            
+            # Monitor Icons
+            'monitor': '📊',
+            'dashboard': '📈',
+            'chart': '📉',
+            'graph': '📊',
+            'stats': '📈',
+            'report': '📄',
+            
+            # ASCII Art Icons
+            'server': '''
+    ┌─────┐
+    │ ▓▓▓ │
+    │ ▓▓▓ │
+    │ ▓▓▓ │
+    └─────┘''',
+            
+            'website': '''
+    ┌─────────┐
+    │ ╔═════╗ │
+    │ ║  🌐 ║ │
+    │ ╚═════╝ │
+    └─────────┘''',
+            
+            'monitor_big': '''
+    ┌─────────────┐
+    │   ◉ ◉ ◉     │
+    │             │
+    │    🌐 📊    │
+    │             │
+    └─────────────┘''',
+            
+            'check_mark': '✓',
+            'cross_mark': '✗',
+            
+            'arrow_right': '▶',
+            'arrow_left': '◀',
+            'arrow_up': '▲',
+            'arrow_down': '▼',
+            'bullet': '●',
+            'diamond': '◆',
+            'star': '★',
+            'heart': '♥',
+            'lightning': '⚡',
+            'shield': '🛡️',
+            'key': '🔑',
+            'lock': '🔒',
+            'unlock': '🔓'
+        }
+        
+        return icons.get(icon_type, '?')
+    
+    def display_animated_icon(self, icon_type, duration=2.0):
+        """Display an animated icon with effects"""
+        icon = self.get_icon(icon_type)
+        
+        # Simple pulse animation
+        for i in range(int(duration * 10)):
+            if i % 10 < 5:
+                print(f"\r{Fore.CYAN}{icon}{Style.RESET_ALL}", end='', flush=True)
+            else:
+                print(f"\r{Fore.YELLOW}{icon}{Style.RESET_ALL}", end='', flush=True)
+            time.sleep(0.1)
+        print()
+    
+    def setup_logging(self):
+        """Setup logging configuration
+        
+        Records go through a bounded queue to a background listener thread that
+        writes and flushes them in batches, so checks never block on log I/O.
+        """
+        try:
+            # Stop the previous pipeline if logging is being set up again (e.g. after a reboot)
+            if getattr(self, 'log_listener', None) is not None:
+                self.log_listener.stop()
+                atexit.unregister(self.log_listener.stop)
+                self.log_listener = None
+            
+            # Determine log level based on debug mode
+            log_level = logging.DEBUG if self.debug_mode else logging.INFO
+            
+            # Create formatter
+            formatter = logging.Formatter(
+                '%(asctime)s | %(levelname)-8s | %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            
+            flush_interval = float(os.getenv('LOG_FLUSH_INTERVAL', '1.0'))
+            
+            # Setup file handler
+            file_handler = RotatingBatchedFileHandler(
+                self.log_file, encoding='utf-8',
+                batch_size=int(os.getenv('LOG_BATCH_SIZE', '256')),
+                flush_interval=flush_interval,
+                max_bytes=int(os.getenv('LOG_MAX_BYTES', '10485760')),
+                daily=os.getenv('LOG_ROTATE_DAILY', 'false').lower() == 'true',
+                backup_count=int(os.getenv('LOG_BACKUP_COUNT', '30')),
+                compress=os.getenv('LOG_COMPRESS', 'true').lower() == 'true'
+            )
+            self.log_file_handler = file_handler
+            file_handler.setLevel(log_level)
+            file_handler.setFormatter(formatter)
+            
+            # Setup console handler (only for errors and warnings if not in debug mode)
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(logging.WARNING if not self.debug_mode else logging.DEBUG)
+            console_handler.setFormatter(formatter)
+            
+            handlers = [file_handler]
+            if self.debug_mode:
+                handlers.append(console_handler)
+            
+            # Setup the queue pipeline
+            self.log_queue = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', '10000')))
+            queue_handler = BoundedQueueHandler(self.log_queue)
+            self.log_listener = BatchingQueueListener(
+                self.log_queue, *handlers, flush_interval=flush_interval, queue_handler=queue_handler
+            )
+            self.log_listener.start()
+            atexit.register(self.log_listener.stop)
+            
+            # Setup logger
+            self.logger = logging.getLogger('DownDetector')
+            self.logger.setLevel(log_level)
+            
+            # Clear existing handlers to avoid duplicates
+            self.logger.handlers.clear()
+            
+            # Add handlers
+            self.logger.addHandler(queue_handler)
+            
+            # Log startup
+            self.logger.info(f"Down Detector v{self.current_version} starting up")
+            self.logger.info(f"Log file: {self.log_file}")
+            self.logger.info(f"Debug mode: {'ON' if self.debug_mode else 'OFF'}")
+            
+        except Exception as e:
+            print(f"{Fore.RED}❌ Error setting up logging: {e}")
+            # Create a basic logger as fallback
+            self.logger = logging.getLogger('DownDetector')
+            self.logger.setLevel(logging.INFO)
+    
+    def flush_logs(self, timeout=5.0):
+        """Wait up to timeout seconds for queued log records to be written and flushed to disk"""
+        if getattr(self, 'log_listener', None) is None:
+            return
+        deadline = time.monotonic() + timeout
+        with self.log_queue.all_tasks_done:
+            # A dead listener never drains the queue, so don't wait for it
+            while self.log_queue.unfinished_tasks and self.log_listener.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.log_queue.all_tasks_done.wait(min(remaining, 0.5))
+        for handler in self.log_listener.handlers:
+            handler.flush()
+    
+    def log_website_check(self, website, is_up, status, response_time=None, phases=None, worker=None):
+        """Log website check results
+        
+        phases is a tuple of milliseconds in CHECK_PHASES order, None for phases
+        that didn't happen (no lookup or handshake on a reused connection).
+        worker names the remote worker that ran the check, if any.
+        """
+        try:
+            # Lazy %-formatting: the string is built on the log writer thread, not the checking thread
+            status_text = "UP" if is_up else "DOWN"
+            via = (" | via %s", worker) if worker else ("",)
+            if response_time and phases:
+                names = [name for name, value in zip(CHECK_PHASES, phases) if value is not None]
+                self.logger.info("CHECK | %s | %s | %s | %.2fms | " + " ".join(f"{name} %.2fms" for name in names) + via[0],
+                                 website, status_text, status, response_time, *[value for value in phases if value is not None], *via[1:])
+            elif response_time:
+                self.logger.info("CHECK | %s | %s | %s | %.2fms" + via[0], website, status_text, status, response_time, *via[1:])
+            else:
+                self.logger.info("CHECK | %s | %s | %s" + via[0], website, status_text, status, *via[1:])
+        except Exception as e:
+            self.logger.error(f"Error logging website check: {e}")
+    
+    def record_check_result(self, website, is_up, status, response_time=None, phases=None, timestamp=None, worker=None):
+        """Single sink for every check result: in-memory history and statistics plus the log file
+        
+        phases breaks response_time down as returned by check_phases(); retry
+        waits are the only part of response_time it doesn't cover. timestamp
+        defaults to now (shard workers pass the time of their check), and
+        worker is the remote worker that ran the check.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self.history.record(website, timestamp, response_time, status, is_up, phases)
+        self.statistics.record(website, timestamp, response_time, is_up, phases)
+        self.metrics.record(website, is_up, status, response_time)
+        if self.history_archive is not None:
+            self.history_archive.append(website, timestamp, response_time, status, is_up)
+        self.log_website_check(website, is_up, status, response_time, phases, worker)
+    
+    @staticmethod
+    def check_phases(timings):
+        """Phase durations of a check's timings dict as a CHECK_PHASES tuple, or None if none were timed
+        
+        Phases are summed over redirects and retries. dns is 0 when served from
+        the DNS cache, and connect and tls are None when a kept-alive
+        connection was reused.
+        """
+        phases = tuple(timings.get(key) for key in CHECK_PHASE_KEYS)
+        return phases if any(value is not None for value in phases) else None
+    
+    def log_system_event(self, event_type, message):
+        """Log system events"""
+        try:
+            self.logger.info(f"SYSTEM | {event_type} | {message}")
+        except Exception as e:
+            print(f"Error logging system event: {e}")
+    
+    def log_error(self, error_type, message):
+        """Log errors"""
+        try:
+            self.logger.error(f"ERROR | {error_type} | {message}")
+        except Exception as e:
+            print(f"Error logging error: {e}")
+    
+    def log_update_event(self, event, details=""):
+        """Log update-related events"""
+        try:
+            self.logger.info(f"UPDATE | {event} | {details}")
+        except Exception as e:
+            print(f"Error logging update event: {e}")
+    
+    def create_env_file(self):
+        """Create a .env file with default settings"""
+        env_content = """# Down Detector Configuration
+# Website monitoring timeout in seconds
+TIMEOUT=5
+
+# Where monitored websites are stored: sqlite (SITE_DB) or json (WEBSITES_FILE)
+SITE_STORE=sqlite
+SITE_DB=websites.db
+
+# Websites list file (imported into SITE_DB on first start when SITE_STORE=sqlite)
+WEBSITES_FILE=websites.json
+
+# Default monitoring interval in seconds
+MONITOR_INTERVAL=5
+
+# Animation speed (0.1 = fast, 0.5 = slow)
+ANIMATION_SPEED=0.1
+
+# Enable sound notifications (true/false)
+ENABLE_SOUNDS=true
+
+# Auto-check for updates on startup (true/false)
+AUTO_UPDATE_CHECK=true
+
+# User Agent for HTTP requests
+USER_AGENT=Mozilla/5.0 (Windows; NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36
+
+# Maximum retries for failed requests, and the base delay in seconds of the exponential backoff
+MAX_RETRIES=3
+RETRY_BACKOFF=0.2
+
+# Start a second request when a check takes longer than the site's usual p95 latency (true/false)
+HEDGE_REQUESTS=false
+
+# Number of websites checked in parallel
+MAX_CONCURRENCY=20
+
+# Check backend: threads (requests) or asyncio (non-blocking sockets)
+PROBE_BACKEND=threads
+
+# Worker processes that share the monitoring (1 = none, 0 = one per CPU core), and how websites are split: host or url
+MONITOR_SHARDS=1
+SHARD_KEY=host
+
+# Coordinator of remote workers: address it listens on (workers connect to it), shared secret (empty = none),
+# seconds before an unanswered check is leased to another worker (keep above TIMEOUT) and heartbeat seconds
+COORDINATOR_ADDRESS=127.0.0.1:7400
+COORDINATOR_TOKEN=
+LEASE_TIMEOUT=30
+WORKER_HEARTBEAT=5
+
+# Keep-alive connections kept per host, and seconds before an idle host is dropped
+POOL_MAXSIZE_PER_HOST=4
+POOL_IDLE_TIMEOUT=300
+
+# Default probe mode: get, head, headers or range (override per site in websites.json)
+PROBE_MODE=get
+
+# Bytes read by the range probe mode
+PROBE_MAX_BYTES=1024
+
+# Prometheus metrics endpoint while monitoring (true/false), its address and port
+METRICS_ENABLED=false
+METRICS_ADDRESS=127.0.0.1
+METRICS_PORT=9464
+
+# Apply edits to .env and the website list while monitoring (true/false), seconds between checks when inotify is unavailable
+CONFIG_WATCH=true
+CONFIG_WATCH_INTERVAL=1.0
+
+# Time each check's DNS lookup, connect, TLS handshake, time to first byte and transfer (true/false)
+PHASE_TIMINGS=true
+
+# Random spread applied to each check time, as a fraction of the site's interval
+SCHEDULE_JITTER=0.1
+
+# Rate limits: checks per second overall and per host, checks in flight per host (0 = unlimited)
+RATE_LIMIT_GLOBAL=0
+RATE_LIMIT_PER_HOST=0
+HOST_MAX_CONCURRENCY=0
+
+# In-process DNS cache: on/off, max hosts, TTL when the record TTL is unknown, TTL of failed lookups
+DNS_CACHE_ENABLED=true
+DNS_CACHE_SIZE=10000
+DNS_CACHE_TTL=300
+DNS_NEGATIVE_TTL=30
+
+# Resolve every host when monitoring starts (true/false)
+DNS_PREWARM=true
+
+# Check results kept in memory per website (11 bytes each)
+HISTORY_SAMPLES=1000
+
+# On-disk check history for uptime reports (true/false), its folder and retention in days
+HISTORY_ENABLED=true
+HISTORY_DIR=history
+HISTORY_RETENTION_DAYS=90
+
+# Log file path (optional)
+LOG_FILE=downdetector.log
+
+# Enable debug mode (true/false)
+DEBUG_MODE=false
+
+# Background log writer: queue capacity, records per flush, seconds between flushes
+LOG_QUEUE_SIZE=10000
+LOG_BATCH_SIZE=256
+LOG_FLUSH_INTERVAL=1.0
+
+# Log rotation: max size in bytes (0 = no size limit), rotate at midnight, archives kept, gzip archives
+LOG_MAX_BYTES=10485760
+LOG_ROTATE_DAILY=false
+LOG_BACKUP_COUNT=30
+LOG_COMPRESS=true
+"""
+        
+        try:
+            with open('.env', 'w') as f:
+                f.write(env_content)
+            return True
+        except Exception as e:
+            print(f"{Fore.RED}❌ Error creating .env file: {e}")
+            return False
+    
+    def check_for_updates(self, silent=False):
+        """Check for application updates from GitHub"""
+        if not silent:
+            self.print_header()
+            self.bounce_text(f"{Fore.WHITE}{Back.BLUE}  🔄 SYSTEM UPDATES  {Style.RESET_ALL}", Fore.WHITE)
+            self.loading_animation("Checking for updates", 1.0)
+        
+        try:
+            headers = {
+                'User-Agent': 'DownDetector-UpdateChecker/1.0',
+                'Accept': 'application/vnd.github.v3+json'
+            }
+            response = requests.get(self.update_url, headers=headers, timeout=10)
+            
+            if response.status_code == 200:
+                release_data = response.json()
+                latest_version = release_data.get('tag_name', '').lstrip('v')
+                release_notes = release_data.get('body', 'No release notes available')
+                download_url = release_data.get('html_url', '')
+                published_date = release_data.get('published_at', '')
+                
+                if self.is_newer_version(latest_version, self.current_version):
+                    if not silent:
+                        # Pass the raw download URL for direct file download
+                        raw_download_url = f"https://raw.githubusercontent.com/{self.github_repo}/main/downdetector.py"
+                        self.display_update_available(latest_version, release_notes, download_url, published_date)
+                    else:
+                        print(f"\n{Back.GREEN}{Fore.WHITE} 🔔 UPDATE AVAILABLE {Style.RESET_ALL} Version {latest_version} is available!")
+                        print(f"{Fore.CYAN}ℹ️  Check the updates menu for more details")
+                    return True, latest_version, release_notes, download_url
+                else:
+                    if not silent:
+                        self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ UP TO DATE {Style.RESET_ALL} You're running the latest version!", Fore.GREEN)
+                    return False, self.current_version, "", ""
+            else:
+                if not silent:
+                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ UPDATE CHECK FAILED {Style.RESET_ALL} Unable to check for updates", Fore.RED)
+                return False, "", "", ""
+                
+        except requests.exceptions.RequestException as e:
+            if not silent:
+                print(f"{Fore.RED}❌ Network error while checking updates: {str(e)[:50]}...")
+            return False, "", "", ""
+        except Exception as e:
+            if not silent:
+                print(f"{Fore.RED}❌ Error checking for updates: {str(e)[:50]}...")
+            return False, "", "", ""
+    
+    def is_newer_version(self, latest, current):
+        """Compare version numbers to determine if update is needed"""
+        try:
+            latest_parts = [int(x) for x in latest.split('.')]
+            current_parts = [int(x) for x in current.split('.')]
+            
+            # Pad shorter version with zeros
+            max_len = max(len(latest_parts), len(current_parts))
+            latest_parts += [0] * (max_len - len(latest_parts))
+            current_parts += [0] * (max_len - len(current_parts))
+            
+            return latest_parts > current_parts
+        except:
+            return False
+    
+    def display_update_available(self, version, notes, url, date):
+        """Display update information in a formatted way with icons"""
+        print(f"\n{Back.GREEN}{Fore.WHITE} {self.get_icon('update')} NEW UPDATE AVAILABLE {self.get_icon('lightning')} {Style.RESET_ALL}")
+        
+        update_info = f"""{Fore.CYAN}┌─ Update Information ──────────────────────────────────────┐
+│                                                           │
+│ {self.get_icon('info')} Current Version: {Back.BLUE}{Fore.WHITE} {self.current_version} {Style.RESET_ALL}                      {Fore.CYAN}│
+│ {self.get_icon('download')} Latest Version:  {Back.GREEN}{Fore.WHITE} {version} {Style.RESET_ALL}                        {Fore.CYAN}│
+│ {self.get_icon('calendar')} Release Date:    {date[:10] if date else 'Unknown'}                     {Fore.CYAN}│
+│                                                           │
+│ {Back.YELLOW}{Fore.BLACK} {self.get_icon('file')} RELEASE NOTES {Style.RESET_ALL}                              {Fore.CYAN}│
+│                                                           │"""
+        
+        print(update_info)
+        
+        # Display release notes (first 5 lines)
+        note_lines = notes.split('\n')[:5] if notes else ["No release notes available"]
+        for line in note_lines:
+            if line.strip():
+                print(f"{Fore.CYAN}│ {line[:55]:<55} │")
+        
+        print(f"{Fore.CYAN}│                                                           │")
+        print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
+        
+        print(f"\n{Fore.YELLOW}Update Options:")
+        print(f"{Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} Download and install update")
+        print(f"{Back.BLUE}{Fore.WHITE} 2 {Style.RESET_ALL} Open download page in browser")
+        print(f"{Back.CYAN}{Fore.WHITE} 3 {Style.RESET_ALL} Copy download link to clipboard")
+        print(f"{Back.YELLOW}{Fore.BLACK} 4 {Style.RESET_ALL} View full release notes")
+        print(f"{Back.RED}{Fore.WHITE} 5 {Style.RESET_ALL} Skip this update")
+        
+        choice = input(f"\n{Fore.CYAN}Select option (1-5): ").strip()
+        
+        if choice == '1':
+            self.download_and_install_update(version)
+        elif choice == '2':
+            self.open_browser(url)
+        elif choice == '3':
+            self.copy_to_clipboard(url)
+        elif choice == '4':
+            self.show_full_release_notes(notes)
+        elif choice == '5':
+            self.bounce_text(f"{Fore.YELLOW}Update skipped", Fore.YELLOW)
+        
+        input(f"\n{Fore.CYAN}Press Enter to continue...")
+    
+    def download_and_install_update(self, version):
+        """Download and install the latest version from GitHub"""
+        self.log_update_event("UPDATE_DOWNLOAD_STARTED", f"Starting download of version {version}")
+        try:
+            # Construct the raw file URL
+            raw_url = f"https://raw.githubusercontent.com/{self.github_repo}/main/downdetector.py"
+            
+            print(f"\n{Back.BLUE}{Fore.WHITE} 📥 DOWNLOADING UPDATE {Style.RESET_ALL}")
+            self.loading_animation("Downloading latest version", 2.0)
+            
+            # Download the file
+            headers = {
+                'User-Agent': 'DownDetector-Updater/1.0',
+                'Accept': 'text/plain'
+            }
+            response = requests.get(raw_url, headers=headers, timeout=30)
+            
+            if response.status_code == 200:
+                # Create backup of current file
+                backup_name = f"downdetector_backup_{self.current_version}.py"
+                try:
+                    shutil.copy(__file__, backup_name)
+                    print(f"{Fore.GREEN}✅ Backup created: {backup_name}")
+                except Exception as e:
+                    print(f"{Fore.YELLOW}⚠️  Could not create backup: {e}")
+                
+                # Save the new version
+                try:
+                    with open(__file__, 'w', encoding='utf-8') as f:
+                        f.write(response.text)
+                    
+                    self.log_update_event("UPDATE_INSTALLED", f"Successfully updated to version {version}")
+                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ UPDATE SUCCESSFUL {Style.RESET_ALL}", Fore.GREEN)
+                    print(f"{Fore.CYAN}📱 Version {version} has been downloaded and installed!")
+                    print(f"{Fore.YELLOW}🔄 Please restart the application to use the new version.")
+                    
+                    restart_choice = input(f"\n{Fore.CYAN}Would you like to restart now? (y/n): ").strip().lower()
+                    if restart_choice in ['y', 'yes']:
+                        self.log_update_event("UPDATE_RESTART", "Application restarting after update")
+                        print(f"\n{Back.BLUE}{Fore.WHITE} 🔄 RESTARTING APPLICATION {Style.RESET_ALL}")
+                        self.loading_animation("Restarting", 1.0)
+                        
+                        # Restart the application
+                        import sys
+                        import subprocess
+                        subprocess.Popen([sys.executable, __file__])
+                        sys.exit(0)
+                    
+                except PermissionError:
+                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ PERMISSION DENIED {Style.RESET_ALL}", Fore.RED)
+                    print(f"{Fore.YELLOW}⚠️  Cannot overwrite file. Run as administrator or manually replace the file.")
+                    print(f"{Fore.CYAN}Download URL: {raw_url}")
+                    
+                except Exception as e:
+                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ WRITE ERROR {Style.RESET_ALL}", Fore.RED)
+                    print(f"{Fore.RED}Error writing file: {e}")
+                    
+            else:
+                self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ DOWNLOAD FAILED {Style.RESET_ALL}", Fore.RED)
+                print(f"{Fore.RED}HTTP {response.status_code}: Could not download update")
+                print(f"{Fore.CYAN}Manual download URL: {raw_url}")
+                
+        except requests.exceptions.RequestException as e:
+            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ NETWORK ERROR {Style.RESET_ALL}", Fore.RED)
+            print(f"{Fore.RED}Network error: {str(e)[:50]}...")
+            print(f"{Fore.CYAN}Manual download URL: https://raw.githubusercontent.com/{self.github_repo}/main/downdetector.py")
+            
+        except Exception as e:
+            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ UPDATE ERROR {Style.RESET_ALL}", Fore.RED)
+            print(f"{Fore.RED}Unexpected error: {str(e)[:50]}...")
+    
+    def open_browser(self, url):
+        """Open URL in default browser"""
+        try:
+            system = platform.system().lower()
+            if system == 'windows':
+                os.startfile(url)
+            elif system == 'darwin':  # macOS
+                subprocess.run(['open', url])
+            else:  # Linux and others
+                subprocess.run(['xdg-open', url])
+            
+            self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ OPENED {Style.RESET_ALL} Download page opened in browser!", Fore.GREEN)
+        except Exception as e:
+            print(f"{Fore.RED}❌ Error opening browser: {e}")
+            print(f"{Fore.YELLOW}Manual download URL: {url}")
+    
+    def copy_to_clipboard(self, text):
+        """Copy text to clipboard"""
+        try:
+            system = platform.system().lower()
+            if system == 'windows':
+                subprocess.run(['clip'], input=text.encode(), check=True)
+            elif system == 'darwin':  # macOS
+                subprocess.run(['pbcopy'], input=text.encode(), check=True)
+            else:  # Linux
+                subprocess.run(['xclip', '-selection', 'clipboard'], input=text.encode(), check=True)
+            
+            self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ COPIED {Style.RESET_ALL} Download link copied to clipboard!", Fore.GREEN)
+        except Exception as e:
+            print(f"{Fore.RED}❌ Error copying to clipboard: {e}")
+            print(f"{Fore.YELLOW}Manual copy: {text}")
+    
+    def show_full_release_notes(self, notes):
+        """Display full release notes"""
+        self.clear_screen()
+        print(f"{Back.BLUE}{Fore.WHITE} 📋 FULL RELEASE NOTES {Style.RESET_ALL}\n")
+        
+        if notes:
+            print(f"{Fore.CYAN}{'='*60}")
+            print(f"{Fore.WHITE}{notes}")
+            print(f"{Fore.CYAN}{'='*60}")
+        else:
+            print(f"{Fore.YELLOW}No detailed release notes available.")
+        
+        input(f"\n{Fore.CYAN}Press Enter to continue...")
+    
+    def system_updates_menu(self):
+        """Main system updates menu with icons"""
+        self.print_header()
+        self.bounce_text(f"{Fore.WHITE}{Back.BLUE}  {self.get_icon('update')} SYSTEM UPDATES {self.get_icon('settings')}  {Style.RESET_ALL}", Fore.WHITE)
+        
+        update_menu = f"""{Fore.CYAN}
+┌─ Update Management ───────────────────────────────────────┐
+│                                                           │
+│ {self.get_icon('info')} Current Version: {Back.BLUE}{Fore.WHITE} Down Detector v{self.current_version} {Style.RESET_ALL}         {Fore.CYAN}│
+│                                                           │
+│ {self.get_icon('settings')} Auto-Check: {Back.BLUE}{Fore.WHITE} {'Enabled' if self.auto_update_check else 'Disabled'} {Style.RESET_ALL}                   {Fore.CYAN}│
+│                                                           │
+│ {Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} {self.get_icon('check')} Check for Updates                          {Fore.CYAN}│
+│ {Back.BLUE}{Fore.WHITE} 2 {Style.RESET_ALL} {self.get_icon('info')} View Current Version Info                  {Fore.CYAN}│
+│ {Back.YELLOW}{Fore.BLACK} 3 {Style.RESET_ALL} {self.get_icon('settings')} Toggle Auto-Update Check                   {Fore.CYAN}│
+│ {Back.MAGENTA}{Fore.WHITE} 4 {Style.RESET_ALL} {self.get_icon('computer')} System Information                         {Fore.CYAN}│
+│ {Back.CYAN}{Fore.BLACK} 5 {Style.RESET_ALL} {self.get_icon('log')} Update History                             {Fore.CYAN}│
+│ {Back.BLACK}{Fore.WHITE} 6 {Style.RESET_ALL} {self.get_icon('back')} Return to Main Menu                        {Fore.CYAN}│
+│                                                           │
+└───────────────────────────────────────────────────────────┘"""
+        
+        print(f"\n{update_menu}")
+        
+        choice = input(f"\n{Fore.YELLOW}Select option (1-6): ").strip()
+        
+        if choice == '1':
+            self.check_for_updates(silent=False)
+        elif choice == '2':
+            self.show_version_info()
+        elif choice == '3':
+            self.toggle_auto_update()
+        elif choice == '4':
+            self.show_system_info()
+        elif choice == '5':
+            self.show_update_history()
+        elif choice == '6':
+            return
+        else:
+            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ INVALID {Style.RESET_ALL} Please select 1-6", Fore.RED)
+        
+        if choice in ['1', '2', '3', '4', '5']:
+            input(f"\n{Fore.CYAN}Press Enter to continue...")
+            self.system_updates_menu()  # Show menu again
+    
+    def show_version_info(self):
+        """Display detailed version information with enhanced styling"""
+        self.loading_animation("Loading version information", 0.8)
+        
+        version_info = f"""{Fore.CYAN}
+┌─ Version Information ─────────────────────────────────────┐
+│                                                           │
+│ {self.get_icon('computer')} Application: Down Detector                             │
+│ {self.get_icon('info')} Version: v{self.current_version}                                      │
+│ {self.get_icon('star')} Developer: Gurraoptimus Development                             │
+│ {self.get_icon('computer')} Platform: {platform.system()} {platform.release()}                     │
+│ {self.get_icon('settings')} Python Version: {platform.python_version()}                        │
+│                                                           │
+│ {self.get_icon('success')} Features in v{self.current_version}:                                    │
+│ {self.get_icon('bullet')} Enhanced UI with comprehensive icon system            │
+│ {self.get_icon('bullet')} Real-time website monitoring                          │
+│ {self.get_icon('bullet')} Animated dashboard interface                          │
+│ {self.get_icon('bullet')} Sound notifications                                   │
+│ {self.get_icon('bullet')} Advanced logging system                               │
+│ {self.get_icon('bullet')} Direct GitHub update downloads                        │
+│ {self.get_icon('bullet')} Multi-platform support                                │
+│ {self.get_icon('bullet')} Professional visual design                            │
+│                                                           │
+└───────────────────────────────────────────────────────────┘
+"""
+        
+        print(f"\n{version_info}")
+    
+    def toggle_auto_update(self):
+        """Toggle automatic update checking"""
+        self.auto_update_check = not self.auto_update_check
+        status = "enabled" if self.auto_update_check else "disabled"
+        
+        self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ UPDATED {Style.RESET_ALL} Auto-update check {status}!", Fore.GREEN)
+        
+        # Update .env file
+        try:
+            env_lines = []
+            if os.path.exists('.env'):
+                with open('.env', 'r') as f:
+                    env_lines = f.readlines()
+            
+            # Update or add AUTO_UPDATE_CHECK line
+            updated = False
+            for i, line in enumerate(env_lines):
+                if line.startswith('AUTO_UPDATE_CHECK='):
+                    env_lines[i] = f"AUTO_UPDATE_CHECK={'true' if self.auto_update_check else 'false'}\n"
+                    updated = True
+                    break
+            
+            if not updated:
+                env_lines.append(f"AUTO_UPDATE_CHECK={'true' if self.auto_update_check else 'false'}\n")
+            
+            with open('.env', 'w') as f:
+                f.writelines(env_lines)
+                
+            print(f"{Fore.CYAN}ℹ️  Setting saved to .env file")
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️  Could not update .env file: {e}")
+    
+    def show_system_info(self):
+        """Display comprehensive system information"""
+        self.loading_animation("Gathering system information", 1.0)
+        
+        try:
+            import psutil
+            cpu_percent = psutil.cpu_percent(interval=1)
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
+        except (ImportError, ModuleNotFoundError):
+            cpu_percent = "N/A"
+            memory = None
+            disk = None
+        except Exception:
+            cpu_percent = "N/A"
+            memory = None
+            disk = None
+        
+        system_info = f"""{Fore.CYAN}┌─ System Information ──────────────────────────────────────┐
+│                                                           │
+│ Operating System: {platform.system()} {platform.release()}                │
+│ Architecture: {platform.machine()}                              │
+│ Processor: {platform.processor()[:30]}               │
+│ Python Version: {platform.python_version()}                         │
+│ CPU Usage: {cpu_percent}%                                      │"""
+        
+        if memory:
+            memory_percent = memory.percent
+            system_info += f"""
+│ Memory Usage: {memory_percent}%                                   │"""
+        
+        if disk:
+            disk_percent = disk.percent
+            system_info += f"""
+│ Disk Usage: {disk_percent}%                                     │"""
+        
+        system_info += f"""
+│                                                           │
+│ Application Details:                                      │
+│ • Config File: {self.websites.path or self.websites_file}                           │
+│ • Websites Monitored: {len(self.websites)}                              │
+│ • Timeout Setting: {self.timeout}s                               │
+│ • Sound Effects: {'On' if self.enable_sounds else 'Off'}                                │
+│                                                           │
+└───────────────────────────────────────────────────────────┘"""
+        
+        print(f"\n{system_info}")
+    
+    def show_update_history(self):
+        """Display update history (simulated for now)"""
+        self.loading_animation("Loading update history", 0.8)
+        
+        # This is a simulated update history - in a real app, you'd store this data
+        history = [
+            {"version": "1.0", "date": "2025-10-21", "type": "Major", "description": "Initial release with full features"}
+        ]
+        
+        print(f"\n{Back.BLUE}{Fore.WHITE} 📊 UPDATE HISTORY {Style.RESET_ALL}")
+        print(f"\n{Fore.CYAN}┌─ Version History ─────────────────────────────────────────┐")
+        print(f"{Fore.CYAN}│ {Back.BLUE}{Fore.WHITE} Ver.  {Style.RESET_ALL} {Back.BLUE}{Fore.WHITE} Date       {Style.RESET_ALL} {Back.BLUE}{Fore.WHITE} Type  {Style.RESET_ALL} {Back.BLUE}{Fore.WHITE} Description            {Style.RESET_ALL} {Fore.CYAN}│")
+        print(f"{Fore.CYAN}├──────┼────────────┼───────┼────────────────────────┤")
+        
+        for update in history:
+            version = update["version"]
+            date = update["date"]
+            update_type = update["type"]
+            desc = update["description"][:20] + "..." if len(update["description"]) > 20 else update["description"]
+            
+            # Highlight current version
+            if version == self.current_version:
+                print(f"{Fore.CYAN}│ {Back.GREEN}{Fore.WHITE}{version:<6}{Style.RESET_ALL} │ {date}  │ {update_type:<5} │ {desc:<22} {Fore.CYAN}│")
+            else:
+                print(f"{Fore.CYAN}│ {version:<6} │ {date}  │ {update_type:<5} │ {desc:<22} │")
+        
+        print(f"{Fore.CYAN}└──────┴────────────┴───────┴────────────────────────┘")
+        print(f"{Fore.YELLOW}💡 Tip: Enable auto-update check to stay current!")
+
+    def reload_env_settings(self):
+        """Reload environment variables"""
+        load_dotenv(override=True)
+        self.timeout = int(os.getenv('TIMEOUT', '5'))
+        self.websites_file = os.getenv('WEBSITES_FILE', 'websites.json')
+        self.site_store = os.getenv('SITE_STORE', 'sqlite').lower()
+        self.site_db = os.getenv('SITE_DB', 'websites.db')
+        self.monitor_interval = int(os.getenv('MONITOR_INTERVAL', '5'))
+        self.animation_speed = float(os.getenv('ANIMATION_SPEED', '0.1'))
+        self.enable_sounds = os.getenv('ENABLE_SOUNDS', 'true').lower() == 'true'
+        self.auto_update_check = os.getenv('AUTO_UPDATE_CHECK', 'true').lower() == 'true'
+        self.max_concurrency = int(os.getenv('MAX_CONCURRENCY', '20'))
+        self.probe_backend = os.getenv('PROBE_BACKEND', 'threads').lower()
+        self.session_pool.pool_maxsize = max(1, int(os.getenv('POOL_MAXSIZE_PER_HOST', '4')))
+        self.session_pool.idle_timeout = int(os.getenv('POOL_IDLE_TIMEOUT', '300'))
+        # New connections pick this up; sessions already open keep their setting until evicted
+        self.phase_timings = self.session_pool.phase_timings = os.getenv('PHASE_TIMINGS', 'true').lower() == 'true'
+        if self.async_probe is not None:
+            self.async_probe.phase_timings = self.phase_timings
+        self.monitor_shards = int(os.getenv('MONITOR_SHARDS', '1')) or os.cpu_count() or 1
+        self.shard_key = os.getenv('SHARD_KEY', 'host').lower()
+        self.probe_mode = os.getenv('PROBE_MODE', 'get').lower()
+        self.probe_max_bytes = max(1, int(os.getenv('PROBE_MAX_BYTES', '1024')))
+        self.schedule_jitter = float(os.getenv('SCHEDULE_JITTER', '0.1'))
+        self.max_retries = int(os.getenv('MAX_RETRIES', '3'))
+        self.retry_backoff = float(os.getenv('RETRY_BACKOFF', '0.2'))
+        self.hedge_requests = os.getenv('HEDGE_REQUESTS', 'false').lower() == 'true'
+        self.hedge_delays = {}
+        self.dns_prewarm = os.getenv('DNS_PREWARM', 'true').lower() == 'true'
+        if self.dns_cache is not None:
+            self.dns_cache.default_ttl = int(os.getenv('DNS_CACHE_TTL', '300'))
+            self.dns_cache.negative_ttl = int(os.getenv('DNS_NEGATIVE_TTL', '30'))
+
+    def bootup_sequence(self):
+        """Animated bootup sequence"""
+        self.clear_screen()
+        
+        
+        # Check for .env file
+        if not os.path.exists('.env'):
+            print(f"{Fore.YELLOW}⚠️  No .env file found. Creating default configuration...")
+            if self.create_env_file():
+                print(f"{Fore.GREEN}✅ Default .env file created successfully!")
+                time.sleep(1)
+        
+        # ASCII Art Logo with enhanced visual design
+        logo = [
+            "╔═══════════════════════════════════════════════════════════════════╗",
+            "║ ██████╗  ██████╗ ██╗    ██╗███╗   ██╗    🌐                        ║",
+            "║ ██╔══██╗██╔═══██╗██║    ██║████╗  ██║   📊                         ║",
+            "║ ██║  ██║██║   ██║██║ █╗ ██║██╔██╗ ██║    ⚡                        ║",
+            "║ ██║  ██║██║   ██║██║███╗██║██║╚██╗██║                              ║",
+            "║ ██████╔╝╚██████╔╝╚███╔███╔╝██║ ╚████║     🔍                      ║",
+            "║ ╚═════╝  ╚═════╝  ╚══╝╚══╝ ╚═╝  ╚═══╝    📱                       ║",
+            "║                                          💻                       ║",
+            "║ ██████╗ ███████╗████████╗███████╗ ██████╗████████╗ ██████╗ ██████╗ ║",
+            "║ ██╔══██╗██╔════╝╚══██╔══╝██╔════╝██╔════╝╚══██╔══╝██╔═══██╗██╔══██╗║",
+            "║ ██║  ██║█████╗     ██║   █████╗  ██║        ██║   ██║   ██║██████╔╝║",
+            "║ ██║  ██║██╔══╝     ██║   ██╔══╝  ██║        ██║   ██║   ██║██╔══██╗║",
+            "║ ██████╔╝███████╗   ██║   ███████╗╚██████╗   ██║   ╚██████╔╝██║  ██║║",
+            "║ ╚═════╝ ╚══════╝   ╚═╝   ╚══════╝ ╚═════╝   ╚═╝    ╚═════╝ ╚═╝  ╚═╝║",
+            "║                      🚀 Real-Time Monitoring 🚀                   ║",
+            "╚═══════════════════════════════════════════════════════════════════╝"
+        ]
+        
+        # Display logo with animation
+        print(f"{Fore.CYAN}")
+        for line in logo:
+            print(line)
+            time.sleep(self.animation_speed * 0.5)
+        print(Style.RESET_ALL)
+        
+        # System info display with icons
+        system_info = [
+            f"{Fore.GREEN}[{self.get_icon('computer')}] Initializing Down Detector v{self.current_version}...",
+            f"{Fore.GREEN}[{self.get_icon('star')}] Developed by Gurraoptimus Development",
+            f"{Fore.GREEN}[{self.get_icon('settings')}] Loading core modules...",
+            f"{Fore.YELLOW}[{self.get_icon('check')}] Checking system requirements...",
+            f"{Fore.YELLOW}[{self.get_icon('network')}] Loading network stack...",
+            f"{Fore.YELLOW}[{self.get_icon('monitor')}] Initializing monitoring engine...",
+            f"{Fore.BLUE}[{self.get_icon('file')}] Loading configuration files...",
+            f"{Fore.BLUE}[{self.get_icon('settings')}] Loading .env settings...",
+            f"{Fore.BLUE}[{self.get_icon('settings')}] Setting up user preferences...",
+            f"{Fore.MAGENTA}[{self.get_icon('update')}] Checking for system updates...",
+            f"{Fore.MAGENTA}[{self.get_icon('success')}] System initialized successfully!"
+        ]
+        
+        print(f"\n{Fore.WHITE}SYSTEM BOOTUP SEQUENCE{Style.RESET_ALL}")
+        print("=" * 60)
+        
+        for info in system_info:
+            print(info)
+            time.sleep(self.animation_speed * 2)
+            
+        # Progress bar for final initialization
+        print(f"\n{Fore.CYAN}Final initialization:")
+        self.progress_bar(1.5, 40)
+        
+        # Success message with icons and sound
+        self.play_pop_sound("online")
+        print(f"\n{Back.GREEN}{Fore.WHITE} {self.get_icon('success')} SYSTEM READY - DOWN DETECTOR ONLINE {self.get_icon('lightning')} {Style.RESET_ALL}\n")
+        time.sleep(0.5)
+    
+    def reboot_system(self):
+        """Reboot the application with full shutdown and restart sequence"""
+        self.print_header()
+        print(f"\n{Fore.WHITE}{Back.BLUE}  🔄 SYSTEM REBOOT  {Style.RESET_ALL}\n")
+        
+        confirm = input(f"{Fore.YELLOW}⚠️  Are you sure you want to reboot the system? (y/n): ").strip().lower()
+        
+        if confirm in ['y', 'yes']:
+            # Shutdown sequence
+            self.typewriter_effect(f"{Fore.YELLOW}Initiating system reboot sequence...")
+            
+            shutdown_steps = [
+                f"{Fore.RED}[SHUTDOWN] Stopping monitoring services...",
+                f"{Fore.RED}[SHUTDOWN] Closing network connections...",
+                f"{Fore.RED}[SHUTDOWN] Saving current state...",
+                f"{Fore.RED}[SHUTDOWN] Clearing memory buffers...",
+                f"{Fore.RED}[SHUTDOWN] Terminating processes...",
+                f"{Fore.RED}[SHUTDOWN] System shutdown complete."
+            ]
+            
+            for step in shutdown_steps:
+                print(step)
+                time.sleep(0.4)
+            
+            # Shutdown progress bar
+            print(f"\n{Fore.RED}Shutdown progress:")
+            self.progress_bar(2, 40)
+            
+            self.play_pop_sound("offline")
+            print(f"\n{Back.RED}{Fore.WHITE} 🔌 SYSTEM OFFLINE {Style.RESET_ALL}")
+            time.sleep(1)
+            
+            # Clear screen and show rebooting message
+            self.clear_screen()
+            print(f"{Back.YELLOW}{Fore.BLACK} 🔄 REBOOTING... {Style.RESET_ALL}")
+            time.sleep(2)
+            
+            # Restart the application
+            self.__init__()
+            
+        else:
+            self.bounce_text(f"{Fore.YELLOW}❌ Reboot cancelled", Fore.YELLOW)
+            input(f"\n{Fore.CYAN}Press Enter to return to menu...")
+    
+    def play_pop_sound(self, sound_type="default"):
+        """Play different Windows sounds for different events"""
+        if not self.enable_sounds:
+            return
+            
+        try:
+            if winsound is None:
+                raise ImportError("winsound is only available on Windows")
+            if sound_type == "online":
+                winsound.MessageBeep(winsound.MB_OK)
+            elif sound_type == "offline":
+                winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
+            elif sound_type == "error":
+                winsound.MessageBeep(winsound.MB_ICONHAND)
+            else:
+                winsound.MessageBeep(winsound.MB_ICONASTERISK)
+        except ImportError:
+            try:
+                print('\a', end='', flush=True)
+            except:
+                pass
+    def loading_animation(self, text="Loading", duration=2):
+        """Animated loading spinner"""
+        frames = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
+        end_time = time.time() + duration
+        
+        while time.time() < end_time:
+            for frame in frames:
+                if time.time() >= end_time:
+                    break
+                print(f"\r{Fore.CYAN}{frame} {text}...", end="", flush=True)
+                time.sleep(self.animation_speed)
+        print("\r" + " " * (len(text) + 10) + "\r", end="", flush=True)
+    
+    def typewriter_effect(self, text, delay=None):
+        """Typewriter animation for text"""
+        if delay is None:
+            delay = self.animation_speed * 0.2
+        for char in text:
+            print(char, end='', flush=True)
+            time.sleep(delay)
+        print()
+    
+    def progress_bar(self, duration=2, width=40):
+        """Animated progress bar"""
+        for i in range(width + 1):
+            progress = i / width
+            filled = int(width * progress)
+            bar = f"{Fore.GREEN}{'█' * filled}{Fore.LIGHTBLACK_EX}{'░' * (width - filled)}"
+            percent = int(progress * 100)
+            print(f"\r{bar} {Fore.CYAN}{percent}%", end="", flush=True)
+            time.sleep(duration / width)
+        print()
+    
+    def bounce_text(self, text, color=Fore.CYAN):
+        """Bouncing text animation"""
+        self.play_pop_sound()
+        for _ in range(2):
+            print(f"\r{color}{text}", end="", flush=True)
+            time.sleep(self.animation_speed * 2)
+            print(f"\r{' ' * len(text)}", end="", flush=True)
+            time.sleep(self.animation_speed)
+        print(f"\r{color}{text}")
+    
+    def fade_in_text(self, text, color=Fore.WHITE):
+        """Fade in effect for text"""
+        colors = [Fore.LIGHTBLACK_EX, color]
+        for fade_color in colors:
+            print(f"\r{fade_color}{text}", end="", flush=True)
+            time.sleep(self.animation_speed * 2)
+        print()
+    
+    def animated_border(self, width=60):
+        """Animated border drawing"""
+        print(f"{Fore.CYAN}╔", end="", flush=True)
+        for _ in range(width):
+            print("═", end="", flush=True)
+            time.sleep(self.animation_speed * 0.05)
+        print("╗")
+        
+        print(f"{Fore.CYAN}║{' ' * width}║")
+        
+        print(f"{Fore.CYAN}╚", end="", flush=True)
+        for _ in range(width):
+            print("═", end="", flush=True)
+            time.sleep(self.animation_speed * 0.05)
+        print("╝")
+    
+    def pulsing_status(self, status, is_online):
+        """Pulsing status indicator"""
+        colors = [Fore.GREEN, Fore.LIGHTGREEN_EX] if is_online else [Fore.RED, Fore.LIGHTRED_EX]
+        symbol = "●"
+        
+        for color in colors:
+            print(f"\r{color}{symbol} {status}", end="", flush=True)
+            time.sleep(self.animation_speed * 2)
+        print()
+    
+    def load_websites(self):
+        """Load websites from file with animation"""
+        if not self.headless:
+            self.loading_animation("Loading configuration", 0.5)
+        self.websites.close()
+        if self.site_store == 'sqlite':
+            try:
+                self.websites = SqliteSiteRegistry(self.site_db)
+                # First start with the database: bring over the websites from websites.json
+                migrated = self.websites.migrate_from(self.websites_file)
+                if migrated:
+                    message = (f"Imported {migrated} websites from {self.websites_file} into {self.site_db}; "
+                               f"the old file is now {self.websites_file}.migrated (set SITE_STORE=json to keep using it)")
+                    self.log_system_event("SITES_MIGRATED", message)
+                    print(f"{Fore.CYAN}ℹ️  {message}", file=sys.stderr if self.headless else sys.stdout)
+            except sqlite3.Error as e:
+                print(f"{Fore.YELLOW}⚠️  Site database unavailable ({e}), using {self.websites_file}")
+                self.websites = JsonSiteRegistry(self.websites_file)
+        else:
+            # Don't override timeout from .env with the file's value
+            self.websites = JsonSiteRegistry(self.websites_file)
+        self.session_pool.configure(self.websites)
+    
+    def save_websites(self):
+        """Kept for compatibility: every change is already written through to the site store"""
+        if isinstance(self.websites, JsonSiteRegistry):
+            self.websites.compact()
+    
+    def reset_system(self):
+        """Reset the app to default state with animations"""
+        self.print_header()
+        print(f"\n{Fore.WHITE}{Back.RED}  🔄 SYSTEM RESET  {Style.RESET_ALL}\n")
+        
+        self.typewriter_effect(f"{Fore.YELLOW}Initializing system reset...")
+        time.sleep(0.3)
+        
+        print(f"{Fore.YELLOW}┌─ Reset Options ───────────────────────────┐")
+        print(f"{Fore.YELLOW}│ This operation will:                     │")
+        print(f"{Fore.YELLOW}│ • Clear all monitored websites           │")
+        print(f"{Fore.YELLOW}│ • Reset timeout to default (5 seconds)   │")
+        print(f"{Fore.YELLOW}│ • Delete configuration file              │")
+        print(f"{Fore.YELLOW}│ • Keep .env file settings                │")
+        print(f"{Fore.YELLOW}└───────────────────────────────────────────┘")
+        
+        confirm = input(f"\n{Fore.RED}⚠️  Confirm reset (type 'yes' to proceed): ").strip().lower()
+        
+        if confirm == 'yes':
+            self.loading_animation("Resetting system", 1.5)
+            self.history.clear()
+            self.statistics.clear()
+            
+            try:
+                self.websites.reset()
+                if not isinstance(self.websites, JsonSiteRegistry) and os.path.exists(self.websites_file):
+                    os.remove(self.websites_file)
+                self.bounce_text(f"{Fore.GREEN}✅ System successfully reset!", Fore.GREEN)
+                print(f"{Fore.CYAN}ℹ️  All configuration data cleared")
+                print(f"{Fore.CYAN}ℹ️  .env file preserved")
+            except Exception as e:
+                print(f"\n{Fore.RED}❌ Reset failed: {e}")
+        else:
+            self.bounce_text(f"{Fore.YELLOW}❌ Reset cancelled", Fore.YELLOW)
+        
+        input(f"\n{Fore.CYAN}Press Enter to return to menu...")
+    
+    def clear_screen(self):
+        """Clear the terminal screen"""
+        os.system('cls' if os.name == 'nt' else 'clear')
+    
+    def display_app_icon(self):
+        """Display the main application icon"""
+        icon_art = f"""
+{Fore.CYAN}         ╔═══════════════════════════════╗
+         ║        {self.get_icon('network')} DOWN DETECTOR {self.get_icon('monitor')}        ║
+         ║                               ║
+         ║   {self.get_icon('check')} Real-Time Monitoring {self.get_icon('lightning')}   ║
+         ║   {self.get_icon('computer')} Website Status Checker {self.get_icon('wifi')} ║
+         ║                               ║
+         ║     {self.get_icon('star')} v{self.current_version} - Ready! {self.get_icon('success')}     ║
+         ╚═══════════════════════════════╝{Style.RESET_ALL}
+        """
+        print(icon_art)
+    
+    def display_status_icons(self, status, website_name=""):
+        """Display status-specific icons with animations"""
+        if status.upper() == "ONLINE" or status == True:
+            icon = self.get_icon('online')
+            color = Fore.GREEN
+            bg_color = Back.GREEN
+            text_color = Fore.WHITE
+        elif status.upper() == "OFFLINE" or status == False:
+            icon = self.get_icon('offline')
+            color = Fore.RED
+            bg_color = Back.RED
+            text_color = Fore.WHITE
+        elif status.upper() == "CHECKING":
+            icon = self.get_icon('checking')
+            color = Fore.BLUE
+            bg_color = Back.BLUE
+            text_color = Fore.WHITE
+        elif status.upper() == "WARNING":
+            icon = self.get_icon('warning')
+            color = Fore.YELLOW
+            bg_color = Back.YELLOW
+            text_color = Fore.BLACK
+        else:
+            icon = self.get_icon('info')
+            color = Fore.CYAN
+            bg_color = Back.CYAN
+            text_color = Fore.BLACK
+        
+        if website_name:
+            print(f"{bg_color}{text_color} {icon} {status.upper()} {Style.RESET_ALL} {color}{website_name}{Style.RESET_ALL}")
+        else:
+            print(f"{bg_color}{text_color} {icon} {status.upper()} {Style.RESET_ALL}")
+        
+        return icon
+    
+    def print_header(self):
+        """Print the app header with animated design and icons"""
+        self.clear_screen()
+        
+        # Enhanced header with icons
+        header_lines = [
+            "╔══════════════════════════════════════════════════════════╗",
+            f"║               {self.get_icon('network')} DOWN DETECTOR {self.get_icon('monitor')}               ║",
+            f"║              {self.get_icon('computer')} Real-Time Website Monitor {self.get_icon('wifi')}            ║",
+            f"║            {self.get_icon('settings')} Built by: Gurraoptimus Development {self.get_icon('star')}         ║",
+            "╚══════════════════════════════════════════════════════════╝"
+        ]
+        
+        print(f"{Back.BLUE}{Fore.WHITE}")
+        for line in header_lines:
+            print(line)
+        print(Style.RESET_ALL)
+        
+        # Enhanced navigation with icons
+        nav_items = f" {self.get_icon('home')} HOME {self.get_icon('monitor')} MONITOR {self.get_icon('settings')} SETTINGS {self.get_icon('update')} UPDATES {self.get_icon('info')} ABOUT "
+        print(f"{Back.CYAN}{Fore.BLACK} {nav_items} {Style.RESET_ALL}\n")
+    
+    def print_menu(self):
+        """Print the main menu with animations and icons"""
+        menu_content = f"""{Fore.CYAN}┌─ Main Menu ──────────────────────────────────────────────┐
+│                                                           │
+│  {Back.GREEN}{Fore.BLACK} 1 {Style.RESET_ALL} {self.get_icon('add')} Add Website    {Back.GREEN}{Fore.BLACK} 2 {Style.RESET_ALL} {self.get_icon('remove')} Remove Website {Fore.CYAN}│
+│                                                           │
+│  {Back.BLUE}{Fore.WHITE} 3 {Style.RESET_ALL} {self.get_icon('file')} View List      {Back.BLUE}{Fore.WHITE} 4 {Style.RESET_ALL} {self.get_icon('check')} Check All      {Fore.CYAN}│
+│                                                           │
+│  {Back.MAGENTA}{Fore.WHITE} 5 {Style.RESET_ALL} {self.get_icon('monitor')} Start Monitor  {Back.YELLOW}{Fore.BLACK} 6 {Style.RESET_ALL} {self.get_icon('settings')} Settings       {Fore.CYAN}│
+│                                                           │
+│  {Back.CYAN}{Fore.BLACK} 7 {Style.RESET_ALL} {self.get_icon('update')} System Updates {Back.RED}{Fore.WHITE} 8 {Style.RESET_ALL} {self.get_icon('refresh')} Reset System   {Fore.CYAN}│
+│                                                           │
+│  {Back.LIGHTBLACK_EX}{Fore.WHITE} 9 {Style.RESET_ALL} {self.get_icon('computer')} Reboot App     {Back.BLACK}{Fore.WHITE} 0 {Style.RESET_ALL} {self.get_icon('exit')} Exit App       {Fore.CYAN}│
+│                                                           │
+│  {Back.GREEN}{Fore.BLACK} S {Style.RESET_ALL} {self.get_icon('stats')} Statistics     {Back.BLUE}{Fore.WHITE} I {Style.RESET_ALL} {self.get_icon('folder')} Import/Export  {Fore.CYAN}│
+│                                                           │
+└───────────────────────────────────────────────────────────┘"""
+        
+        print(menu_content)
+        
+        # Enhanced status bar with icons
+        status_info = f" {self.get_icon('stats')} Status: {len(self.websites)} websites | {self.get_icon('info')} v{self.current_version} | {self.get_icon('clock')} Timeout: {self.timeout}s | {self.get_icon('settings')} Sounds: {'ON' if self.enable_sounds else 'OFF'} "
+        print(f"\n{Back.LIGHTBLACK_EX}{Fore.WHITE}{status_info}{Style.RESET_ALL}")
+        self.pulsing_status("System Ready", True)
+    
+    def add_website(self):
+        """Add a website to monitor with animated design and icons"""
+        self.print_header()
+        self.bounce_text(f"{Fore.WHITE}{Back.GREEN}  {self.get_icon('add')} ADD NEW WEBSITE {self.get_icon('network')}  {Style.RESET_ALL}", Fore.WHITE)
+        
+        print(f"\n{Fore.CYAN}┌─ Website Registration Form ──────────────────────────────┐")
+        print(f"{Fore.CYAN}│                                                           │")
+        
+        url = input(f"{Fore.CYAN}│ {self.get_icon('network')} Website URL: {Fore.YELLOW}").strip()
+        print(f"{Fore.CYAN}│                                                           │")
+        print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
+        
+        if url:
+            self.loading_animation("Validating URL", 0.8)
+            url = normalize_url(url)
+            
+            if self.websites.add(url):
+                self.play_pop_sound("online")
+                self.log_system_event("WEBSITE_ADDED", f"Added website: {url}")
+                self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ SUCCESS {Style.RESET_ALL} Website added successfully!", Fore.GREEN)
+            else:
+                self.log_system_event("WEBSITE_ADD_FAILED", f"Website already exists: {url}")
+                self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} ⚠️  WARNING {Style.RESET_ALL} Website already exists!", Fore.YELLOW)
+        else:
+            self.log_system_event("WEBSITE_ADD_FAILED", "Invalid URL provided")
+            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ ERROR {Style.RESET_ALL} Invalid URL provided!", Fore.RED)
+        
+        input(f"\n{Fore.CYAN}Press Enter to continue...")
+
+    def remove_website(self):
+        """Remove a website from monitoring with improved UI and animations"""
+        self.print_header()
+        self.bounce_text(f"{Fore.WHITE}{Back.RED}  ➖ REMOVE WEBSITE  {Style.RESET_ALL}", Fore.WHITE)
+        
+        if not self.websites:
+            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ NO WEBSITES {Style.RESET_ALL} No websites configured!", Fore.RED)
+            input(f"\n{Fore.CYAN}Press Enter to continue...")
+            return
+        
+        options = f"""{Fore.YELLOW}┌─ Removal Options ────────────────────────────────────────┐
+│ {Back.BLUE}{Fore.WHITE} 1 {Style.RESET_ALL} Remove single website                            {Fore.YELLOW}│
+│ {Back.RED}{Fore.WHITE} 2 {Style.RESET_ALL} Remove all websites                              {Fore.YELLOW}│
+│ {Back.BLACK}{Fore.WHITE} 3 {Style.RESET_ALL} Cancel operation                                 {Fore.YELLOW}│
+└───────────────────────────────────────────────────────────┘"""
+        
+        print(f"\n{options}")
+        
+        option = input(f"\n{Fore.CYAN}Select option (1-3): ").strip()
+        
+        if option == '1':
+            self.loading_animation("Loading website list", 0.5)
+            print(f"\n{Fore.CYAN}┌─ Website Selection ───────────────────────────────────────┐")
+            for i, website in enumerate(self.websites, 1):
+                print(f"{Fore.CYAN}│ {Back.GREEN}{Fore.WHITE} {i} {Style.RESET_ALL} {website[:50]:<50} {Fore.CYAN}│")
+            print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
+            
+            try:
+                choice = int(input(f"\n{Fore.YELLOW}Enter website number: "))
+                if 1 <= choice <= len(self.websites):
+                    self.loading_animation("Removing website", 0.8)
+                    removed = self.websites[choice - 1]
+                    self.websites.remove(removed)
+                    self.history.remove(removed)
+                    self.statistics.remove(removed)
+                    self.play_pop_sound("online")
+                    self.log_system_event("WEBSITE_REMOVED", f"Removed website: {removed}")
+                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ REMOVED {Style.RESET_ALL} {removed}", Fore.GREEN)
+                else:
+                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ INVALID {Style.RESET_ALL} Please select a valid number!", Fore.RED)
+            except ValueError:
+                self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ ERROR {Style.RESET_ALL} Invalid input!", Fore.RED)
+        
+        elif option == '2':
+            confirm = input(f"\n{Fore.RED}⚠️  Type 'DELETE ALL' to confirm removal: ").strip()
+            if confirm == 'DELETE ALL':
+                self.loading_animation("Removing all websites", 1.2)
+                count = len(self.websites)
+                self.websites.clear()
+                self.history.clear()
+                self.statistics.clear()
+                self.play_pop_sound("online")
+                self.log_system_event("ALL_WEBSITES_REMOVED", f"Removed {count} websites")
+                self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ SUCCESS {Style.RESET_ALL} All websites removed!", Fore.GREEN)
+            else:
+                self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} ❌ CANCELLED {Style.RESET_ALL} Operation cancelled!", Fore.YELLOW)
+        
+        input(f"\n{Fore.CYAN}Press Enter to continue...")
+    
+    def view_websites(self):
+        """Display all websites in a table format with animations and icons"""
+        self.print_header()
+        self.bounce_text(f"{Fore.WHITE}{Back.BLUE}  {self.get_icon('dashboard')} WEBSITE DASHBOARD {self.get_icon('monitor')}  {Style.RESET_ALL}", Fore.WHITE)
+        
+        if not self.websites:
+            self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} {self.get_icon('warning')} NO DATA {Style.RESET_ALL} No websites configured yet!", Fore.YELLOW)
+        else:
+            self.loading_animation("Loading dashboard", 0.8)
+            
+            print(f"\n{Fore.CYAN}┌─ Monitored Websites ──────────────────────────────────────┐")
+            print(f"{Fore.CYAN}│ {Back.BLUE}{Fore.WHITE} # {Style.RESET_ALL} {Back.BLUE}{Fore.WHITE} {self.get_icon('network')} Website URL                                 {Style.RESET_ALL} {Fore.CYAN}│")
+            print(f"{Fore.CYAN}├───┼──────────────────────────────────────────────────────┤")
+            
+            for i, website in enumerate(self.websites, 1):
+                history = self.history.get(website)
+                if history is not None and len(history):
+                    # Last result and uptime of this session, from the in-memory history
+                    color = Fore.GREEN if history.latest()[3] else Fore.RED
+                    summary = f"{color}{history.uptime():5.1f}%{Fore.CYAN}"
+                else:
+                    summary = "      "
+                print(f"{Fore.CYAN}│ {i:>1} │ {self.get_icon('bullet')} {website[:39]:<39} {summary} │")
+            
+            print(f"{Fore.CYAN}└───┴──────────────────────────────────────────────────────┘")
+        
+        input(f"\n{Fore.CYAN}Press Enter to continue...")
+    
+    def load_statistics(self):
+        """Add last week's on-disk history (before this session) to the statistics, once"""
+        if self.statistics_loaded or self.history_archive is None:
+            return
+        # Results of this session are already counted, so replay only what came before it
+        self.statistics.load_from_archive(self.history_archive, self.websites, int(self.statistics_since) - 1)
+        self.statistics_loaded = True
+    
+    def statistics_report(self):
+        """Machine-readable statistics of every website"""
+        return {
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'windows': list(CheckStatistics.WINDOWS),
+            'sites': self.statistics.snapshot(self.websites),
+        }
+    
+    def save_statistics(self, path='stats.json'):
+        """Write statistics_report() as JSON to path"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.statistics_report(), f, indent=2)
+        return path
+    
+    def view_statistics(self):
+        """Uptime and latency percentiles, or mean phase timings, per website over the last hour, day or week"""
+        window = '24h'
+        show_phases = False
+        while True:
+            self.print_header()
+            self.bounce_text(f"{Fore.WHITE}{Back.GREEN}  {self.get_icon('stats')} STATISTICS ({window}) {Style.RESET_ALL}", Fore.WHITE)
+            
+            if not self.websites:
+                self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} {self.get_icon('warning')} NO DATA {Style.RESET_ALL} No websites configured yet!", Fore.YELLOW)
+                input(f"\n{Fore.CYAN}Press Enter to continue...")
+                return
+            
+            if not self.statistics_loaded:
+                self.loading_animation("Loading check history", 0.5)
+                self.load_statistics()
+            
+            if show_phases:
+                # Phase timings are only known for checks made since Down Detector started
+                print(f"\n{Fore.CYAN}{'Website':<32} {'Checks':>7} {'DNS':>9} {'Connect':>9} {'TLS':>9} {'TTFB':>9} {'Transfer':>9}")
+            else:
+                print(f"\n{Fore.CYAN}{'Website':<32} {'Checks':>7} {'Uptime':>8} {'Mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+            print(f"{Fore.CYAN}{'─' * 85}")
+            for website in self.websites:
+                summary = self.statistics.summary(website, window)
+                if summary is None:
+                    print(f"{Fore.WHITE}{website[:32]:<32} {Fore.BLUE}{'no checks':>7}")
+                    continue
+                if show_phases:
+                    phases = summary.get('phases_ms', {})
+                    timings = "".join(
+                        f" {phases[phase]:>7.1f}ms" if phases.get(phase) is not None else f" {'-':>9}"
+                        for phase in CHECK_PHASES
+                    )
+                    print(f"{Fore.WHITE}{website[:32]:<32} {summary['checks']:>7}{timings}")
+                    continue
+                color = Fore.GREEN if summary['uptime'] >= 99 else Fore.YELLOW if summary['uptime'] >= 90 else Fore.RED
+                latencies = "".join(
+                    f" {summary[key]:>6.0f}ms" if summary[key] is not None else f" {'-':>8}"
+                    for key in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')
+                )
+                print(f"{Fore.WHITE}{website[:32]:<32} {summary['checks']:>7} {color}{summary['uptime']:>7.2f}%{Fore.WHITE}{latencies}")
+            
+            print(f"\n{Fore.YELLOW}Statistics Options:")
+            print(f"{Back.BLUE}{Fore.WHITE} 1 {Style.RESET_ALL} Last hour   {Back.BLUE}{Fore.WHITE} 2 {Style.RESET_ALL} Last 24 hours   {Back.BLUE}{Fore.WHITE} 3 {Style.RESET_ALL} Last 7 days")
+            print(f"{Back.GREEN}{Fore.WHITE} 4 {Style.RESET_ALL} Save as JSON (stats.json)   {Back.MAGENTA}{Fore.WHITE} P {Style.RESET_ALL} {'Uptime and latency' if show_phases else 'Phase timings (mean)'}")
+            print(f"{Back.RED}{Fore.WHITE} 5 {Style.RESET_ALL} Return to main menu")
+            
+            choice = input(f"\n{Fore.CYAN}Select option (1-5, P): ").strip()
+            if choice in ('1', '2', '3'):
+                window = list(CheckStatistics.WINDOWS)[int(choice) - 1]
+            elif choice.lower() == 'p':
+                show_phases = not show_phases
+            elif choice == '4':
+                try:
+                    path = self.save_statistics()
+                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ SAVED {Style.RESET_ALL} {os.path.abspath(path)}", Fore.GREEN)
+                except Exception as e:
+                    print(f"{Fore.RED}❌ Error saving statistics: {e}")
+                input(f"\n{Fore.CYAN}Press Enter to continue...")
+            else:
+                return
+    
+    def import_websites(self, stream, fmt='txt'):
+        """Add every website in a site list stream in one transaction; returns (added, duplicates, invalid)"""
+        reader = SiteFileReader(stream, fmt)
+        added, duplicates = self.websites.add_many(reader)
+        if added:
+            self.log_system_event("WEBSITES_IMPORTED", f"Imported {added} websites ({duplicates} duplicates, {reader.invalid} invalid)")
+        return added, duplicates, reader.invalid
+    
+    def export_websites(self, stream, fmt='txt'):
+        """Write every website and its settings to stream; returns the count"""
+        return write_site_entries(stream, self.websites.items(), fmt)
+    
+    @contextlib.contextmanager
+    def open_site_file(self, path, mode):
+        """Open a site list for import ('r') or export ('w'); '-' means stdin or stdout"""
+        if path == '-':
+            yield sys.stdin if mode == 'r' else sys.stdout
+        else:
+            with open(path, mode, encoding='utf-8', newline='') as f:
+                yield f
+    
+    def run_import_command(self, path, fmt=None):
+        """Bulk import for the import command; returns a process exit code"""
+        try:
+            with self.open_site_file(path, 'r') as f:
+                added, duplicates, invalid = self.import_websites(f, fmt or site_file_format(path))
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Import failed: {e}", file=sys.stderr)
+            return 1
+        print(f"{added} added, {duplicates} already monitored, {invalid} invalid", file=sys.stderr)
+        return 0
+    
+    def run_export_command(self, path, fmt=None):
+        """Bulk export for the export command; returns a process exit code"""
+        try:
+            with self.open_site_file(path, 'w') as f:
+                count = self.export_websites(f, fmt or site_file_format(path))
+        except OSError as e:
+            print(f"Export failed: {e}", file=sys.stderr)
+            return 1
+        print(f"{count} websites exported", file=sys.stderr)
+        return 0
+    
+    def import_export_menu(self):
+        """Import websites from, or export them to, a txt/CSV/JSON-lines file"""
+        self.print_header()
+        self.bounce_text(f"{Fore.WHITE}{Back.BLUE}  {self.get_icon('folder')} IMPORT / EXPORT WEBSITES  {Style.RESET_ALL}", Fore.WHITE)
+        print(f"\n{Fore.YELLOW}Formats by file extension: .txt (one URL per line), .csv, .jsonl, .json")
+        print(f"{Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} Import from file   {Back.BLUE}{Fore.WHITE} 2 {Style.RESET_ALL} Export to file   {Back.RED}{Fore.WHITE} 3 {Style.RESET_ALL} Return to menu")
+        
+        choice = input(f"\n{Fore.CYAN}Select option (1-3): ").strip()
+        if choice == '1':
+            path = input(f"{Fore.YELLOW}File to import: ").strip()
+            if not path:
+                return
+            try:
+                start_time = time.time()
+                with self.open_site_file(path, 'r') as f:
+                    added, duplicates, invalid = self.import_websites(f, site_file_format(path))
+                self.play_pop_sound("online")
+                self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ IMPORTED {Style.RESET_ALL} {added} added, {duplicates} already monitored, {invalid} invalid ({time.time() - start_time:.1f}s)", Fore.GREEN)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                self.log_error("IMPORT_ERROR", str(e))
+                print(f"{Fore.RED}❌ Import failed, no websites were added: {e}")
+        elif choice == '2':
+            path = input(f"{Fore.YELLOW}Export to file (e.g. websites.csv): ").strip()
+            if not path:
+                return
+            try:
+                with self.open_site_file(path, 'w') as f:
+                    count = self.export_websites(f, site_file_format(path))
+                self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ EXPORTED {Style.RESET_ALL} {count} websites to {os.path.abspath(path)}", Fore.GREEN)
+            except OSError as e:
+                self.log_error("EXPORT_ERROR", str(e))
+                print(f"{Fore.RED}❌ Export failed: {e}")
+        else:
+            return
+        input(f"\n{Fore.CYAN}Press Enter to continue...")
+    
+    def run_stats_command(self, as_json=False, window='24h'):
+        """Print statistics from the on-disk history for scripts or the terminal"""
+        self.statistics_since = time.time()
+        self.load_statistics()
+        if as_json:
+            print(json.dumps(self.statistics_report(), indent=2))
+            return 0
+        print(f"{'Website':<40} {'Checks':>7} {'Uptime':>8} {'Mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}  ({window})")
+        for website in self.websites:
+            summary = self.statistics.summary(website, window)
+            if summary is None:
+                print(f"{website[:40]:<40} {'-':>7}")
+                continue
+            latencies = "".join(
+                f" {summary[key]:>6.0f}ms" if summary[key] is not None else f" {'-':>8}"
+                for key in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')
+            )
+            print(f"{website[:40]:<40} {summary['checks']:>7} {summary['uptime']:>7.2f}%{latencies}")
+        return 0
+    
+    def get_site_option(self, url, key, default=None):
+        """Read a per-site setting from websites.json, falling back to default"""
+        return self.websites.get(url, {}).get(key, default)
+    
+    def get_probe_mode(self, url):
+        """Probe mode for url: its "probe" setting, else PROBE_MODE from .env"""
+        mode = str(self.get_site_option(url, 'probe', self.probe_mode)).lower()
+        return mode if mode in self.PROBE_MODES else 'get'
+    
+    def is_up_status(self, status_code, probe_mode, expected=None):
+        """Decide whether a status code means the website is up
+        
+        expected is the site's "expected_status" setting: a code or a list of codes.
+        """
+        if expected is not None:
+            return status_code in (expected if isinstance(expected, list) else [expected])
+        if probe_mode == 'range' and status_code == 206:
+            return True
+        return status_code == 200
+    
+    def retry_delay(self, attempt, deadline):
+        """Jittered exponential backoff before retry number attempt + 1, or None if retries or time ran out"""
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, self.retry_backoff * 2 ** attempt)
+        if time.time() + delay + self.RETRY_MIN_ATTEMPT_SECONDS > deadline:
+            return None
+        return delay
+    
+    def get_hedge_delay(self, url):
+        """Seconds after which a check of url gets a hedged second request: its 24h p95 latency, or None"""
+        if not self.hedge_requests:
+            return None
+        now = time.time()
+        cached = self.hedge_delays.get(url)
+        if cached is None or cached[0] < now:
+            # Merging the percentile sketches is not free, so refresh once a minute
+            summary = self.statistics.summary(url, '24h', now)
+            delay = None
+            if summary and summary['checks'] >= self.HEDGE_MIN_CHECKS and summary['p95_ms']:
+                delay = summary['p95_ms'] / 1000
+                if delay >= self.timeout:
+                    delay = None
+            cached = self.hedge_delays[url] = (now + 60, delay)
+        return cached[1]
+    
+    def is_transient_error(self, error, timings):
+        """Whether a failed request may succeed if retried: not a DNS, certificate or invalid URL error"""
+        if 'dns_error' in timings:
+            return False
+        if isinstance(error, requests.exceptions.RequestException):
+            return (isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+                    and not isinstance(error, requests.exceptions.SSLError))
+        return (isinstance(error, (asyncio.TimeoutError, OSError))
+                and not isinstance(error, (DNSResolutionError, ssl.SSLCertVerificationError)))
+    
+    def probe_with_retries(self, url, probe_mode, headers, deadline, timings):
+        """probe_website, retrying connection errors and 502/503/504 with backoff until the deadline"""
+        hedge_delay = self.get_hedge_delay(url)
+        for attempt in itertools.count():
+            timeout = max(0.1, deadline - time.time())
+            try:
+                if hedge_delay:
+                    status_code = self.probe_hedged(url, probe_mode, headers, timeout, hedge_delay, timings)
+                else:
+                    status_code = self.probe_website(url, probe_mode, headers, timeout)
+            except requests.exceptions.RequestException as e:
+                delay = self.retry_delay(attempt, deadline) if self.is_transient_error(e, timings) else None
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_delay(attempt, deadline) if status_code in self.RETRY_STATUS_CODES else None
+                if delay is None:
+                    return status_code
+            time.sleep(delay)
+    
+    def probe_hedged(self, url, probe_mode, headers, timeout, hedge_delay, timings):
+        """probe_website with a second request started after hedge_delay seconds; the first answer wins
+        
+        The slower request can't be interrupted, so it finishes on the hedge pool in the background.
+        """
+        if self.hedge_executor is None:
+            self.hedge_executor = ThreadPoolExecutor(max_workers=2 * max(1, self.max_concurrency),
+                                                     thread_name_prefix='hedge')
+        
+        def attempt(attempt_timings, attempt_timeout):
+            check_timings.value = attempt_timings
+            try:
+                return self.probe_website(url, probe_mode, headers, attempt_timeout)
+            finally:
+                check_timings.value = None
+        
+        deadline = time.time() + timeout
+        attempts = {}
+        first_timings = {}
+        attempts[self.hedge_executor.submit(attempt, first_timings, timeout)] = first_timings
+        done, pending = wait_futures(attempts, timeout=hedge_delay)
+        if not done:
+            hedge_timings = {}
+            attempts[self.hedge_executor.submit(attempt, hedge_timings, max(0.1, deadline - time.time()))] = hedge_timings
+        error = None
+        pending = set(attempts)
+        while pending:
+            done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    timings.update(attempts[future])
+                    return future.result()
+                error = error or future.exception()
+        timings.update(first_timings)
+        raise error
+    
+    def probe_website(self, url, probe_mode, headers, timeout=None):
+        """Send the request for probe_mode and return the HTTP status code"""
+        session = self.session_pool.get_session(url)
+        timeout = self.timeout if timeout is None else timeout
+        
+        if probe_mode == 'head':
+            deadline = time.time() + timeout
+            response = session.head(url, timeout=timeout, headers=headers, allow_redirects=True)
+            if response.status_code not in self.HEAD_FALLBACK_CODES:
+                return response.status_code
+            # Server rejected HEAD - retry with a GET that stops after the headers, within the same timeout
+            probe_mode = 'headers'
+            timeout = max(0.1, deadline - time.time())
+        
+        if probe_mode == 'headers':
+            with session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+                return response.status_code
+        
+        if probe_mode == 'range':
+            ranged_headers = dict(headers, Range=f"bytes=0-{self.probe_max_bytes - 1}")
+            with session.get(url, timeout=timeout, headers=ranged_headers, stream=True) as response:
+                # Servers that ignore Range send the full body, so stop reading at the cap
+                received = 0
+                for chunk in response.iter_content(chunk_size=min(8192, self.probe_max_bytes)):
+                    received += len(chunk)
+                    if received >= self.probe_max_bytes:
+                        break
+                return response.status_code
+        
+        # Pooled per-host session: repeat checks reuse the TCP/TLS connection
+        return session.get(url, timeout=timeout, headers=headers).status_code
+    
+    def check_website(self, url):
+        """Check if a single website is up or down"""
+        start_time = time.time()
+        # The DNS cache layer reports lookup time (or failure) for this thread's check here
+        timings = check_timings.value = {}
+        try:
+            headers = {
+                'User-Agent': os.getenv('USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+            }
+            probe_mode = self.get_probe_mode(url)
+            status_code = self.probe_with_retries(url, probe_mode, headers, start_time + self.timeout, timings)
+            response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+            if 'headers_at' in timings:
+                timings['transfer_ms'] = (time.perf_counter() - timings.pop('headers_at')) * 1000
+            
+            if self.is_up_status(status_code, probe_mode, self.get_site_option(url, 'expected_status')):
+                self.record_check_result(url, True, status_code, response_time, self.check_phases(timings))
+                return True, status_code
+            else:
+                self.record_check_result(url, False, status_code, response_time, self.check_phases(timings))
+                return False, status_code
+        except requests.exceptions.RequestException as e:
+            response_time = (time.time() - start_time) * 1000
+            if 'dns_error' in timings:
+                # Name resolution failed: the site itself may be fine, so say so
+                error_msg = f"DNS ERROR: {timings['dns_error']}"[:50]
+            else:
+                error_msg = str(e)[:50]
+            self.record_check_result(url, False, error_msg, response_time, self.check_phases(timings))
+            return False, error_msg
+        except Exception as e:
+            response_time = (time.time() - start_time) * 1000
+            error_msg = f"Error: {str(e)[:40]}"
+            self.record_check_result(url, False, error_msg, response_time)
+            return False, error_msg
+        finally:
+            check_timings.value = None
+    
+    async def probe_website_async(self, url, probe_mode, timeout, timings):
+        """Asyncio counterpart of probe_website"""
+        # The async probe never reads past the headers, so get/headers/range differ only in the request
+        if probe_mode == 'head':
+            deadline = time.time() + timeout
+            status_code = await self.async_probe.fetch_status(url, timeout, method='HEAD', timings=timings)
+            if status_code not in self.HEAD_FALLBACK_CODES:
+                return status_code
+            # The GET fallback gets what is left of the timeout, not a fresh one
+            return await self.async_probe.fetch_status(url, max(0.1, deadline - time.time()), timings=timings)
+        if probe_mode == 'range':
+            ranged = {'Range': f"bytes=0-{self.probe_max_bytes - 1}"}
+            return await self.async_probe.fetch_status(url, timeout, extra_headers=ranged, timings=timings)
+        return await self.async_probe.fetch_status(url, timeout, timings=timings)
+    
+    async def probe_hedged_async(self, url, probe_mode, timeout, hedge_delay, timings):
+        """Asyncio counterpart of probe_hedged; the slower request is cancelled"""
+        loop = asyncio.get_event_loop()
+        deadline = time.time() + timeout
+        attempts = {}
+        
+        def start(attempt_timeout):
+            attempt_timings = {}
+            task = loop.create_task(self.probe_website_async(url, probe_mode, attempt_timeout, attempt_timings))
+            attempts[task] = attempt_timings
+        
+        start(timeout)
+        done, _ = await asyncio.wait(list(attempts), timeout=hedge_delay)
+        if not done:
+            start(max(0.1, deadline - time.time()))
+        error = None
+        pending = set(attempts)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        timings.update(attempts[task])
+                        return task.result()
+                    error = error or task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        timings.update(next(iter(attempts.values())))
+        raise error
+    
+    async def check_website_async(self, url):
+        """Asyncio counterpart of check_website with the same (is_up, status) contract"""
+        if self.async_probe is None:
+            self.async_probe = AsyncHTTPProbe(
+                os.getenv('USER_AGENT', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'),
+                dns_cache=self.dns_cache, phase_timings=self.phase_timings
+            )
+        start_time = time.time()
+        deadline = start_time + self.timeout
+        timings = {}
+        try:
+            probe_mode = self.get_probe_mode(url)
+            hedge_delay = self.get_hedge_delay(url)
+            for attempt in itertools.count():
+                timeout = max(0.1, deadline - time.time())
+                try:
+                    if hedge_delay:
+                        status_code = await self.probe_hedged_async(url, probe_mode, timeout, hedge_delay, timings)
+                    else:
+                        status_code = await self.probe_website_async(url, probe_mode, timeout, timings)
+                except (asyncio.TimeoutError, OSError) as e:
+                    delay = self.retry_delay(attempt, deadline) if self.is_transient_error(e, timings) else None
+                    if delay is None:
+                        raise
+                else:
+                    delay = self.retry_delay(attempt, deadline) if status_code in self.RETRY_STATUS_CODES else None
+                    if delay is None:
+                        break
+                await asyncio.sleep(delay)
+            response_time = (time.time() - start_time) * 1000
+            is_up = self.is_up_status(status_code, probe_mode, self.get_site_option(url, 'expected_status'))
+            self.record_check_result(url, is_up, status_code, response_time, self.check_phases(timings))
+            return is_up, status_code
+        except asyncio.TimeoutError:
+            response_time = (time.time() - start_time) * 1000
+            error_msg = f"Timed out after {self.timeout}s"
+            self.record_check_result(url, False, error_msg, response_time, self.check_phases(timings))
+            return False, error_msg
+        except DNSResolutionError as e:
+            response_time = (time.time() - start_time) * 1000
+            error_msg = f"DNS ERROR: {e}"[:50]
+            self.record_check_result(url, False, error_msg, response_time)
+            return False, error_msg
+        except (OSError, ssl.SSLError, ValueError) as e:
+            response_time = (time.time() - start_time) * 1000
+            error_msg = str(e)[:50] or type(e).__name__
+            self.record_check_result(url, False, error_msg, response_time)
+            return False, error_msg
+    
+    def get_check_engine(self):
+        """Return the shared check engine, rebuilding it if the backend or MAX_CONCURRENCY changed"""
+        if isinstance(self.check_engine, RemoteCheckEngine):
+            return self.check_engine  # A coordinator's workers bring their own backend and concurrency
+        engine_type = AsyncCheckEngine if self.probe_backend == 'asyncio' else CheckEngine
+        if (self.check_engine is None or type(self.check_engine) is not engine_type
+                or self.check_engine.max_workers != max(1, self.max_concurrency)):
+            if self.check_engine is not None:
+                self.check_engine.shutdown()
+            if engine_type is AsyncCheckEngine:
+                self.check_engine = AsyncCheckEngine(self.check_website_async, self.max_concurrency)
+            else:
+                self.check_engine = CheckEngine(self.check_website, self.max_concurrency)
+        return self.check_engine
+    
+    def check_all_websites(self):
+        """Check all websites once with animated dashboard-style results and icons"""
+        self.print_header()
+        self.bounce_text(f"{Fore.WHITE}{Back.MAGENTA}  {self.get_icon('check')} WEBSITE STATUS CHECK {self.get_icon('monitor')}  {Style.RESET_ALL}", Fore.WHITE)
+        
+        if not self.websites:
+            self.bounce_text(f"{Back.RED}{Fore.WHITE} {self.get_icon('error')} NO WEBSITES {Style.RESET_ALL} No websites to check!", Fore.RED)
+            input(f"\n{Fore.CYAN}Press Enter to continue...")
+            return
+        
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"\n{Back.LIGHTBLACK_EX}{Fore.WHITE} {self.get_icon('clock')} Scan Time: {timestamp} {Style.RESET_ALL}")
+        
+        print(f"\n{Fore.CYAN}┌─ Live Status Report ──────────────────────────────────────┐")
+        
+        start_time = time.time()
+        online_count = 0
+        
+        # Rows are printed as checks finish, so one slow host no longer holds up the rest
+        for website, is_up, status in self.run_checks(self.websites):
+            if is_up:
+                online_count += 1
+                status_display = f"{Back.GREEN}{Fore.WHITE} {self.get_icon('online')} ONLINE {Style.RESET_ALL}"
+                self.play_pop_sound("online")
+            else:
+                status_display = f"{Back.RED}{Fore.WHITE} {self.get_icon('offline')} OFFLINE {Style.RESET_ALL}"
+                self.play_pop_sound("offline")
+            
+            print(f"{Fore.CYAN}│ {status_display} {website[:40]:<40} {Fore.YELLOW}({status}) {Fore.CYAN}│")
+        
+        print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
+        elapsed = time.time() - start_time
+        print(f"\n{Fore.GREEN}{online_count} online{Fore.CYAN} / {Fore.RED}{len(self.websites) - online_count} offline{Fore.CYAN} - checked in {elapsed:.2f}s ({self.get_check_engine().max_workers} parallel)")
+        input(f"\n{Fore.CYAN}Press Enter to continue...")
+    
+    def get_site_interval(self, url, default_interval):
+        """Check interval for url: its "interval" setting, else default_interval"""
+        try:
+            return max(1.0, float(self.get_site_option(url, 'interval', default_interval)))
+        except (TypeError, ValueError):
+            return float(default_interval)
+    
+    def prewarm_dns(self):
+        """Resolve every monitored host up front (DNS_PREWARM); returns the number that failed"""
+        if self.dns_cache is None or not self.dns_prewarm:
+            return 0
+        hosts = [urlsplit(url).hostname for url in self.websites]
+        failed = self.dns_cache.prewarm([host for host in hosts if host], self.max_concurrency)
+        if failed:
+            self.log_system_event("DNS_PREWARM", f"{failed} hosts could not be resolved")
+        return failed
+    
+    def build_rate_limiter(self):
+        """RateLimiter from RATE_LIMIT_GLOBAL, RATE_LIMIT_PER_HOST, HOST_MAX_CONCURRENCY and per-site settings"""
+        limiter = RateLimiter(
+            float(os.getenv('RATE_LIMIT_GLOBAL', '0')),
+            float(os.getenv('RATE_LIMIT_PER_HOST', '0')),
+            int(os.getenv('HOST_MAX_CONCURRENCY', '0'))
+        )
+        for url, options in self.websites.items():
+            if 'rate_limit' in options or 'max_concurrency' in options:
+                limiter.set_host_limits(
+                    urlsplit(url).hostname or url,
+                    float(options.get('rate_limit') or 0),
+                    int(options.get('max_concurrency') or 0)
+                )
+        return limiter
+    
+    def run_checks(self, urls):
+        """Check every URL once within the rate limits and yield (url, is_up, status) as they finish"""
+        engine = self.get_check_engine()
+        dispatcher = ThrottledDispatcher(engine, self.build_rate_limiter())
+        dispatcher.offer(urls)
+        while dispatcher.pending:
+            result = engine.get_result(timeout=dispatcher.seconds_until_ready())
+            if result is not None:
+                dispatcher.complete(result[0])
+                yield result
+            dispatcher.poll()
+    
+    @staticmethod
+    def env_file_path():
+        """Absolute path of the .env file load_dotenv() reads, or ./.env if there is none yet"""
+        return os.path.abspath(find_dotenv() or '.env')
+    
+    def build_config_watcher(self):
+        """ConfigWatcher over .env and the site store for a running monitor, or None if CONFIG_WATCH is off"""
+        if os.getenv('CONFIG_WATCH', 'true').lower() != 'true':
+            return None
+        return ConfigWatcher([self.env_file_path()] + self.websites.watch_paths(),
+                             poll_interval=float(os.getenv('CONFIG_WATCH_INTERVAL', '1.0')))
+    
+    def reload_config(self, changed, default_interval):
+        """Re-read .env and the site list if they are in changed
+        
+        Returns (default_interval, env_changed, added, removed, updated), with
+        the added, removed and updated website URLs. Removed websites are
+        dropped from the history, statistics and metrics.
+        """
+        added, removed, updated = [], [], []
+        env_changed = self.env_file_path() in changed
+        if env_changed:
+            previous_interval = self.monitor_interval
+            self.reload_env_settings()
+            # An interval given on the command line or in the menu wins over .env
+            if self.monitor_interval != previous_interval and default_interval == previous_interval:
+                default_interval = self.monitor_interval
+            self.log_system_event("CONFIG_RELOADED", f".env reloaded (timeout {self.timeout}s, interval {default_interval}s)")
+        if set(changed) & {os.path.abspath(path) for path in self.websites.watch_paths()}:
+            try:
+                added, removed, updated = self.websites.reload()
+            except (ValueError, sqlite3.Error) as e:
+                self.log_error("CONFIG_RELOAD_ERROR", f"Site list not reloaded: {e}")
+            if added or removed or updated:
+                self.log_system_event("SITES_RELOADED", f"{len(added)} added, {len(removed)} removed, {len(updated)} changed")
+        for url in removed:
+            self.history.remove(url)
+            self.statistics.remove(url)
+            self.metrics.remove(url)
+        return default_interval, env_changed, added, removed, updated
+    
+    def apply_config_changes(self, changed, scheduler, dispatcher, default_interval):
+        """Apply an edited .env or site list to a running monitor between two loop iterations
+        
+        Only added and removed websites, and those whose interval changed, are
+        (re)scheduled; checks already running finish normally. Backend and
+        concurrency changes need a monitor restart. Returns
+        (default_interval, added, removed).
+        """
+        previous_interval = default_interval
+        default_interval, env_changed, added, removed, updated = self.reload_config(changed, default_interval)
+        if default_interval != previous_interval:
+            updated += [url for url in self.websites if 'interval' not in self.websites.get(url, {})]
+        
+        now = time.time()
+        for url in removed:
+            scheduler.remove(url)
+        for url in added + updated:
+            if url in self.websites and (url not in scheduler or scheduler.intervals[url] != self.get_site_interval(url, default_interval)):
+                scheduler.add(url, self.get_site_interval(url, default_interval), now)
+        if added or removed:
+            self.session_pool.configure(self.websites)
+        if env_changed or added or removed or updated:
+            dispatcher.set_limiter(self.build_rate_limiter())
+        return default_interval, added, removed
+    
+    def build_scheduler(self, default_interval):
+        """Create a scheduler holding every monitored website"""
+        scheduler = SiteScheduler(self.schedule_jitter)
+        now = time.time()
+        for url in self.websites:
+            scheduler.add(url, self.get_site_interval(url, default_interval), now)
+        return scheduler
+    
+    def start_metrics_server(self):
+        """Serve self.metrics at /metrics on METRICS_ADDRESS:METRICS_PORT from a background thread
+        
+        Returns the server, or None when METRICS_ENABLED is off or the port is taken.
+        """
+        if os.getenv('METRICS_ENABLED', 'false').lower() != 'true':
+            return None
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self.metrics
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.end_headers()
+                try:
+                    for chunk in metrics.render():
+                        self.wfile.write(chunk.encode('utf-8'))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            
+            def log_message(self, format, *args):
+                pass  # Scrapes would flood the terminal
+        
+        address = os.getenv('METRICS_ADDRESS', '127.0.0.1')
+        port = int(os.getenv('METRICS_PORT', '9464'))
+        try:
+            server = ThreadingHTTPServer((address, port), MetricsHandler)
+        except OSError as e:
+            self.log_error("METRICS_ERROR", f"Metrics endpoint not started on {address}:{port}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        self.log_system_event("METRICS_STARTED", f"Serving metrics at http://{address}:{port}/metrics")
+        return server
+    
+    def run_monitor_loop(self, scheduler, on_result, on_tick=None, tick=1.0, default_interval=None, on_reload=None):
+        """Dispatch checks as they fall due and pass each result to on_result
+        
+        Sleeps until the next check is due, a rate-limited check may start or a
+        result arrives, so there is no busy-waiting and no per-cycle drift.
+        on_tick is called at least every tick seconds. Edits to .env and the
+        site list are applied between iterations and reported to
+        on_reload(added, removed). Runs until interrupted.
+        """
+        engine = self.get_check_engine()
+        dispatcher = ThrottledDispatcher(engine, self.build_rate_limiter())
+        watcher = self.build_config_watcher()
+        self.metrics_server = self.start_metrics_server()
+        default_interval = default_interval or self.monitor_interval
+        next_tick = time.time() + tick
+        maintenance_day = None
+        try:
+            while True:
+                now = time.time()
+                changed = watcher.changed(now) if watcher is not None else None
+                if changed:
+                    default_interval, added, removed = self.apply_config_changes(changed, scheduler, dispatcher, default_interval)
+                    if on_reload and (added or removed):
+                        on_reload(added, removed)
+                if self.history_archive is not None and HistoryArchive.day_name(now) != maintenance_day:
+                    # Compact yesterday's segments and apply retention once per UTC day
+                    maintenance_day = HistoryArchive.day_name(now)
+                    self.history_archive.run_maintenance()
+                # Previous check of a site still running or waiting on a rate limit - skip this slot rather than pile up
+                due = scheduler.pop_due(now)
+                offered = [(url, lag) for url, lag in due if url not in dispatcher.pending]
+                dispatcher.offer([url for url, _ in offered], now)
+                dispatcher.poll(now)
+                if self.metrics_server is not None:
+                    self.metrics.record_loop([lag for _, lag in offered], len(due) - len(offered), len(scheduler),
+                                             len(dispatcher.pending) - len(dispatcher.in_flight), len(dispatcher.in_flight))
+                
+                if on_tick and now >= next_tick:
+                    on_tick()
+                    next_tick = now + tick
+                
+                wait = min(value for value in (scheduler.seconds_until_next(), dispatcher.seconds_until_ready(), tick)
+                           if value is not None)
+                if on_tick:
+                    wait = min(wait, max(0.0, next_tick - time.time()))
+                if watcher is not None:
+                    # Wake up often enough to pick up edits to .env and the site list
+                    wait = min(wait, watcher.settle)
+                result = engine.get_result(timeout=wait)
+                if result is not None:
+                    dispatcher.complete(result[0])
+                    if result[0] in scheduler:  # Results of websites removed meanwhile are dropped
+                        on_result(*result)
+        finally:
+            if watcher is not None:
+                watcher.close()
+            if self.metrics_server is not None:
+                self.metrics_server.shutdown()
+                self.metrics_server.server_close()
+                self.metrics_server = None
+    
+    def start_monitoring(self, interval, on_result, on_tick=None, tick=1.0, on_reload=None):
+        """Monitor every website in this process, or across MONITOR_SHARDS worker processes, until interrupted"""
+        if self.monitor_shards > 1:
+            self.run_sharded_monitor(interval, on_result, on_tick, tick, on_reload)
+            return
+        self.session_pool.configure(self.websites)
+        self.prewarm_dns()
+        self.run_monitor_loop(self.build_scheduler(interval), on_result, on_tick, tick=tick,
+                              default_interval=interval, on_reload=on_reload)
+    
+    def apply_shard_config_changes(self, changed, supervisor, default_interval):
+        """Sharded counterpart of apply_config_changes: only the shards owning changed websites hear of them
+        
+        Workers re-read .env themselves when told to. A new MONITOR_SHARDS or
+        SHARD_KEY starts or stops workers and moves only the websites whose
+        shard changed. Returns (default_interval, added, removed).
+        """
+        default_interval, env_changed, added, removed, updated = self.reload_config(changed, default_interval)
+        supervisor.default_interval = default_interval
+        if env_changed:
+            if self.monitor_shards != len(supervisor.workers) or self.shard_key != supervisor.key:
+                supervisor.key = self.shard_key
+                moved = supervisor.resize(self.monitor_shards)
+                self.log_system_event("SHARDS_CHANGED", f"{len(supervisor.workers)} shards by {supervisor.key}, {moved} websites moved")
+            supervisor.notify_env()
+        supervisor.update(assign=added + updated, unassign=removed)
+        return default_interval, added, removed
+    
+    def run_sharded_monitor(self, default_interval, on_result, on_tick=None, tick=1.0, on_reload=None):
+        """Monitor with the websites split across MONITOR_SHARDS worker processes
+        
+        Each worker runs run_monitor_loop over its share of the websites, so
+        TLS handshakes and response parsing use every core. This process
+        records their results in the one log, history and dashboard, applies
+        edits to .env and the site list, and restarts workers that die. The
+        callbacks are those of run_monitor_loop.
+        """
+        supervisor = ShardSupervisor(self.websites, default_interval, self.shard_key)
+        watcher = self.build_config_watcher()
+        self.metrics_server = self.start_metrics_server()
+        next_tick = time.time() + tick
+        maintenance_day = None
+        try:
+            supervisor.start(self.monitor_shards)
+            while True:
+                now = time.time()
+                changed = watcher.changed(now) if watcher is not None else None
+                if changed:
+                    default_interval, added, removed = self.apply_shard_config_changes(changed, supervisor, default_interval)
+                    if on_reload and (added or removed):
+                        on_reload(added, removed)
+                if self.history_archive is not None and HistoryArchive.day_name(now) != maintenance_day:
+                    maintenance_day = HistoryArchive.day_name(now)
+                    self.history_archive.run_maintenance()
+                
+                if on_tick and now >= next_tick:
+                    on_tick()
+                    next_tick = now + tick
+                
+                wait = max(0.0, next_tick - time.time()) if on_tick else tick
+                if watcher is not None:
+                    wait = min(wait, watcher.settle)
+                entries, dead = supervisor.receive(wait)
+                for entry in entries:
+                    if entry[0] == 'log':
+                        self.logger.log(entry[1], entry[2])
+                        continue
+                    _, url, is_up, status, response_time, phases, timestamp = entry
+                    if url in supervisor.assigned:  # Results of websites removed meanwhile are dropped
+                        self.record_check_result(url, is_up, status, response_time, phases, timestamp)
+                        on_result(url, is_up, status)
+                for shard in dead:
+                    exitcode, restarted = supervisor.restart(shard)
+                    if restarted:
+                        self.log_error("SHARD_RESTARTED", f"Shard {shard} worker exited with code {exitcode} and was restarted")
+                    else:
+                        self.log_error("SHARD_FAILED", f"Shard {shard} worker keeps exiting (code {exitcode}); "
+                                                       f"its websites moved to the other {len(supervisor.workers)} shards")
+        finally:
+            supervisor.stop()
+            if watcher is not None:
+                watcher.close()
+            if self.metrics_server is not None:
+                self.metrics_server.shutdown()
+                self.metrics_server.server_close()
+                self.metrics_server = None
+    
+    def run_history_report(self, website, days, compact=False):
+        """Print uptime and latency of website over the last days from the on-disk history"""
+        if self.history_archive is None:
+            print("On-disk history is disabled (HISTORY_ENABLED=false)", file=sys.stderr)
+            return 2
+        if compact:
+            compacted, deleted = self.history_archive.compact()
+            print(f"Compacted {compacted} segments, removed {deleted} expired days")
+            if not website:
+                return 0
+        if not website:
+            print("No website given", file=sys.stderr)
+            return 2
+        
+        end = time.time()
+        start_query = time.perf_counter()
+        records = self.history_archive.query(website, end - days * 86400, end)
+        elapsed = (time.perf_counter() - start_query) * 1000
+        if not records:
+            print(f"No history for {website} in the last {days} days")
+            return 1
+        
+        up_count = sum(1 for record in records if record[3])
+        latencies = [record[1] for record in records if record[3]]
+        print(f"{website} - last {days} days")
+        print(f"  Checks:      {len(records)}")
+        print(f"  Uptime:      {up_count / len(records) * 100:.2f}%")
+        if latencies:
+            print(f"  Avg latency: {sum(latencies) / len(latencies):.1f}ms")
+        print(f"  First check: {datetime.fromtimestamp(records[0][0]).strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"  Last check:  {datetime.fromtimestamp(records[-1][0]).strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"  (query took {elapsed:.1f}ms)")
+        return 0
+    
+    def format_history_summary(self, website):
+        """Latency of the last check and session uptime, read from the in-memory history"""
+        history = self.history.get(website)
+        if history is None or not len(history):
+            return ""
+        _, latency, _, _ = history.latest()
+        return f"{Fore.CYAN}{latency:.0f}ms {Fore.WHITE}{history.uptime():.1f}% up"
+    
+    def format_phase_detail(self, website):
+        """Phase timings of the last check of website, for the expanded dashboard row"""
+        history = self.history.get(website)
+        if history is None or history.phases is None:
+            return f"{Fore.BLUE}      └ no phase timings yet"
+        parts = [f"{phase} {value:.1f}ms" if value is not None else f"{phase} -"
+                 for phase, value in zip(CHECK_PHASES, history.phases)]
+        return f"{Fore.BLUE}      └ {Fore.WHITE}{' · '.join(parts)}"
+    
+    def build_monitor_frame(self, latest, default_interval, checks_done, rows, details=False):
+        """Dashboard lines for a screen of rows lines; long lists are split into rotating pages
+        
+        With details, each website gets a second line with the phase timings of its last check.
+        """
+        up_count = sum(1 for is_up, _ in latest.values() if is_up)
+        down_count = len(latest) - up_count
+        header = [
+            f"{Fore.WHITE}{Back.MAGENTA}  🚀 LIVE MONITORING ACTIVE  {Style.RESET_ALL}",
+            "",
+            f"{Back.BLUE}{Fore.WHITE} Interval: {default_interval}s | Websites: {len(self.websites)} | Checks: {checks_done}"
+            + (f" | Shards: {self.monitor_shards}" if self.monitor_shards > 1 else "")
+            + f" | D: {'hide' if details else 'show'} timings | Ctrl+C to stop {Style.RESET_ALL}",
+            f"{Fore.GREEN}Online: {up_count}  {Fore.RED}Offline: {down_count}  {Fore.BLUE}Pending: {len(self.websites) - len(latest)}",
+            f"{Back.CYAN}{Fore.BLACK} ⟲ Live Update - {datetime.now().strftime('%H:%M:%S')} {Style.RESET_ALL}",
+            "═" * 60,
+        ]
+        
+        per_page = max(1, (rows - len(header) - 2) // (2 if details else 1))
+        pages = max(1, -(-len(self.websites) // per_page))
+        page = int(time.time() // self.MONITOR_PAGE_SECONDS) % pages
+        
+        body = []
+        for website in self.websites[page * per_page:(page + 1) * per_page]:
+            if website not in latest:
+                body.append(f"{Back.BLUE}{Fore.WHITE} ● {Style.RESET_ALL} {website[:35]:<35} {Fore.BLUE}PENDING")
+                if details:
+                    body.append("")
+                continue
+            is_up, status = latest[website]
+            if is_up:
+                status_indicator = f"{Back.GREEN}{Fore.WHITE} ● {Style.RESET_ALL}"
+                status_text = f"{Fore.GREEN}ONLINE"
+            else:
+                status_indicator = f"{Back.RED}{Fore.WHITE} ● {Style.RESET_ALL}"
+                status_text = f"{Fore.RED}OFFLINE"
+            body.append(f"{status_indicator} {website[:35]:<35} {status_text} {Fore.YELLOW}({status}) {self.format_history_summary(website)}")
+            if details:
+                body.append(self.format_phase_detail(website))
+        
+        footer = ["═" * 60]
+        if pages > 1:
+            footer.append(f"{Fore.CYAN}Page {page + 1}/{pages} - next page in {self.MONITOR_PAGE_SECONDS - int(time.time()) % self.MONITOR_PAGE_SECONDS}s")
+        return header + body + footer
+    
+    def render_monitor_dashboard(self, latest, default_interval, checks_done, details=False):
+        """Redraw the live monitoring dashboard, rewriting only rows that changed"""
+        rows = self.screen.terminal_size().lines
+        self.screen.render(self.build_monitor_frame(latest, default_interval, checks_done, rows, details))
+    
+    def monitor_websites(self):
+        """Start continuous monitoring with animated real-time dashboard"""
+        if not self.websites:
+            self.print_header()
+            self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ NO WEBSITES {Style.RESET_ALL} No websites configured!", Fore.RED)
+            input(f"\n{Fore.CYAN}Press Enter to continue...")
+            return
+        
+        interval = input(f"{Fore.YELLOW}Monitor interval (seconds, default {self.monitor_interval}): ").strip()
+        try:
+            interval = int(interval) if interval else self.monitor_interval
+        except ValueError:
+            interval = self.monitor_interval
+        
+        self.loading_animation("Starting monitoring system", 1.5)
+        shards = f" across {self.monitor_shards} shards" if self.monitor_shards > 1 else ""
+        self.log_system_event("MONITORING_STARTED", f"Started monitoring {len(self.websites)} websites with {interval}s interval{shards}")
+        
+        latest = {}
+        state = {'checks': 0, 'last_evict': time.time(), 'details': False}
+        
+        def on_result(website, is_up, status):
+            previous = latest.get(website)
+            latest[website] = (is_up, status)
+            state['checks'] += 1
+            # Only sound off when a website changes state, not on every check
+            if previous is None or previous[0] != is_up:
+                self.play_pop_sound("online" if is_up else "offline")
+        
+        def on_tick():
+            if self.screen.read_key() == 'd':
+                state['details'] = not state['details']
+            # Redrawn every tick for the clock and page rotation; unchanged rows cost nothing
+            self.render_monitor_dashboard(latest, interval, state['checks'], state['details'])
+            if time.time() - state['last_evict'] >= interval:
+                self.session_pool.evict_idle()
+                state['last_evict'] = time.time()
+        
+        def on_reload(added, removed):
+            for website in removed:
+                latest.pop(website, None)
+        
+        self.screen = ScreenRenderer()
+        self.screen.start()
+        try:
+            try:
+                self.start_monitoring(interval, on_result, on_tick, on_reload=on_reload)
+            finally:
+                # Whatever ends monitoring, give the terminal its echo, line mode and cursor back
+                self.screen.stop()
+        except KeyboardInterrupt:
+            # Drop the engine so results of interrupted checks can't leak into the next run
+            if self.check_engine is not None:
+                self.check_engine.shutdown()
+                self.check_engine = None
+            self.loading_animation("Stopping monitoring", 0.8)
+            self.log_system_event("MONITORING_STOPPED", f"Monitoring stopped after {state['checks']} checks")
+            self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} 🛑 MONITORING STOPPED {Style.RESET_ALL}", Fore.YELLOW)
+            input(f"\n{Fore.CYAN}Press Enter to continue...")
+    
+    def settings(self):
+        """Configure app settings with animated form-style interface"""
+        self.print_header()
+        self.bounce_text(f"{Fore.WHITE}{Back.YELLOW}  ⚙️  CONFIGURATION PANEL  {Style.RESET_ALL}", Fore.WHITE)
+        
+        self.loading_animation("Loading settings", 0.5)
+        
+        settings_content = f"""{Fore.CYAN}┌─ Current Settings ────────────────────────────────────────┐
+│                                                           │
+│ Timeout Duration: {Back.BLUE}{Fore.WHITE} {self.timeout} seconds {Style.RESET_ALL}                     {Fore.CYAN}│
+│ Monitor Interval: {Back.BLUE}{Fore.WHITE} {self.monitor_interval} seconds {Style.RESET_ALL}                     {Fore.CYAN}│
+│ Animation Speed: {Back.BLUE}{Fore.WHITE} {self.animation_speed} {Style.RESET_ALL}                          {Fore.CYAN}│
+│ Sound Effects: {Back.BLUE}{Fore.WHITE} {'Enabled' if self.enable_sounds else 'Disabled'} {Style.RESET_ALL}                       {Fore.CYAN}│
+│ Auto Updates: {Back.BLUE}{Fore.WHITE} {'Enabled' if self.auto_update_check else 'Disabled'} {Style.RESET_ALL}                        {Fore.CYAN}│
+│ Log File: {self.log_file:<37}        │
+│ Debug Mode: {Back.BLUE}{Fore.WHITE} {'Enabled' if self.debug_mode else 'Disabled'} {Style.RESET_ALL}                      {Fore.CYAN}│
+│                                                           │
+│ {Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} Change Timeout   {Back.GREEN}{Fore.WHITE} 2 {Style.RESET_ALL} Toggle Sounds      {Fore.CYAN}│
+│ {Back.GREEN}{Fore.WHITE} 3 {Style.RESET_ALL} Edit .env File   {Back.GREEN}{Fore.WHITE} 4 {Style.RESET_ALL} Reload Settings    {Fore.CYAN}│
+│ {Back.CYAN}{Fore.WHITE} 5 {Style.RESET_ALL} View Log File    {Back.BLACK}{Fore.WHITE} 6 {Style.RESET_ALL} Return to Menu     {Fore.CYAN}│
+│                                                           │
+└───────────────────────────────────────────────────────────┘"""
+        
+        print(f"\n{settings_content}")
+        
+        choice = input(f"\n{Fore.YELLOW}Select option (1-6): ").strip()
+        
+        if choice == '1':
+            new_timeout = input(f"\n{Fore.YELLOW}New timeout value (current: {self.timeout}): ").strip()
+            if new_timeout:
+                try:
+                    self.loading_animation("Applying settings", 0.8)
+                    self.timeout = int(new_timeout)
+                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ SAVED {Style.RESET_ALL} Timeout updated to {self.timeout} seconds!", Fore.GREEN)
+                except ValueError:
+                    self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ ERROR {Style.RESET_ALL} Invalid timeout value!", Fore.RED)
+        
+        elif choice == '2':
+            self.enable_sounds = not self.enable_sounds
+            self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ TOGGLED {Style.RESET_ALL} Sounds {'enabled' if self.enable_sounds else 'disabled'}!", Fore.GREEN)
+        
+        elif choice == '3':
+            print(f"\n{Fore.YELLOW}📝 Edit your .env file manually and select option 4 to reload.")
+            print(f"{Fore.CYAN}Current .env location: {os.path.abspath('.env')}")
+        
+        elif choice == '4':
+            self.loading_animation("Reloading environment settings", 1.0)
+            self.reload_env_settings()
+            self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ RELOADED {Style.RESET_ALL} Settings updated from .env file!", Fore.GREEN)
+        
+        elif choice == '5':
+            self.view_log_file()
+        
+        elif choice == '6':
+            return
+        
+        if choice in ['1', '2', '3', '4', '5']:
+            input(f"\n{Fore.CYAN}Press Enter to continue...")
+            self.settings()  # Show settings menu again
+    
+    def log_line_color(self, line):
+        """Color for a log line based on its level"""
+        if "ERROR" in line:
+            return Fore.RED
+        elif "WARNING" in line:
+            return Fore.YELLOW
+        elif "INFO" in line:
+            return Fore.GREEN
+        return Fore.WHITE
+    
+    def follow_log(self, line_filter=None):
+        """Print new log lines as they are written until Ctrl+C"""
+        print(f"\n{Back.MAGENTA}{Fore.WHITE} 👀 FOLLOWING {self.log_file} {Style.RESET_ALL} Press Ctrl+C to stop")
+        try:
+            for line in LogReader(self.log_file).follow(line_filter):
+                print(f"{self.log_line_color(line)}{line}", flush=True)
+        except KeyboardInterrupt:
+            print(f"\n{Fore.YELLOW}Stopped following log")
+    
+    def run_log_command(self, lines, follow=False, line_filter=None, archives=False):
+        """Print the last lines of the log file, optionally following it
+        
+        With archives, every matching line of the rotated segments and the live
+        log is printed instead, skipping segments whose index rules them out.
+        """
+        if not os.path.exists(self.log_file):
+            print(f"Log file not found: {os.path.abspath(self.log_file)}", file=sys.stderr)
+            return 2
+        self.flush_logs()
+        if archives:
+            archive = LogArchive(self.log_file)
+            for line in archive.search(line_filter):
+                print(line)
+            print(f"({archive.skipped} archived segments skipped by their index)", file=sys.stderr)
+            return 0
+        reader = LogReader(self.log_file)
+        for line in reader.tail(lines, line_filter):
+            print(line)
+        if follow:
+            try:
+                for line in reader.follow(line_filter):
+                    print(line, flush=True)
+            except KeyboardInterrupt:
+                pass
+        return 0
+    
+    def view_log_file(self):
+        """View the contents of the log file"""
+        self.print_header()
+        self.bounce_text(f"{Fore.WHITE}{Back.CYAN}  📋 LOG FILE VIEWER  {Style.RESET_ALL}", Fore.WHITE)
+        
+        try:
+            if not os.path.exists(self.log_file):
+                self.bounce_text(f"{Back.YELLOW}{Fore.BLACK} ⚠️  NO LOG FILE {Style.RESET_ALL} Log file not found!", Fore.YELLOW)
+                print(f"{Fore.CYAN}Log file path: {os.path.abspath(self.log_file)}")
+                return
+            
+            self.loading_animation("Loading log file", 0.8)
+            self.flush_logs()
+            
+            # Get file size
+            file_size = os.path.getsize(self.log_file)
+            
+            print(f"\n{Back.LIGHTBLACK_EX}{Fore.WHITE} Log File: {self.log_file} | Size: {file_size:,} bytes {Style.RESET_ALL}")
+            
+            reader = LogReader(self.log_file)
+            lines = reader.tail(50)
+            
+            if not lines:
+                print(f"\n{Fore.YELLOW}Log file is empty.")
+                return
+            
+            print(f"\n{Fore.CYAN}┌─ Log Contents ────────────────────────────────────────────┐")
+            print(f"{Fore.CYAN}│ {'... showing last ' + str(len(lines)) + ' lines ...':<57} │")
+            print(f"{Fore.CYAN}├───────────────────────────────────────────────────────────┤")
+            
+            for line in lines:
+                # Truncate long lines
+                display_line = line
+                if len(display_line) > 55:
+                    display_line = display_line[:52] + "..."
+                
+                print(f"{Fore.CYAN}│ {self.log_line_color(line)}{display_line:<55}{Fore.CYAN} │")
+            
+            print(f"{Fore.CYAN}└───────────────────────────────────────────────────────────┘")
+            
+            print(f"\n{Fore.YELLOW}Log Options:")
+            print(f"{Back.GREEN}{Fore.WHITE} 1 {Style.RESET_ALL} Open log file in notepad")
+            print(f"{Back.MAGENTA}{Fore.WHITE} 2 {Style.RESET_ALL} Follow live (Ctrl+C to stop)")
+            print(f"{Back.CYAN}{Fore.BLACK} 3 {Style.RESET_ALL} Filter by level, site or event")
+            print(f"{Back.BLUE}{Fore.WHITE} 4 {Style.RESET_ALL} Clear log file")
+            print(f"{Back.RED}{Fore.WHITE} 5 {Style.RESET_ALL} Return to settings")
+            
+            choice = input(f"\n{Fore.CYAN}Select option (1-5): ").strip()
+            
+            if choice == '1':
+                try:
+                    subprocess.run(['notepad.exe', self.log_file])
+                    self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ OPENED {Style.RESET_ALL} Log file opened in notepad!", Fore.GREEN)
+                except Exception as e:
+                    print(f"{Fore.RED}❌ Error opening notepad: {e}")
+            
+            elif choice == '2':
+                self.follow_log()
+            
+            elif choice == '3':
+                level = input(f"{Fore.YELLOW}Minimum level (DEBUG/INFO/WARNING/ERROR, blank for any): ").strip()
+                site = input(f"{Fore.YELLOW}Website contains (blank for any): ").strip()
+                event = input(f"{Fore.YELLOW}Event type (CHECK/SYSTEM/ERROR/UPDATE or e.g. MONITORING_STARTED, blank for any): ").strip()
+                line_filter = LogFilter(level or None, site or None, event or None)
+                lines = reader.tail(50, line_filter)
+                print(f"\n{Fore.CYAN}Last {len(lines)} matching lines ({line_filter.describe() or 'no filter'}):")
+                for line in lines:
+                    print(f"{self.log_line_color(line)}{line}")
+                archive = LogArchive(self.log_file)
+                segments = archive.segments()
+                if segments and input(f"\n{Fore.CYAN}Search {len(segments)} archived segments too? (y/n): ").strip().lower() in ['y', 'yes']:
+                    self.loading_animation("Searching archives", 0.5)
+                    matches = collections.deque(maxlen=50)
+                    total = 0
+                    for line in archive.search(line_filter):
+                        matches.append(line)
+                        total += 1
+                    print(f"\n{Fore.CYAN}{total} matching lines, last {len(matches)} shown "
+                          f"({archive.skipped} of {len(segments)} archives skipped by their index):")
+                    for line in matches:
+                        print(f"{self.log_line_color(line)}{line}")
+                if input(f"\n{Fore.CYAN}Follow new matching lines? (y/n): ").strip().lower() in ['y', 'yes']:
+                    self.follow_log(line_filter)
+            
+            elif choice == '4':
+                confirm = input(f"\n{Fore.RED}⚠️  Are you sure you want to clear the log file? (y/n): ").strip().lower()
+                if confirm in ['y', 'yes']:
+                    try:
+                        self.flush_logs()
+                        if getattr(self, 'log_file_handler', None) is not None:
+                            # Through the handler, so its size count and index start over too
+                            self.log_file_handler.truncate()
+                        else:
+                            with open(self.log_file, 'w') as f:
+                                f.write("")
+                        self.log_system_event("LOG_CLEARED", "Log file cleared by user")
+                        self.bounce_text(f"{Back.GREEN}{Fore.WHITE} ✅ CLEARED {Style.RESET_ALL} Log file cleared!", Fore.GREEN)
+                    except Exception as e:
+                        print(f"{Fore.RED}❌ Error clearing log file: {e}")
+                else:
+                    self.bounce_text(f"{Fore.YELLOW}Operation cancelled", Fore.YELLOW)
+            
+        except Exception as e:
+            self.log_error("LOG_VIEW_ERROR", str(e))
+            print(f"{Fore.RED}❌ Error reading log file: {e}")
+    
+    def run_check_once(self, quiet=False, tag=None):
+        """Check every website (or those tagged tag) once without any UI and return a process exit code
+        
+        Exit codes: 0 all websites up, 1 at least one down, 2 nothing to check
+        (main returns 3 if the check itself fails unexpectedly).
+        """
+        websites = self.websites.tagged(tag) if tag else list(self.websites)
+        if not websites:
+            print(f"No websites configured in {self.websites.path}" + (f" with tag {tag}" if tag else ""), file=sys.stderr)
+            return 2
+        
+        start_time = time.time()
+        down_count = 0
+        for website, is_up, status in self.run_checks(websites):
+            if not is_up:
+                down_count += 1
+            if not quiet or not is_up:
+                print(f"{'UP' if is_up else 'DOWN':<5} {website} ({status})", flush=True)
+        self.check_engine.shutdown()
+        
+        if not quiet:
+            print(f"{len(websites) - down_count} up, {down_count} down in {time.time() - start_time:.2f}s", flush=True)
+        return 1 if down_count else 0
+    
+    def run_headless_monitor(self, interval, verbose=False):
+        """Monitor until SIGINT/SIGTERM, printing state changes as plain log lines"""
+        if not self.websites:
+            print(f"No websites configured in {self.websites.path}", file=sys.stderr)
+            return 2
+        
+        def handle_sigterm(signum, frame):
+            raise KeyboardInterrupt()
+        
+        signal.signal(signal.SIGTERM, handle_sigterm)
+        
+        shards = f" across {self.monitor_shards} shards" if self.monitor_shards > 1 else ""
+        self.log_system_event("MONITORING_STARTED", f"Headless monitoring of {len(self.websites)} websites with {interval}s interval{shards}")
+        latest = {}
+        checks = [0]
+        
+        def on_result(website, is_up, status):
+            previous = latest.get(website)
+            latest[website] = is_up
+            checks[0] += 1
+            if verbose or previous != is_up:
+                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                print(f"{timestamp} {'UP' if is_up else 'DOWN':<5} {website} ({status})", flush=True)
+        
+        def on_tick():
+            self.session_pool.evict_idle()
+        
+        def on_reload(added, removed):
+            for website in removed:
+                latest.pop(website, None)
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            print(f"{timestamp} RELOAD {len(added)} added, {len(removed)} removed, monitoring {len(self.websites)} websites", flush=True)
+        
+        try:
+            self.start_monitoring(interval, on_result, on_tick, tick=max(1, interval), on_reload=on_reload)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.check_engine is not None:
+                self.check_engine.shutdown()
+                self.check_engine = None
+        self.log_system_event("MONITORING_STOPPED", f"Headless monitoring stopped after {checks[0]} checks")
+        return 0
+    
+    def run_coordinator(self, address, interval, verbose=False):
+        """Headless monitor whose checks are leased to remote workers (see RemoteCheckEngine)
+        
+        Scheduling, rate limits, the log, history and metrics all stay in this
+        process; workers only run the checks. Returns a process exit code.
+        """
+        self.monitor_shards = 1
+        self.dns_prewarm = False  # Workers resolve the names, maybe with a different view of DNS
+        
+        def on_event(event_type, message):
+            if event_type in ('WORKER_REJECTED', 'WORKER_ERROR'):
+                self.log_error(event_type, message)
+            else:
+                self.log_system_event(event_type, message)
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {event_type} {message}", flush=True)
+        
+        try:
+            host, port = split_address(address)
+            self.check_engine = RemoteCheckEngine(
+                self.record_check_result, host, port,
+                token=os.getenv('COORDINATOR_TOKEN', ''),
+                lease_timeout=float(os.getenv('LEASE_TIMEOUT', '30')),
+                heartbeat=float(os.getenv('WORKER_HEARTBEAT', '5')),
+                site_settings=lambda url: self.websites.get(url, {}),
+                on_event=on_event
+            )
+        except (OSError, ValueError) as e:
+            print(f"Coordinator not started on {address}: {e}", file=sys.stderr)
+            return 2
+        host, port = self.check_engine.address
+        self.log_system_event("COORDINATOR_STARTED", f"Leasing checks to workers connecting to {host}:{port}")
+        print(f"Coordinator listening on {host}:{port}", flush=True)
+        return self.run_headless_monitor(interval, verbose)
+    
+    def run(self):
+        """Main application loop"""
+        self.log_system_event("APP_STARTED", f"Down Detector v{self.current_version} main loop started")
+        while True:
+            try:
+                self.print_header()
+                self.print_menu()
+                
+                choice = input(f"\n{Fore.YELLOW}Select option: ").strip()
+                if choice:
+                    self.play_pop_sound()
+            except (EOFError, KeyboardInterrupt):
+                self.clear_screen()
+                self.typewriter_effect(f"{Back.GREEN}{Fore.WHITE} 👋 THANK YOU FOR USING DOWN DETECTOR {Style.RESET_ALL}")
+                sys.exit(0)
+            
+            if choice == '1':
+                self.add_website()
+            elif choice == '2':
+                self.remove_website()
+            elif choice == '3':
+                self.view_websites()
+            elif choice == '4':
+                self.check_all_websites()
+            elif choice == '5':
+                self.monitor_websites()
+            elif choice == '6':
+                self.settings()
+            elif choice == '7':
+                self.system_updates_menu()
+            elif choice == '8':
+                self.reset_system()
+            elif choice == '9':
+                self.reboot_system()
+            elif choice.upper() == 'S':
+                self.view_statistics()
+            elif choice.upper() == 'I':
+                self.import_export_menu()
+            elif choice == '0':
+                self.clear_screen()
+                self.typewriter_effect(f"{Back.GREEN}{Fore.WHITE} 👋 THANK YOU FOR USING DOWN DETECTOR {Style.RESET_ALL}")
+                sys.exit(0)
+            else:
+                self.print_header()
+                self.bounce_text(f"{Back.RED}{Fore.WHITE} ❌ INVALID SELECTION {Style.RESET_ALL} Please choose 0-9, S or I", Fore.RED)
+                input(f"\n{Fore.CYAN}Press Enter to continue...")
+
+
+class ReportApp(DownDetectorApp):
+    """Headless app of the read-only commands (logs, stats, history, export)
+    
+    It only reads what a monitor or check run left behind: nothing is logged,
+    no history writer thread is started and no site store is created or
+    migrated, so it can run next to a live monitor or from cron.
+    """
+
+    def build_history_archive(self, writer=False):
+        return super().build_history_archive(writer=False)
+
+    def setup_logging(self):
+        self.log_listener = None
+        self.log_file_handler = None
+        self.logger = logging.getLogger('DownDetector.report')
+        self.logger.propagate = False
+        self.logger.handlers = [logging.NullHandler()]
+
+    def load_websites(self):
+        if self.site_store == 'sqlite' and os.path.exists(self.site_db):
+            self.websites = SqliteSiteRegistry(self.site_db)
+        elif os.path.exists(self.websites_file):
+            self.websites = JsonSiteRegistry(self.websites_file, compact_journal=False)
+        else:
+            self.websites = SiteRegistry()
+
+
+class ShardWorkerApp(DownDetectorApp):
+    """Headless app of a shard worker process: checks the websites its parent assigns and reports back
+    
+    The parent owns the log file, history, statistics and metrics endpoint;
+    results and log records go to it through the ShardChannel instead.
+    """
+
+    def __init__(self, shard, shards, commands, results):
+        self.shard = shard
+        self.channel = ShardChannel(commands, results, shards)
+        super().__init__(headless=True)
+        self.channel.registry = self.websites
+        self.channel.env_path = self.env_file_path()
+
+    def setup_logging(self):
+        self.log_listener = None
+        self.logger = logging.getLogger(f'DownDetector.shard{self.shard}')
+        self.logger.setLevel(logging.DEBUG if self.debug_mode else logging.INFO)
+        self.logger.propagate = False
+        self.logger.handlers = [OutboxLogHandler(self.channel.outbox)]
+
+    def load_websites(self):
+        self.websites = ShardSiteRegistry(self.shard)
+
+    def log_system_event(self, event_type, message):
+        super().log_system_event(event_type, f"shard {self.shard}: {message}")
+
+    def log_error(self, error_type, message):
+        super().log_error(error_type, f"shard {self.shard}: {message}")
+
+    def record_check_result(self, website, is_up, status, response_time=None, phases=None, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.hedge_requests:
+            # Hedge delays are worked out from this process's own statistics
+            self.statistics.record(website, timestamp, response_time, is_up, phases)
+        self.channel.outbox.append(('check', website, is_up, status, response_time, phases, timestamp))
+
+    def build_config_watcher(self):
+        return self.channel
+
+    def build_rate_limiter(self):
+        limiter = super().build_rate_limiter()
+        # RATE_LIMIT_GLOBAL is for the whole monitor, so each shard takes its share
+        shards = self.channel.shards
+        if limiter.global_bucket is not None and shards > 1:
+            limiter.global_bucket = TokenBucket(limiter.global_bucket.rate / shards)
+        if shards > 1 and self.shard_key == 'url':
+            # A host's websites are spread over every shard, so per-host limits are shared out too
+            limiter.host_rate /= shards
+            limiter.host_rates = {host: rate / shards for host, rate in limiter.host_rates.items()}
+            if limiter.host_concurrency > 0:
+                limiter.host_concurrency = max(1, limiter.host_concurrency // shards)
+            limiter.host_caps = {host: max(1, cap // shards) for host, cap in limiter.host_caps.items()}
+        return limiter
+
+    def start_metrics_server(self):
+        return None
+
+    def apply_config_changes(self, changed, scheduler, dispatcher, default_interval):
+        first_assignment = not self.websites
+        default_interval, added, removed = super().apply_config_changes(changed, scheduler, dispatcher, default_interval)
+        if first_assignment and added:
+            self.prewarm_dns()
+        return default_interval, added, removed
+
+
+def run_shard_worker(shard, shards, default_interval, commands, results):
+    """Entry point of a shard worker process: monitor the assigned websites until the parent says stop"""
+    # Ctrl+C reaches every process of the terminal; the parent decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.environ['HISTORY_ENABLED'] = 'false'
+    os.environ['ENABLE_SOUNDS'] = 'false'
+    app = ShardWorkerApp(shard, shards, commands, results)
+    try:
+        app.run_monitor_loop(app.build_scheduler(default_interval), lambda *result: None, app.session_pool.evict_idle,
+                             tick=max(1.0, default_interval), default_interval=default_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if app.check_engine is not None:
+            app.check_engine.shutdown()
+
+
+class RemoteWorkerApp(DownDetectorApp):
+    """Headless app of a remote worker: runs the checks a coordinator leases to it and sends back the results
+    
+    The coordinator owns the site list, log of checks, history and metrics;
+    this process only learns the settings of the websites it is leased.
+    """
+
+    RECONNECT_MAX_SECONDS = 30
+    # Settings of a website not leased for this long are forgotten
+    SITE_IDLE_SECONDS = 600
+
+    def __init__(self):
+        self.completed = {}  # (connection, lease id) -> (response_time, phases) of checks not yet reported
+        self.leases = {}  # lease id -> url of this connection's checks not yet reported
+        self.last_leased = {}  # url -> when it was last leased
+        self.connection = 0  # Told apart so a lease id reused after a reconnect can't match an old check
+        self.lease_lock = threading.Lock()
+        super().__init__(headless=True)
+
+    def load_websites(self):
+        self.websites = SiteRegistry()
+
+    def check_website(self, lease):
+        """Run a leased check; the engine is given (connection, lease id, url) so results carry their lease"""
+        current_lease.set(lease[:2])
+        return super().check_website(lease[2])
+
+    async def check_website_async(self, lease):
+        current_lease.set(lease[:2])
+        return await super().check_website_async(lease[2])
+
+    def record_check_result(self, website, is_up, status, response_time=None, phases=None, timestamp=None, worker=None):
+        if self.hedge_requests:
+            # Hedge delays are worked out from this process's own statistics
+            self.statistics.record(website, time.time() if timestamp is None else timestamp, response_time, is_up, phases)
+        self.completed[current_lease.get()] = (response_time, phases)
+
+    def forget_idle_sites(self, now):
+        """Drop the settings of websites that haven't been leased for SITE_IDLE_SECONDS"""
+        with self.lease_lock:
+            busy = set(self.leases.values())
+            idle = [url for url, leased_at in self.last_leased.items()
+                    if now - leased_at > self.SITE_IDLE_SECONDS and url not in busy]
+            for url in idle:
+                del self.last_leased[url]
+                self.websites.remove(url)
+        if idle:
+            self.session_pool.configure(self.websites)
+
+    def run_worker(self, address, name=None):
+        """Serve the coordinator at address until interrupted, reconnecting whenever the connection is lost
+        
+        Returns a process exit code: 2 if the coordinator rejects the token.
+        """
+        host, port = split_address(address)
+        name = name or f"{socket.gethostname()}-{os.getpid()}"
+        delay = 1.0
+        while True:
+            try:
+                with socket.create_connection((host, port), timeout=10) as sock:
+                    self.serve_coordinator(sock, name)
+                    delay = 1.0
+                reason = "connection closed"
+            except PermissionError as e:
+                print(f"Coordinator at {host}:{port} refused {name}: {e}", file=sys.stderr)
+                return 2
+            except (OSError, ValueError) as e:
+                reason = str(e)[:80] or type(e).__name__
+            self.log_error("COORDINATOR_LOST", f"{host}:{port}: {reason}; retrying in {delay:.0f}s")
+            print(f"Coordinator {host}:{port} unavailable ({reason}), retrying in {delay:.0f}s", file=sys.stderr, flush=True)
+            time.sleep(delay)
+            delay = min(self.RECONNECT_MAX_SECONDS, delay * 2)
+
+    def serve_coordinator(self, sock, name):
+        """Run leased checks until the connection drops or the coordinator goes silent"""
+        engine = self.get_check_engine()
+        reader = sock.makefile('rb')
+        
+        def send(message):
+            sock.sendall(json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n')
+        
+        send({'type': 'hello', 'name': name, 'capacity': engine.max_workers,
+              'token': os.getenv('COORDINATOR_TOKEN', '')})
+        welcome = json.loads(reader.readline() or b'null')
+        if not isinstance(welcome, dict) or welcome.get('type') != 'welcome':
+            raise PermissionError(welcome.get('error') if isinstance(welcome, dict) else "no welcome")
+        heartbeat = float(welcome.get('heartbeat', 5))
+        sock.settimeout(None)
+        self.log_system_event("WORKER_CONNECTED", f"{name} connected to {sock.getpeername()[0]}:{sock.getpeername()[1]}")
+        print(f"{name} connected to {sock.getpeername()[0]}:{sock.getpeername()[1]} (capacity {engine.max_workers})", flush=True)
+        with self.lease_lock:
+            self.leases.clear()  # Leases of an earlier connection went to other workers
+            self.connection += 1
+            connection = self.connection
+        last_heard = [time.time()]
+        closed = threading.Event()
+        
+        def read_leases():
+            try:
+                for line in reader:
+                    last_heard[0] = time.time()
+                    message = json.loads(line)
+                    if message.get('type') != 'lease':
+                        continue
+                    checks = []
+                    new_sites = False
+                    now = time.time()
+                    with self.lease_lock:
+                        for lease_id, url, settings in message['checks']:
+                            if url not in self.websites:
+                                self.websites.add(url, settings)
+                                new_sites = True
+                            elif self.websites.get(url) != settings:
+                                self.websites.update(url, settings)
+                            self.leases[lease_id] = url
+                            self.last_leased[url] = now
+                            checks.append((connection, lease_id, url))
+                    if new_sites:
+                        self.session_pool.configure(self.websites)
+                    if hasattr(engine, 'submit_many'):
+                        engine.submit_many(checks)
+                    else:
+                        for check in checks:
+                            engine.submit(check)
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                self.log_error("COORDINATOR_ERROR", f"Bad message from coordinator: {str(e)[:80]}")
+            finally:
+                closed.set()
+        
+        threading.Thread(target=read_leases, name='leases', daemon=True).start()
+        last_sent = last_pruned = time.time()
+        try:
+            while not closed.is_set():
+                results = []
+                result = engine.get_result(timeout=min(1.0, heartbeat))
+                while result is not None:
+                    (check_connection, lease_id, url), is_up, status = result
+                    response_time, phases = self.completed.pop((check_connection, lease_id), (None, None))
+                    with self.lease_lock:
+                        # Checks leased before a reconnect went to other workers, so they aren't ours to report
+                        ours = check_connection == connection and self.leases.pop(lease_id, None) is not None
+                    if ours:
+                        results.append([lease_id, is_up, status, response_time, phases])
+                    result = engine.get_result(timeout=0)
+                now = time.time()
+                if now - last_pruned >= 60:
+                    self.forget_idle_sites(now)
+                    last_pruned = now
+                if results or now - last_sent >= heartbeat:
+                    send({'type': 'results', 'results': results})  # An empty list doubles as a heartbeat
+                    last_sent = now
+                if now - last_heard[0] > 3 * heartbeat:
+                    raise OSError(f"no message from the coordinator for {3 * heartbeat:.0f}s")
+                self.session_pool.evict_idle()
+        finally:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+
+
+def run_worker(address, name=None):
+    """Entry point of the worker command"""
+    os.environ['HISTORY_ENABLED'] = 'false'
+    os.environ['ENABLE_SOUNDS'] = 'false'
+    app = RemoteWorkerApp()
+    try:
+        return app.run_worker(address, name)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if app.check_engine is not None:
+            app.check_engine.shutdown()
+
+
+def parse_args(argv=None):
+    """Parse command line arguments; no command starts the interactive app"""
+    parser = argparse.ArgumentParser(prog='downdetector', description='Down Detector - real-time website monitor')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    check_parser = subparsers.add_parser('check', help='check every website once and exit (0 = all up, 1 = some down)')
+    check_parser.add_argument('--once', action='store_true', help='accepted for clarity; check always runs a single pass')
+    check_parser.add_argument('--quiet', action='store_true', help='only print websites that are down')
+    check_parser.add_argument('--tag', help='only check websites with this tag')
+    
+    monitor_parser = subparsers.add_parser('monitor', help='monitor websites continuously')
+    monitor_parser.add_argument('--headless', action='store_true', help='no animations or prompts; log state changes to stdout')
+    monitor_parser.add_argument('--interval', type=int, help='default seconds between checks of each website')
+    monitor_parser.add_argument('--verbose', action='store_true', help='print every check, not just state changes')
+    monitor_parser.add_argument('--shards', type=int, help='override MONITOR_SHARDS: worker processes sharing the checks (0 = one per core)')
+    
+    coordinator_parser = subparsers.add_parser('coordinator', help='monitor headless, leasing the checks to remote workers')
+    coordinator_parser.add_argument('--listen', help='address to accept workers on (default COORDINATOR_ADDRESS)')
+    coordinator_parser.add_argument('--interval', type=int, help='default seconds between checks of each website')
+    coordinator_parser.add_argument('--verbose', action='store_true', help='print every check, not just state changes')
+    
+    worker_parser = subparsers.add_parser('worker', help="run a coordinator's checks and send it the results")
+    worker_parser.add_argument('--connect', help='coordinator address (default COORDINATOR_ADDRESS)')
+    worker_parser.add_argument('--name', help='worker name in the coordinator log (default hostname-pid)')
+    
+    history_parser = subparsers.add_parser('history', help='uptime report for a website from the on-disk history')
+    history_parser.add_argument('url', nargs='?', help='website to report on')
+    history_parser.add_argument('--days', type=int, default=7, help='report window in days (default 7)')
+    history_parser.add_argument('--compact', action='store_true', help='compact finished days and apply HISTORY_RETENTION_DAYS first')
+    
+    logs_parser = subparsers.add_parser('logs', help='print the end of the log file without loading all of it')
+    logs_parser.add_argument('-n', '--lines', type=int, default=50, help='number of lines to show (default 50)')
+    logs_parser.add_argument('-f', '--follow', action='store_true', help='keep printing new lines until Ctrl+C')
+    logs_parser.add_argument('--level', type=str.upper, choices=sorted(LogFilter.LEVELS, key=LogFilter.LEVELS.get), help='minimum level')
+    logs_parser.add_argument('--site', help='only lines mentioning this website')
+    logs_parser.add_argument('--event', help='event type: CHECK, SYSTEM, ERROR, UPDATE or e.g. MONITORING_STARTED')
+    logs_parser.add_argument('--since', help='only lines at or after this time, e.g. "2024-05-01" or "2024-05-01 12:00"')
+    logs_parser.add_argument('--archives', action='store_true', help='search rotated archives too and print every match')
+    
+    stats_parser = subparsers.add_parser('stats', help='uptime and p50/p95/p99 latency per website from the on-disk history')
+    stats_parser.add_argument('--json', action='store_true', help='print every window as JSON')
+    stats_parser.add_argument('--window', choices=list(CheckStatistics.WINDOWS), default='24h', help='window for the table (default 24h)')
+    
+    import_parser = subparsers.add_parser('import', help='add websites from a txt, CSV, JSON-lines or websites.json file')
+    import_parser.add_argument('file', help="file to read, or - for stdin")
+    import_parser.add_argument('--format', choices=SITE_FILE_FORMATS, help='file format (default: from the extension, else txt)')
+    
+    export_parser = subparsers.add_parser('export', help='write every website and its settings to a file')
+    export_parser.add_argument('file', help="file to write, or - for stdout")
+    export_parser.add_argument('--format', choices=SITE_FILE_FORMATS, help='file format (default: from the extension, else txt)')
+    
+    for command_parser in (check_parser, monitor_parser, coordinator_parser, import_parser, export_parser):
+        command_parser.add_argument('--websites', help='site database (.db) or websites JSON file to use instead of the configured store')
+    for command_parser in (check_parser, monitor_parser, worker_parser):
+        command_parser.add_argument('--backend', choices=['threads', 'asyncio'], help='override PROBE_BACKEND')
+        command_parser.add_argument('--concurrency', type=int, help='override MAX_CONCURRENCY')
+    
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point
+    
+    Headless commands exit with 0 on success, 1 when a website is down or an
+    operation failed, 2 when there is nothing to do (no websites, bad
+    configuration) and 3 on an unexpected error.
+    """
+    args = parse_args(argv)
+    
+    if args.command in ('check', 'monitor', 'coordinator', 'import', 'export'):
+        # Settings are read from the environment, so overrides go there before the app starts
+        if args.websites:
+            if args.websites.endswith('.db'):
+                os.environ['SITE_STORE'] = 'sqlite'
+                os.environ['SITE_DB'] = args.websites
+            else:
+                os.environ['SITE_STORE'] = 'json'
+                os.environ['WEBSITES_FILE'] = args.websites
+    
+    if args.command == 'monitor' and args.shards is not None:
+        os.environ['MONITOR_SHARDS'] = str(args.shards)
+    
+    if args.command in ('check', 'monitor', 'worker'):
+        if args.backend:
+            os.environ['PROBE_BACKEND'] = args.backend
+        if args.concurrency:
+            os.environ['MAX_CONCURRENCY'] = str(args.concurrency)
+    
+    if args.command == 'logs':
+        try:
+            app = ReportApp(headless=True)
+            line_filter = LogFilter(args.level, args.site, args.event, args.since)
+            return app.run_log_command(args.lines, args.follow, line_filter if line_filter else None, args.archives)
+        except Exception as e:
+            print(f"Down Detector error: {e}", file=sys.stderr)
+            return 3
+    
+    if args.command == 'stats':
+        try:
+            app = ReportApp(headless=True)
+            return app.run_stats_command(as_json=args.json, window=args.window)
+        except Exception as e:
+            print(f"Down Detector error: {e}", file=sys.stderr)
+            return 3
+    
+    if args.command in ('import', 'export'):
+        try:
+            if args.command == 'import':
+                return DownDetectorApp(headless=True).run_import_command(args.file, args.format)
+            return ReportApp(headless=True).run_export_command(args.file, args.format)
+        except Exception as e:
+            print(f"Down Detector error: {e}", file=sys.stderr)
+            return 3
+    
+    if args.command == 'history':
+        try:
+            app = ReportApp(headless=True)
+            return app.run_history_report(args.url, args.days, compact=args.compact)
+        except Exception as e:
+            print(f"Down Detector error: {e}", file=sys.stderr)
+            return 3
+    
+    if args.command == 'worker':
+        try:
+            return run_worker(args.connect or os.getenv('COORDINATOR_ADDRESS', '127.0.0.1:7400'), args.name)
+        except Exception as e:
+            print(f"Down Detector error: {e}", file=sys.stderr)
+            return 3
+    
+    if args.command in ('check', 'coordinator') or (args.command == 'monitor' and args.headless):
+        os.environ['ENABLE_SOUNDS'] = 'false'
+        try:
+            app = DownDetectorApp(headless=True)
+            if args.command == 'check':
+                return app.run_check_once(quiet=args.quiet, tag=args.tag)
+            if args.command == 'coordinator':
+                return app.run_coordinator(args.listen or os.getenv('COORDINATOR_ADDRESS', '127.0.0.1:7400'),
+                                           args.interval or app.monitor_interval, verbose=args.verbose)
+            return app.run_headless_monitor(args.interval or app.monitor_interval, verbose=args.verbose)
+        except KeyboardInterrupt:
+            return 130
+        except Exception as e:
+            print(f"Down Detector error: {e}", file=sys.stderr)
+            return 3
+    
+    try:
+        app = DownDetectorApp()
+        if args.command == 'monitor':
+            app.monitor_websites()
+        app.run()
+    except KeyboardInterrupt:
+        os.system('cls' if os.name == 'nt' else 'clear')
+        print(f"\n{Back.YELLOW}{Fore.BLACK} 👋 APPLICATION CLOSED {Style.RESET_ALL}")
+    except Exception as e:
+        os.system('cls' if os.name == 'nt' else 'clear')
+        print(f"\n{Back.RED}{Fore.WHITE} ❌ APPLICATION ERROR: {str(e)} {Style.RESET_ALL}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file